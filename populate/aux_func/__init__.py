@@ -11,12 +11,15 @@ from .plataforma import generate_plataformas, generate_plataforma_usuarios
 from .usuario import generate_usuarios
 from .streamer import generate_streamer_paises
 from .empresa_pais import generate_empresa_paises
-from .canal import generate_canais, generate_nivel_canais
+from .canal import generate_canais, generate_nivel_canais, iter_canais, iter_nivel_canais
 from .patrocinio import generate_patrocinios
 from .inscricao import generate_inscricoes
 from .video import generate_videos, generate_participacoes
 from .comentario import generate_comentarios
-from .doacao import generate_doacoes, generate_pagamentos
+from .doacao import generate_doacoes, generate_pagamentos, iter_doacoes, iter_pagamentos
+from .comentario_doacao import generate_comentarios_com_doacoes
+from .streaming import chunks, iter_generated
+from .identifiers import IdentifierService
 
 __all__ = [
     'generate_empresas',
@@ -36,4 +39,12 @@ __all__ = [
     'generate_comentarios',
     'generate_doacoes',
     'generate_pagamentos',
+    'generate_comentarios_com_doacoes',
+    'iter_canais',
+    'iter_nivel_canais',
+    'iter_doacoes',
+    'iter_pagamentos',
+    'chunks',
+    'iter_generated',
+    'IdentifierService',
 ]
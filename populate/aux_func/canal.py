@@ -1,42 +1,105 @@
 """Geração de canais e níveis de canal."""
 
+from typing import Iterable, Iterator
+
 from faker import Faker
 from models import Canal, NivelCanal, Plataforma, Usuario, TipoCanal
-import random
+from .columns import numpy_rng, choose, choose_enum, dates_until_today, integers, decimals
+from .streaming import chunks, DEFAULT_CHUNK_SIZE
 
 
-def generate_canais(fake: Faker, plataformas: list[Plataforma], streamers: list[Usuario]) -> list[Canal]:
-    """Gera um canal para cada streamer, garantindo nomes de canal únicos por plataforma."""
+def generate_canais(fake: Faker, plataformas: list[Plataforma] | list[int], streamers: list[Usuario] | list[int],
+                    id_start: int | None = None, nicks: list[str] | None = None) -> list[Canal]:
+    """Gera um canal para cada streamer, garantindo nomes de canal únicos por plataforma.
+    
+    Args:
+        plataformas: Lista de objetos Plataforma OU lista de nros de plataformas
+        streamers: Lista de objetos Usuario OU lista de IDs de streamers
+        id_start: Primeiro ID da faixa reservada (None deixa o banco gerar os IDs)
+        nicks: Nicks dos streamers, em paralelo a `streamers` (obrigatório com IDs)
+    """
+    count = len(streamers)
+    if nicks is None:
+        nicks = [streamer.nick for streamer in streamers]
+    rng = numpy_rng()
+    nros = choose(rng, [plataforma.nro if hasattr(plataforma, 'nro') else plataforma for plataforma in plataformas], count)
+    tipos = choose_enum(rng, TipoCanal, count)
+    datas = dates_until_today(rng, count)
+    visualizacoes = integers(rng, 0, 1000000, count)
+    
     canais: list[Canal] = []
-    for streamer in streamers:
+    for i, (streamer, nick) in enumerate(zip(streamers, nicks)):
         # Create a unique channel name from the streamer's unique nick
-        channel_name = f"{streamer.nick}_canal"
+        channel_name = f"{nick}_canal"
 
         canais.append(
             Canal(
-                nro_plataforma=random.choice(plataformas).nro,
-                id_streamer=streamer.id,
+                id=id_start + i if id_start is not None else None,
+                nro_plataforma=nros[i],
+                id_streamer=streamer.id if hasattr(streamer, 'id') else streamer,
                 nome=channel_name,
-                tipo=random.choice(list(TipoCanal)),
-                data_criacao=fake.date_object(),
+                tipo=tipos[i],
+                data_criacao=datas[i],
                 descricao=fake.sentence(),
-                qtd_visualizacoes=random.randint(0, 1000000)
+                qtd_visualizacoes=visualizacoes[i]
             )
         )
     return canais
 
 
-def generate_nivel_canais(fake: Faker, canais: list[Canal], niveis_por_canal: int) -> list[NivelCanal]:
-    """Gera níveis de inscrição para canais."""
+def generate_nivel_canais(fake: Faker, canais: list[Canal] | list[int], niveis_por_canal: int, id_start: int | None = None) -> list[NivelCanal]:
+    """Gera níveis de inscrição para canais.
+    
+    Args:
+        canais: Lista de objetos Canal OU lista de IDs de canais
+        id_start: Primeiro ID da faixa reservada (None deixa o banco gerar os IDs)
+    """
+    valores = decimals(numpy_rng(), 3, 2, len(canais) * niveis_por_canal)
     nivel_canais: list[NivelCanal] = []
     for canal in canais:
+        canal_id = canal.id if hasattr(canal, 'id') else canal
         for i in range(niveis_por_canal):
             nivel_canais.append(
                 NivelCanal(
-                    id_canal=canal.id,
+                    id=id_start + len(nivel_canais) if id_start is not None else None,
+                    id_canal=canal_id,
                     nivel=f"Nivel {i+1}",
-                    valor=fake.pydecimal(left_digits=3, right_digits=2, positive=True),
+                    valor=valores[len(nivel_canais)],
                     gif=fake.image_url()
                 )
             )
     return nivel_canais
+
+
+def iter_canais(fake: Faker, plataformas: list[Plataforma] | list[int], streamers: Iterable[tuple[int, str]], id_start: int | None = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Canal]:
+    """Variante em fluxo de generate_canais: percorre os streamers em trechos.
+    
+    Args:
+        plataformas: Lista de objetos Plataforma OU lista de nros de plataformas
+        streamers: Iterável de pares (id, nick) dos streamers, consumido sob demanda
+        id_start: Primeiro ID da faixa reservada (None deixa o banco gerar os IDs)
+        chunk_size: Streamers gerados de uma vez
+    """
+    offset = 0
+    for chunk in chunks(streamers, chunk_size):
+        # Cada trecho vira dois arrays paralelos: IDs e nicks
+        ids, nicks = (list(column) for column in zip(*chunk))
+        yield from generate_canais(fake, plataformas, ids, id_start + offset if id_start is not None else None, nicks)
+        offset += len(chunk)
+
+
+def iter_nivel_canais(fake: Faker, canais: Iterable[Canal] | Iterable[int], niveis_por_canal: int, id_start: int | None = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[NivelCanal]:
+    """Variante em fluxo de generate_nivel_canais: percorre os canais em trechos.
+    
+    Args:
+        canais: Iterável de objetos Canal OU de IDs de canais
+        id_start: Primeiro ID da faixa reservada (None deixa o banco gerar os IDs)
+        chunk_size: Canais gerados de uma vez
+    """
+    offset = 0
+    for chunk in chunks(canais, chunk_size):
+        chunk_start = id_start + offset * niveis_por_canal if id_start is not None else None
+        yield from generate_nivel_canais(fake, chunk, niveis_por_canal, chunk_start)
+        offset += len(chunk)
@@ -0,0 +1,90 @@
+"""Geração vetorizada de colunas com numpy.random.Generator.
+
+Cada função produz uma coluna inteira com uma única chamada ao gerador, em
+vez de uma chamada a `random`/`fake` por linha. As linhas só são montadas
+pelos geradores de entidade, ao final.
+"""
+
+import random
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Sequence
+
+import numpy as np
+
+
+def numpy_rng() -> np.random.Generator:
+    """Cria um Generator semeado a partir do `random` global.
+
+    Como os lotes re-semeiam o `random` antes de gerar, as colunas numpy
+    continuam reprodutíveis pela semente da execução.
+    """
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def choose_ids(rng: np.random.Generator, items: Sequence[Any], count: int) -> np.ndarray:
+    """Sorteia `count` IDs (com reposição) de uma faixa, lista de IDs ou lista de objetos."""
+    if isinstance(items, range) and items.step == 1:
+        return rng.integers(items.start, items.stop, size=count)
+    return ids_at(items, rng.integers(0, len(items), size=count))
+
+
+def ids_at(items: Sequence[Any], indices: np.ndarray) -> np.ndarray:
+    """IDs nas posições `indices` de uma faixa, lista de IDs ou lista de objetos."""
+    if isinstance(items, range) and items.step == 1:
+        return items.start + np.asarray(indices, dtype=np.int64)
+    if len(items) and hasattr(items[0], 'id'):
+        ids = np.fromiter((item.id for item in items), dtype=np.int64, count=len(items))
+    else:
+        ids = np.asarray(items, dtype=np.int64)
+    return ids[indices]
+
+
+def choose(rng: np.random.Generator, items: Sequence[Any], count: int) -> list:
+    """Sorteia `count` elementos quaisquer (ex: membros de Enum) com reposição."""
+    return [items[i] for i in rng.integers(0, len(items), size=count).tolist()]
+
+
+def choose_enum(rng: np.random.Generator, enum_cls: type[Enum], count: int) -> list:
+    """Sorteia `count` membros de um Enum."""
+    return choose(rng, list(enum_cls), count)
+
+
+def integers(rng: np.random.Generator, low: int, high: int, count: int) -> list[int]:
+    """Inteiros uniformes em [low, high] (inclusivo, como random.randint)."""
+    return rng.integers(low, high, size=count, endpoint=True).tolist()
+
+
+def booleans(rng: np.random.Generator, count: int) -> list[bool]:
+    """Booleanos com 50% de chance (como fake.boolean())."""
+    return (rng.random(count) < 0.5).tolist()
+
+
+def datetimes_this_year(rng: np.random.Generator, count: int) -> list[datetime]:
+    """Datas/horas entre o início do ano e agora (como fake.date_time_this_year())."""
+    now = datetime.now().replace(microsecond=0)
+    start = datetime(now.year, 1, 1)
+    span = max(int((now - start).total_seconds()), 1)
+    seconds = rng.integers(0, span, size=count).astype('timedelta64[s]')
+    return (np.datetime64(start, 's') + seconds).astype(object).tolist()
+
+
+def dates_until_today(rng: np.random.Generator, count: int) -> list[date]:
+    """Datas entre 1970-01-01 e hoje (como fake.date_object())."""
+    span = (date.today() - date(1970, 1, 1)).days + 1
+    days = rng.integers(0, span, size=count).astype('timedelta64[D]')
+    return (np.datetime64('1970-01-01', 'D') + days).astype(object).tolist()
+
+
+def durations(rng: np.random.Generator, max_seconds: int, count: int) -> list:
+    """Durações (timedelta) uniformes em [0, max_seconds]."""
+    seconds = rng.integers(0, max_seconds, size=count, endpoint=True)
+    return seconds.astype('timedelta64[s]').astype(object).tolist()
+
+
+def decimals(rng: np.random.Generator, left_digits: int, right_digits: int, count: int) -> list[Decimal]:
+    """Decimais positivos com até `left_digits` dígitos inteiros e `right_digits`
+    casas (como fake.pydecimal(..., positive=True))."""
+    units = rng.integers(1, 10 ** (left_digits + right_digits), size=count)
+    return [Decimal(unit).scaleb(-right_digits) for unit in units.tolist()]
@@ -2,10 +2,12 @@
 
 from faker import Faker
 from models import Comentario, Video, Usuario
-import random
+from .columns import numpy_rng, choose_ids, datetimes_this_year, booleans
+from .skew import choose_skewed_ids
 
 
-def generate_comentarios(fake: Faker, count: int, videos: list[Video] | list[int], usuarios: list[Usuario] | list[int], num_seq_state: dict = None) -> list[Comentario]:
+def generate_comentarios(fake: Faker, count: int, videos: list[Video] | list[int], usuarios: list[Usuario] | list[int], offset: int = 0,
+                         skew: float = 0.0, key: int | None = None) -> list[Comentario]:
     """Gera uma lista de comentários fictícios.
     
     Args:
@@ -13,50 +15,33 @@ def generate_comentarios(fake: Faker, count: int, videos: list[Video] | list[int
         count: Número de comentários a gerar
         videos: Lista de objetos Video OU lista de IDs de vídeos (mais eficiente)
         usuarios: Lista de objetos Usuario OU lista de IDs de usuários (mais eficiente)
-        num_seq_state: Dicionário compartilhado entre lotes para rastrear num_seq por vídeo
+        offset: Offset do lote; num_seq = offset + i + 1, o que garante chaves
+            únicas entre lotes sem estado compartilhado
+        skew: Expoente da popularidade (Zipf) dos vídeos; 0 = uniforme
+        key: Chave do ranking de popularidade, compartilhada entre os lotes
     
     Returns:
         Lista de objetos Comentario
     """
-    comentarios: list[Comentario] = []
-    # Rastreia (id_video, num_seq, id_usuario) para evitar duplicatas
-    comentarios_set = set()
-    # Rastreia o próximo num_seq disponível por vídeo
-    if num_seq_state is None:
-        num_seq_por_video = {}
-    else:
-        num_seq_por_video = num_seq_state
+    # Colunas geradas de uma vez (FKs, datas e flags); as linhas são montadas no final
+    rng = numpy_rng()
+    video_ids = choose_skewed_ids(rng, videos, count, skew, key).tolist()
+    usuario_ids = choose_ids(rng, usuarios, count).tolist()
+    datas = datetimes_this_year(rng, count)
+    coment_on = booleans(rng, count)
     
-    # Suporta tanto objetos quanto IDs (otimização de memória)
-    for _ in range(count):
-        video_item = random.choice(videos)
-        usuario_item = random.choice(usuarios)
-        
-        # Extrai IDs (funciona tanto para objetos quanto para IDs diretos)
-        video_id = video_item.id if hasattr(video_item, 'id') else video_item
-        usuario_id = usuario_item.id if hasattr(usuario_item, 'id') else usuario_item
-        
-        # Inicializa o contador de num_seq para este vídeo se não existir
-        if video_id not in num_seq_por_video:
-            num_seq_por_video[video_id] = 1
-        
-        # Obtém o próximo num_seq para este vídeo
-        num_seq = num_seq_por_video[video_id]
-        
-        # Verifica se esta combinação já existe
-        if (video_id, num_seq, usuario_id) not in comentarios_set:
-            comentarios_set.add((video_id, num_seq, usuario_id))
-            comentarios.append(
-                Comentario(
-                    id_video=video_id,
-                    num_seq=num_seq,
-                    id_usuario=usuario_id,
-                    texto=fake.text(),
-                    data_h=fake.date_time_this_year(),
-                    coment_on=fake.boolean()
-                )
-            )
-            # Incrementa o num_seq para o próximo comentário deste vídeo
-            num_seq_por_video[video_id] += 1
+    # Sem estado: o offset global já torna a chave única
+    num_seqs = range(offset + 1, offset + count + 1)
     
-    return comentarios
+    # (id_video, num_seq) nunca se repete, portanto a chave completa é única
+    return [
+        Comentario(
+            id_video=video_id,
+            num_seq=num_seq,
+            id_usuario=usuario_id,
+            texto=fake.text(),
+            data_h=data_h,
+            coment_on=on
+        )
+        for video_id, num_seq, usuario_id, data_h, on in zip(video_ids, num_seqs, usuario_ids, datas, coment_on)
+    ]
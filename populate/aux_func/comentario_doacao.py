@@ -0,0 +1,108 @@
+"""Geração fundida de comentários, doações e pagamentos."""
+
+from faker import Faker
+import numpy as np
+from models import Comentario, Doacao, Bitcoin, CartaoCredito, Paypal, MecPlat, StatusPagamento, Video, Usuario
+from .columns import numpy_rng, choose_ids, datetimes_this_year, booleans, decimals, choose_enum
+from .key_store import pack_pairs, occurrence_ranks
+from .identifiers import IdentifierService
+from .skew import choose_skewed_ids
+
+
+def generate_comentarios_com_doacoes(fake: Faker, count: int, videos: list[Video] | list[int], usuarios: list[Usuario] | list[int], total_count: int, offset: int = 0,
+                                     key: int | None = None, skew: float = 0.0) -> list:
+    """Gera um lote de comentários junto com suas doações e pagamentos.
+
+    Cada lote usa uma fatia exclusiva dos vídeos (proporcional à sua posição
+    em `total_count`), portanto o num_seq por (vídeo, usuário) pode ser
+    contado localmente e coincide com o calculado por `trg_auto_seq_comentario`
+    em uma tabela vazia. As doações referenciam as chaves geradas, sem
+    precisar reler os comentários do banco. O número de lotes não deve
+    exceder o número de vídeos.
+
+    Args:
+        fake: Instância do Faker
+        count: Número de comentários do lote
+        videos: Lista de objetos Video OU lista/faixa de IDs de vídeos
+        usuarios: Lista de objetos Usuario OU lista/faixa de IDs de usuários
+        total_count: Total de comentários de todos os lotes
+        offset: Posição do lote; também torna únicos cartões e IDs de pagamento
+        key: Chave dos números de cartão e do ranking de popularidade, compartilhada entre os lotes
+        skew: Expoente da popularidade (Zipf) dos vídeos dentro da fatia do lote; 0 = uniforme
+
+    Returns:
+        Lista com Comentarios, Doacoes, Bitcoins, CartaoCreditos, Paypals e
+        MecPlats, nessa ordem (respeitando as FKs)
+    """
+    rng = numpy_rng()
+
+    # Fatia de vídeos exclusiva deste lote
+    start = len(videos) * offset // total_count
+    stop = max(len(videos) * (offset + count) // total_count, start + 1)
+    video_ids = choose_skewed_ids(rng, videos[start:stop], count, skew, key)
+    usuario_ids = choose_ids(rng, usuarios, count)
+    datas = datetimes_this_year(rng, count)
+    coment_on = booleans(rng, count)
+
+    # num_seq = MAX + 1 por (vídeo, usuário), como o trigger: posição de cada
+    # comentário entre os do mesmo par no lote (pares codificados em int64)
+    num_seqs = (occurrence_ranks(pack_pairs(video_ids, usuario_ids)) + 1).tolist()
+    video_ids = video_ids.tolist()
+    usuario_ids = usuario_ids.tolist()
+
+    comentarios = [
+        Comentario(
+            id_video=video_id,
+            num_seq=num_seq,
+            id_usuario=usuario_id,
+            texto=fake.text(),
+            data_h=data_h,
+            coment_on=on
+        )
+        for video_id, num_seq, usuario_id, data_h, on in zip(video_ids, num_seqs, usuario_ids, datas, coment_on)
+    ]
+
+    # Metade dos comentários recebe doação; os métodos são divididos em quartos
+    indices = np.sort(rng.choice(count, size=count // 2, replace=False)).tolist()
+    n_doacoes = len(indices)
+    valores = decimals(rng, 4, 2, n_doacoes)
+    status = choose_enum(rng, StatusPagamento, n_doacoes)
+    quartos = [n_doacoes // 4, n_doacoes // 2 - n_doacoes // 4,
+               3 * n_doacoes // 4 - n_doacoes // 2, n_doacoes - 3 * n_doacoes // 4]
+    metodos = rng.permutation(np.repeat(np.arange(4), quartos)).tolist()
+    # Números de cartão (Luhn) derivados da posição global de cada comentário
+    posicoes_cartoes = [offset + idx for idx, metodo in zip(indices, metodos) if metodo == 1]
+    numeros = iter(IdentifierService(key).card_numbers(posicoes_cartoes, rng))
+
+    doacoes: list[Doacao] = []
+    bitcoins: list[Bitcoin] = []
+    cartoes: list[CartaoCredito] = []
+    paypals: list[Paypal] = []
+    mec_plats: list[MecPlat] = []
+
+    for idx, valor, status_pagamento, metodo in zip(indices, valores, status, metodos):
+        comentario = comentarios[idx]
+        chave = {'id_video_doacao': comentario.id_video, 'seq_doacao': comentario.num_seq, 'id_usuario': comentario.id_usuario}
+        # Posição global do comentário: única entre todos os lotes
+        unique_id = offset + idx
+
+        doacoes.append(
+            Doacao(
+                id_video=comentario.id_video,
+                num_seq=comentario.num_seq,
+                id_usuario=comentario.id_usuario,
+                valor=valor,
+                status_pagamento=status_pagamento
+            )
+        )
+
+        if metodo == 0:
+            bitcoins.append(Bitcoin(**chave, tx_id=fake.sha256()))
+        elif metodo == 1:
+            cartoes.append(CartaoCredito(**chave, num=next(numeros), bandeira=fake.credit_card_provider()))
+        elif metodo == 2:
+            paypals.append(Paypal(**chave, id=unique_id))
+        else:
+            mec_plats.append(MecPlat(**chave, seq=unique_id))
+
+    return comentarios + doacoes + bitcoins + cartoes + paypals + mec_plats
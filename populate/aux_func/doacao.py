@@ -1,40 +1,61 @@
 """Geração de doações e métodos de pagamento."""
 
+from typing import Iterable, Iterator
+
 from faker import Faker
 from models import Doacao, Comentario, Bitcoin, CartaoCredito, Paypal, MecPlat, StatusPagamento
 import random
 
+from .columns import numpy_rng, decimals, choose_enum
+from .identifiers import IdentifierService
+from .streaming import chunks, DEFAULT_CHUNK_SIZE
+
 
 def generate_doacoes(fake: Faker, comentarios: list[Comentario]) -> list[Doacao]:
     """Gera doações para um subconjunto de comentários."""
+    rng = numpy_rng()
+    # Metade dos comentários (sem reposição), sorteada de uma vez
+    indices = rng.choice(len(comentarios), size=len(comentarios) // 2, replace=False).tolist()
+    valores = decimals(rng, 4, 2, len(indices))
+    status = choose_enum(rng, StatusPagamento, len(indices))
+    
     doacoes: list[Doacao] = []
-    comentarios_doacao = random.sample(comentarios, k=len(comentarios) // 2)
-    for comentario in comentarios_doacao:
+    for idx, valor, status_pagamento in zip(indices, valores, status):
+        comentario = comentarios[idx]
         doacoes.append(
             Doacao(
                 id_video=comentario.id_video,
                 num_seq=comentario.num_seq,
                 id_usuario=comentario.id_usuario,
-                valor=fake.pydecimal(left_digits=4, right_digits=2, positive=True),
-                status_pagamento=random.choice(list(StatusPagamento))
+                valor=valor,
+                status_pagamento=status_pagamento
             )
         )
     return doacoes
 
 
-def generate_pagamentos(fake: Faker, doacoes: list[Doacao]) -> tuple[list[Bitcoin], list[CartaoCredito], list[Paypal], list[MecPlat]]:
-    """Distribui as doações entre diferentes métodos de pagamento."""
+def generate_pagamentos(fake: Faker, doacoes: list[Doacao], offset: int = 0, key: int | None = None) -> tuple[list[Bitcoin], list[CartaoCredito], list[Paypal], list[MecPlat]]:
+    """Distribui as doações entre diferentes métodos de pagamento.
+    
+    Args:
+        fake: Instância do Faker
+        doacoes: Doações (objetos ou linhas com id_video, num_seq e id_usuario)
+        offset: Posição da primeira doação no fluxo; torna únicos cartões e IDs de pagamento
+        key: Chave dos números de cartão, compartilhada entre os trechos
+    """
     bitcoins: list[Bitcoin] = []
     cartoes: list[CartaoCredito] = []
     paypals: list[Paypal] = []
     mec_plats: list[MecPlat] = []
 
-    doacoes_shuffled = random.sample(doacoes, len(doacoes))
+    doacoes_shuffled = [doacoes[i] for i in numpy_rng().permutation(len(doacoes)).tolist()]
     
     num_doacoes = len(doacoes_shuffled)
     split1 = num_doacoes // 4
     split2 = num_doacoes // 2
     split3 = 3 * num_doacoes // 4
+    # Números de cartão (Luhn) derivados da posição no fluxo: únicos entre trechos
+    numeros = IdentifierService(key).card_numbers(range(offset + split1, offset + split2))
 
     for doacao in doacoes_shuffled[:split1]:
         bitcoins.append(Bitcoin(
@@ -44,28 +65,18 @@ def generate_pagamentos(fake: Faker, doacoes: list[Doacao]) -> tuple[list[Bitcoi
             tx_id=fake.sha256()
         ))
 
-    used_card_nums = set()
-    for doacao in doacoes_shuffled[split1:split2]:
-        card_num_raw = fake.credit_card_number()
-        # Limpa não-dígitos e trunca para 16 caracteres para caber no esquema quebrado
-        card_num_clean = "".join(filter(str.isdigit, card_num_raw))[:16]
-
-        while card_num_clean in used_card_nums:
-            card_num_raw = fake.credit_card_number()
-            card_num_clean = "".join(filter(str.isdigit, card_num_raw))[:16]
-
-        used_card_nums.add(card_num_clean)
+    for doacao, numero in zip(doacoes_shuffled[split1:split2], numeros):
         cartoes.append(
             CartaoCredito(
                 id_video_doacao=doacao.id_video,
                 seq_doacao=doacao.num_seq,
                 id_usuario=doacao.id_usuario,
-                num=card_num_clean,
+                num=numero,
                 bandeira=fake.credit_card_provider()
             )
         )
     
-    for i, doacao in enumerate(doacoes_shuffled[split2:split3]):
+    for i, doacao in enumerate(doacoes_shuffled[split2:split3], start=offset + split2):
         paypals.append(Paypal(
             id_video_doacao=doacao.id_video,
             seq_doacao=doacao.num_seq,
@@ -73,7 +84,7 @@ def generate_pagamentos(fake: Faker, doacoes: list[Doacao]) -> tuple[list[Bitcoi
             id=i
         ))
 
-    for i, doacao in enumerate(doacoes_shuffled[split3:]):
+    for i, doacao in enumerate(doacoes_shuffled[split3:], start=offset + split3):
         mec_plats.append(MecPlat(
             id_video_doacao=doacao.id_video,
             seq_doacao=doacao.num_seq,
@@ -82,3 +93,32 @@ def generate_pagamentos(fake: Faker, doacoes: list[Doacao]) -> tuple[list[Bitcoi
         ))
 
     return bitcoins, cartoes, paypals, mec_plats
+
+
+def iter_doacoes(fake: Faker, comentarios: Iterable[Comentario], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Doacao]:
+    """Variante em fluxo de generate_doacoes: percorre os comentários em trechos.
+    
+    Args:
+        comentarios: Iterável de comentários (objetos ou linhas com a chave), consumido sob demanda
+        chunk_size: Comentários considerados de uma vez
+    """
+    for chunk in chunks(comentarios, chunk_size):
+        yield from generate_doacoes(fake, chunk)
+
+
+def iter_pagamentos(fake: Faker, doacoes: Iterable[Doacao], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    key: int | None = None) -> Iterator[Bitcoin | CartaoCredito | Paypal | MecPlat]:
+    """Variante em fluxo de generate_pagamentos: percorre as doações em trechos.
+    
+    Args:
+        doacoes: Iterável de doações (objetos ou linhas com a chave), consumido sob demanda
+        chunk_size: Doações distribuídas de uma vez (cada trecho mantém a divisão em quartos)
+        key: Chave dos números de cartão (sorteada uma vez se omitida)
+    """
+    if key is None:
+        key = random.getrandbits(64)
+    offset = 0
+    for chunk in chunks(doacoes, chunk_size):
+        bitcoins, cartoes, paypals, mec_plats = generate_pagamentos(fake, chunk, offset, key)
+        yield from bitcoins + cartoes + paypals + mec_plats
+        offset += len(chunk)
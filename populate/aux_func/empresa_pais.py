@@ -2,27 +2,32 @@
 
 from faker import Faker
 from models import EmpresaPais, Empresa, Pais
-import random
+from .permutation import sample_pairs
+from .identifiers import IdentifierService
 
 
-def generate_empresa_paises(fake: Faker, empresas: list[Empresa], paises: list[Pais], count: int) -> list[EmpresaPais]:
-    """Gera relações fictícias entre empresas e países."""
+def generate_empresa_paises(fake: Faker, count: int, empresas: list[Empresa] | list[int], paises: list[Pais] | list[int],
+                            offset: int = 0, key: int | None = None) -> list[EmpresaPais]:
+    """Gera relações fictícias entre empresas e países (pares sorteados sem rejeição).
+
+    O ID nacional é a imagem da posição global da relação por uma permutação
+    com chave (formato de CNPJ), único entre lotes que compartilham a chave.
+
+    Args:
+        empresas: Lista de objetos Empresa OU lista de nros de empresas
+        paises: Lista de objetos Pais OU lista de DDIs
+    """
+    idx_empresas, idx_paises = sample_pairs(len(empresas), len(paises), count, offset, key)
+    ids_nacionais = IdentifierService(key).cnpjs(range(offset, offset + len(idx_empresas)))
     empresa_paises: list[EmpresaPais] = []
-    pairs = set()
-    max_possible = len(empresas) * len(paises)
-    if count > max_possible:
-        count = max_possible
-    
-    while len(empresa_paises) < count:
-        empresa = random.choice(empresas)
-        pais = random.choice(paises)
-        if (empresa.nro, pais.ddi) not in pairs:
-            pairs.add((empresa.nro, pais.ddi))
-            empresa_paises.append(
-                EmpresaPais(
-                    nro_empresa=empresa.nro,
-                    ddi_pais=pais.ddi,
-                    id_nacional=fake.unique.bban()
-                )
+    for i, j, id_nacional in zip(idx_empresas.tolist(), idx_paises.tolist(), ids_nacionais):
+        empresa = empresas[i]
+        pais = paises[j]
+        empresa_paises.append(
+            EmpresaPais(
+                nro_empresa=empresa.nro if hasattr(empresa, 'nro') else empresa,
+                ddi_pais=pais.ddi if hasattr(pais, 'ddi') else pais,
+                id_nacional=id_nacional
             )
+        )
     return empresa_paises
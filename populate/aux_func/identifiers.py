@@ -0,0 +1,125 @@
+"""Identificadores de negócio únicos, sem rejeição e sem estado.
+
+Cada formato é uma permutação com chave (`KeyedPermutation`) sobre o seu
+espaço de valores: a posição global da linha (offset do lote + índice) é
+levada a um valor distinto, de aparência aleatória e já no formato da
+coluna. Lotes com offsets disjuntos e a mesma chave nunca repetem valores,
+sem guardar os já emitidos e sem laços "sorteia até ser único".
+"""
+
+import random
+
+import numpy as np
+
+from .permutation import KeyedPermutation
+
+
+# Números de usuário na plataforma: 10000000 a 99999999
+PLATFORM_USER_NUMBERS = 90_000_000
+# Cartões: prefixo do emissor (6) + corpo permutado (9) + dígito de Luhn (1)
+CARD_BODY_NUMBERS = 10 ** 9
+# Prefixos (IIN) de emissores conhecidos, todos de cartões com 16 dígitos
+CARD_PREFIXES = ('411111', '455673', '492181', '510510', '522233', '545454', '601100', '356600')
+# Passaportes no formato brasileiro: 2 letras + 6 dígitos
+PASSPORT_NUMBERS = 26 * 26 * 10 ** 6
+# Raiz do CNPJ (8 dígitos); a filial é sempre 0001
+CNPJ_ROOTS = 10 ** 8
+_CNPJ_WEIGHTS_1 = np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+_CNPJ_WEIGHTS_2 = np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+
+# Deriva a chave de cada formato a partir da chave do serviço
+NRO_USUARIO_KEY = 0x5A17_C0DE
+CARD_KEY = 0xCA4D_0001
+PASSPORT_KEY = 0x9A55_0001
+CNPJ_KEY = 0xC4E1_0001
+
+
+def _digits(values: np.ndarray, width: int) -> np.ndarray:
+    """Matriz (n, width) com os dígitos decimais de cada valor, do mais significativo ao menos."""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (np.asarray(values, dtype=np.int64)[:, None] // powers) % 10
+
+
+def luhn_check_digits(payloads: np.ndarray, width: int) -> np.ndarray:
+    """Dígito verificador de Luhn de cada número (sem o dígito) com `width` dígitos."""
+    digits = _digits(payloads, width)
+    # Dobra-se a partir do dígito mais à direita do número sem o verificador
+    doubled = digits[:, width - 1::-2] * 2
+    total = digits[:, width - 2::-2].sum(axis=1) + (doubled - 9 * (doubled > 9)).sum(axis=1)
+    return (10 - total % 10) % 10
+
+
+def _cnpj_check_digit(digits: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    remainder = (digits * weights).sum(axis=1) % 11
+    return np.where(remainder < 2, 0, 11 - remainder)
+
+
+class IdentifierService:
+    """
+    Gera identificadores únicos e formatados a partir de contadores.
+
+    Características:
+    - O(1) por valor, vetorizado com numpy, sem memória de rastreamento
+    - Mesma chave e contador produzem o mesmo valor em qualquer processo
+    - Uma permutação independente por formato (chaves derivadas da chave do serviço)
+    """
+
+    def __init__(self, key: int | None = None):
+        """
+        Inicializa o IdentifierService.
+
+        Args:
+            key: Chave das permutações, compartilhada entre os lotes (aleatória se omitida)
+        """
+        self.key = random.getrandbits(64) if key is None else key
+        self._permutations: dict[int, KeyedPermutation] = {}
+
+    def _permute(self, counters, size: int, salt: int, what: str) -> np.ndarray:
+        counters = np.asarray(counters, dtype=np.int64)
+        if counters.size and (counters.min() < 0 or counters.max() >= size):
+            raise ValueError(f"Contador fora do espaço de {what} ({size:,} valores).")
+        if salt not in self._permutations:
+            self._permutations[salt] = KeyedPermutation(size, self.key ^ salt)
+        return self._permutations[salt].permute(counters)
+
+    def platform_user_numbers(self, counters) -> np.ndarray:
+        """Números de usuário na plataforma, com 8 dígitos (10000000 a 99999999)."""
+        return self._permute(counters, PLATFORM_USER_NUMBERS, NRO_USUARIO_KEY, "números de usuário") + 10_000_000
+
+    def card_numbers(self, counters, rng: np.random.Generator | None = None) -> list[str]:
+        """
+        Números de cartão com 16 dígitos e dígito verificador de Luhn válido.
+
+        O corpo permutado já é único; o prefixo do emissor é sorteado por
+        linha e não afeta a unicidade.
+
+        Args:
+            counters: Posições globais dos cartões
+            rng: Gerador para sortear os prefixos (semeado pelo `random` se omitido)
+        """
+        bodies = self._permute(counters, CARD_BODY_NUMBERS, CARD_KEY, "cartões")
+        if rng is None:
+            rng = np.random.default_rng(random.getrandbits(64))
+        prefixes = np.array(CARD_PREFIXES, dtype=np.int64)[rng.integers(0, len(CARD_PREFIXES), size=bodies.size)]
+        payloads = prefixes * CARD_BODY_NUMBERS + bodies
+        numbers = payloads * 10 + luhn_check_digits(payloads, 15)
+        return [f"{number:016d}" for number in numbers.tolist()]
+
+    def passports(self, counters) -> list[str]:
+        """Números de passaporte no formato AA000000."""
+        values = self._permute(counters, PASSPORT_NUMBERS, PASSPORT_KEY, "passaportes").tolist()
+        return [
+            f"{chr(65 + value // 26_000_000)}{chr(65 + value // 10 ** 6 % 26)}{value % 10 ** 6:06d}"
+            for value in values
+        ]
+
+    def cnpjs(self, counters) -> list[str]:
+        """IDs nacionais no formato de CNPJ (XX.XXX.XXX/0001-XX), com dígitos verificadores válidos."""
+        roots = self._permute(counters, CNPJ_ROOTS, CNPJ_KEY, "CNPJs")
+        digits = _digits(roots * 10_000 + 1, 12)
+        first = _cnpj_check_digit(digits, _CNPJ_WEIGHTS_1)
+        second = _cnpj_check_digit(np.column_stack([digits, first]), _CNPJ_WEIGHTS_2)
+        return [
+            f"{root // 10 ** 6:02d}.{root // 1000 % 1000:03d}.{root % 1000:03d}/0001-{d1}{d2}"
+            for root, d1, d2 in zip(roots.tolist(), first.tolist(), second.tolist())
+        ]
@@ -2,38 +2,36 @@
 
 from faker import Faker
 from models import Inscricao, NivelCanal, Usuario
-import random
+from .skew import skewed_pairs
 
 
-def generate_inscricoes(niveis: list[NivelCanal], usuarios: list[Usuario], count: int, pairs_state: set = None) -> list[Inscricao]:
+def generate_inscricoes(fake: Faker, count: int, niveis: list[NivelCanal] | list[int], usuarios: list[Usuario] | list[int],
+                        offset: int = 0, key: int | None = None, skew: float = 0.0,
+                        total_pairs: int | None = None) -> list[Inscricao]:
     """Gera inscrições de usuários em níveis de canal.
     
+    Os pares (nível, usuário) são sorteados sem rejeição por uma permutação
+    com chave: lotes com a mesma chave e offsets disjuntos nunca se repetem.
+    
     Args:
-        pairs_state: Estado compartilhado para rastrear pares (nivel, usuario) entre lotes
+        fake: Instância do Faker (não utilizada; mantém a assinatura dos lotes)
+        count: Número de inscrições do lote
+        niveis: Lista de objetos NivelCanal OU lista/faixa de IDs de níveis
+        usuarios: Lista de objetos Usuario OU lista/faixa de IDs de usuários
+        offset: Posição do lote na sequência de pares
+        key: Chave da permutação, compartilhada entre os lotes
+        skew: Expoente da popularidade (Zipf) dos níveis; 0 = uniforme
+        total_pairs: Total de inscrições de todos os lotes (obrigatório com skew)
     """
+    idx_niveis, idx_usuarios = skewed_pairs(len(niveis), len(usuarios), count, offset, key, skew, total_pairs)
     inscricoes: list[Inscricao] = []
-    if pairs_state is None:
-        pairs = set()
-    else:
-        pairs = pairs_state
-        
-    max_possible = len(niveis) * len(usuarios)
-    if count > max_possible:
-        count = max_possible
-
-    attempts = 0
-    max_attempts = count * 10  # Evita loop infinito
-    
-    while len(inscricoes) < count and attempts < max_attempts:
-        attempts += 1
-        nivel = random.choice(niveis)
-        usuario = random.choice(usuarios)
-        if (nivel.id, usuario.id) not in pairs:
-            pairs.add((nivel.id, usuario.id))
-            inscricoes.append(
-                Inscricao(
-                    id_nivel=nivel.id,
-                    id_membro=usuario.id
-                )
+    for i, j in zip(idx_niveis.tolist(), idx_usuarios.tolist()):
+        nivel = niveis[i]
+        usuario = usuarios[j]
+        inscricoes.append(
+            Inscricao(
+                id_nivel=nivel.id if hasattr(nivel, 'id') else nivel,
+                id_membro=usuario.id if hasattr(usuario, 'id') else usuario
             )
+        )
     return inscricoes
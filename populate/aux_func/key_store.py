@@ -0,0 +1,38 @@
+"""Chaves compactas de pares de IDs, vetorizadas com numpy.
+
+Um par `(a, b)` vira um único int64 `a << 32 | b`: em vez de um dicionário
+de tuplas, contagens e ranks por par são calculados sobre o array de chaves.
+"""
+
+from typing import Iterable
+
+import numpy as np
+
+
+# IDs das tabelas são INTEGER (int4): cabem em 32 bits
+_KEY_BITS = 32
+_KEY_LIMIT = 1 << _KEY_BITS
+
+
+def pack_pairs(a: Iterable[int], b: Iterable[int]) -> np.ndarray:
+    """Codifica pares de IDs não negativos de 32 bits em chaves int64 (a << 32 | b)."""
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    if a.size and (a.min() < 0 or a.max() >= _KEY_LIMIT or b.min() < 0 or b.max() >= _KEY_LIMIT):
+        raise ValueError("Os componentes dos pares devem estar entre 0 e 2**32 - 1.")
+    return (a << _KEY_BITS) | b
+
+
+def occurrence_ranks(keys: np.ndarray) -> np.ndarray:
+    """Para cada posição, quantas vezes a mesma chave já apareceu antes dela (0, 1, 2...)."""
+    keys = np.asarray(keys)
+    if keys.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    order = np.argsort(keys, kind='stable')
+    ordered = keys[order]
+    # Início do grupo de chaves iguais de cada posição (na ordem ordenada)
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, ordered.size]))
+    ranks = np.empty(keys.size, dtype=np.int64)
+    ranks[order] = np.arange(keys.size) - group_start
+    return ranks
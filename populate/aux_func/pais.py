@@ -5,13 +5,19 @@ from models import Pais, Conversao
 import random
 
 
-def generate_paises(fake: Faker, count: int, conversoes: list[Conversao]) -> list[Pais]:
-    """Gera uma lista de países fictícios, garantindo DDIs únicos."""
+def generate_paises(fake: Faker, count: int, conversoes: list[Conversao] | list[int]) -> list[Pais]:
+    """Gera uma lista de países fictícios, garantindo DDIs únicos.
+
+    Args:
+        conversoes: Lista de objetos Conversao OU lista de IDs de moedas
+    """
     paises: list[Pais] = []
     ddis_gerados = set()
     if not conversoes:
         raise ValueError("A lista de conversões não pode estar vazia para gerar países.")
 
+    moedas = [conversao.id if hasattr(conversao, 'id') else conversao for conversao in conversoes]
+
     while len(paises) < count:
         try:
             ddi = int(fake.country_calling_code().replace('+', '').replace(' ', ''))
@@ -21,7 +27,7 @@ def generate_paises(fake: Faker, count: int, conversoes: list[Conversao]) -> lis
                     Pais(
                         ddi=ddi,
                         nome=fake.country(),
-                        id_moeda=random.choice(conversoes).id
+                        id_moeda=random.choice(moedas)
                     )
                 )
         except ValueError:
@@ -2,27 +2,31 @@
 
 from faker import Faker
 from models import Patrocinio, Empresa, Canal
-import random
+from .permutation import sample_pairs
+from .skew import skewed_pairs
 
 
-def generate_patrocinios(fake: Faker, empresas: list[Empresa], canais: list[Canal], count: int) -> list[Patrocinio]:
-    """Gera patrocínios fictícios entre empresas e canais."""
-    patrocinios: list[Patrocinio] = []
-    pairs = set()
-    max_possible = len(empresas) * len(canais)
-    if count > max_possible:
-        count = max_possible
+def generate_patrocinios(fake: Faker, count: int, empresas: list[Empresa] | list[int], canais: list[Canal] | list[int],
+                         offset: int = 0, key: int | None = None, skew: float = 0.0,
+                         total_pairs: int | None = None) -> list[Patrocinio]:
+    """Gera patrocínios fictícios entre empresas e canais (aceita objetos ou IDs; pares sorteados sem rejeição).
 
-    while len(patrocinios) < count:
-        empresa = random.choice(empresas)
-        canal = random.choice(canais)
-        if (empresa.nro, canal.id) not in pairs:
-            pairs.add((empresa.nro, canal.id))
-            patrocinios.append(
-                Patrocinio(
-                    nro_empresa=empresa.nro,
-                    id_canal=canal.id,
-                    valor=fake.pydecimal(left_digits=8, right_digits=2, positive=True)
-                )
+    Com `skew` > 0, os canais seguem uma popularidade Zipf (poucos canais
+    concentram os patrocínios); `total_pairs` é então obrigatório.
+    """
+    if skew > 0:
+        idx_canais, idx_empresas = skewed_pairs(len(canais), len(empresas), count, offset, key, skew, total_pairs)
+    else:
+        idx_empresas, idx_canais = sample_pairs(len(empresas), len(canais), count, offset, key)
+    patrocinios: list[Patrocinio] = []
+    for i, j in zip(idx_empresas.tolist(), idx_canais.tolist()):
+        empresa = empresas[i]
+        canal = canais[j]
+        patrocinios.append(
+            Patrocinio(
+                nro_empresa=empresa.nro if hasattr(empresa, 'nro') else empresa,
+                id_canal=canal.id if hasattr(canal, 'id') else canal,
+                valor=fake.pydecimal(left_digits=8, right_digits=2, positive=True)
             )
+        )
     return patrocinios
@@ -0,0 +1,107 @@
+"""Permutação com chave (rede de Feistel) para amostragem sem rejeição.
+
+Uma permutação pseudoaleatória de [0, size) permite sortear índices
+distintos sem guardar os já sorteados: os índices `offset..offset+count` de
+cada lote são permutados e, como a permutação é uma bijeção, lotes com
+offsets disjuntos nunca repetem valores. Cada índice vira um par
+(i // len(b), i % len(b)) nas tabelas de relacionamento.
+
+A rede de Feistel atua sobre o menor domínio de 2^(2k) bits que contém
+`size`; valores fora de [0, size) são re-cifrados até caírem no intervalo
+(cycle walking), o que leva em média menos de 4 rodadas extras.
+"""
+
+import random
+
+import numpy as np
+
+
+_MUL_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MUL_2 = np.uint64(0x94D049BB133111EB)
+_SHIFT_1 = np.uint64(30)
+_SHIFT_2 = np.uint64(27)
+
+
+class KeyedPermutation:
+    """
+    Bijeção pseudoaleatória de [0, size) definida por uma chave.
+
+    Características:
+    - O(1) por índice, vetorizada com numpy
+    - Mesma chave e tamanho produzem a mesma permutação em qualquer processo
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, size: int, key: int):
+        """
+        Inicializa a permutação.
+
+        Args:
+            size: Tamanho do domínio [0, size)
+            key: Chave da permutação (compartilhada entre os lotes)
+        """
+        if size <= 0:
+            raise ValueError("O tamanho da permutação deve ser positivo")
+        self.size = size
+        bits = max(2, (size - 1).bit_length())
+        bits += bits % 2
+        self.half_bits = np.uint64(bits // 2)
+        self.mask = np.uint64((1 << (bits // 2)) - 1)
+        key_rng = random.Random(key)
+        self.round_keys = [np.uint64(key_rng.getrandbits(64)) for _ in range(self.ROUNDS)]
+
+    def _round(self, right: np.ndarray, round_key: np.uint64) -> np.ndarray:
+        # Mistura no estilo splitmix64 (aritmética modular em uint64)
+        x = (right ^ round_key) * _MUL_1
+        x ^= x >> _SHIFT_1
+        x *= _MUL_2
+        x ^= x >> _SHIFT_2
+        return x & self.mask
+
+    def _encrypt(self, values: np.ndarray) -> np.ndarray:
+        left = values >> self.half_bits
+        right = values & self.mask
+        for round_key in self.round_keys:
+            left, right = right, left ^ self._round(right, round_key)
+        return (left << self.half_bits) | right
+
+    def permute(self, indices: np.ndarray) -> np.ndarray:
+        """Aplica a permutação a um array de índices em [0, size)."""
+        values = self._encrypt(np.asarray(indices, dtype=np.uint64))
+        outside = np.flatnonzero(values >= self.size)
+        while outside.size:
+            values[outside] = self._encrypt(values[outside])
+            outside = outside[values[outside] >= self.size]
+        return values.astype(np.int64)
+
+    def permute_range(self, start: int, count: int) -> np.ndarray:
+        """Permuta os índices start, start+1, ..., start+count-1."""
+        return self.permute(np.arange(start, start + count, dtype=np.uint64))
+
+
+def sample_pairs(len_a: int, len_b: int, count: int, offset: int = 0, key: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Sorteia pares (i, j) distintos de [0, len_a) x [0, len_b), sem rejeição.
+
+    Lotes que usam a mesma chave e offsets disjuntos nunca repetem pares.
+    A quantidade é exata, limitada apenas ao total de pares possíveis.
+
+    Args:
+        len_a: Quantidade de elementos do primeiro lado
+        len_b: Quantidade de elementos do segundo lado
+        count: Quantidade de pares do lote
+        offset: Posição do lote na sequência de pares
+        key: Chave da permutação (obrigatória quando há mais de um lote)
+
+    Returns:
+        Tupla (índices em a, índices em b)
+    """
+    total = len_a * len_b
+    count = max(0, min(count, total - offset))
+    if count == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    if key is None:
+        key = random.getrandbits(64)
+    flat = KeyedPermutation(total, key).permute_range(offset, count)
+    return flat // len_b, flat % len_b
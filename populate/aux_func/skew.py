@@ -0,0 +1,168 @@
+"""Popularidade assimétrica (Zipf) dos pais de um relacionamento.
+
+Com sorteio uniforme, todo vídeo recebe quase o mesmo número de comentários
+e todo canal quase a mesma receita. Aqui o pai de posição r no ranking de
+popularidade recebe peso 1 / (r + 1)^s (Zipf truncada em n pais), e o
+ranking é espalhado pelos IDs por uma permutação com chave, de modo que os
+pais "quentes" são os mesmos em todos os lotes que compartilham a chave.
+Com expoente 0 as funções delegam ao caminho uniforme, sem alterar os dados.
+
+- com reposição (comentários): inversão da CDF com `searchsorted`
+- pares únicos (inscrições, patrocínios, participações): cada pai recebe uma
+  cota de pares proporcional ao peso, limitada ao tamanho do outro lado; a
+  posição global do par é permutada e localizada na cota do seu pai
+"""
+
+import math
+import random
+from functools import lru_cache
+from typing import Any, Sequence
+
+import numpy as np
+
+from .columns import choose_ids, ids_at
+from .permutation import KeyedPermutation, sample_pairs
+
+
+# Deriva a chave do ranking de popularidade a partir da chave do relacionamento
+SKEW_KEY = 0x21FF_0001
+
+
+@lru_cache(maxsize=8)
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    return np.arange(1, n + 1, dtype=np.float64) ** -exponent
+
+
+@lru_cache(maxsize=8)
+def _zipf_cdf(n: int, exponent: float) -> np.ndarray:
+    cdf = np.cumsum(_zipf_weights(n, exponent))
+    return cdf / cdf[-1]
+
+
+def top_share(n: int, exponent: float, fraction: float = 0.01) -> float:
+    """Fração das linhas que vai para os `fraction` pais mais populares, dado o expoente."""
+    weights = _zipf_weights(n, exponent)
+    return float(weights[:max(1, math.ceil(fraction * n))].sum() / weights.sum())
+
+
+def zipf_exponent(n: int, share: float, fraction: float = 0.01) -> float:
+    """
+    Expoente que leva `share` das linhas aos `fraction` pais mais populares.
+
+    Args:
+        n: Número de pais
+        share: Fração desejada das linhas (maior que `fraction`)
+        fraction: Fração dos pais considerada "topo"
+
+    Returns:
+        Expoente da Zipf (busca binária; 0 se o topo já cobre a fração pedida)
+    """
+    if top_share(n, 0.0, fraction) >= share:
+        return 0.0
+    low, high = 0.0, 8.0
+    for _ in range(40):
+        middle = (low + high) / 2
+        if top_share(n, middle, fraction) < share:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+def skewed_indices(rng: np.random.Generator, n: int, count: int, exponent: float, key: int | None = None) -> np.ndarray:
+    """
+    Sorteia `count` índices de [0, n) com reposição e popularidade Zipf.
+
+    Args:
+        rng: Gerador numpy do lote
+        n: Número de pais
+        count: Quantidade de índices
+        exponent: Expoente da Zipf (0 = uniforme)
+        key: Chave do ranking, compartilhada entre os lotes
+    """
+    if exponent <= 0:
+        return rng.integers(0, n, size=count)
+    if key is None:
+        key = random.getrandbits(64)
+    ranks = np.minimum(np.searchsorted(_zipf_cdf(n, exponent), rng.random(count), side='right'), n - 1)
+    return KeyedPermutation(n, key ^ SKEW_KEY).permute(ranks)
+
+
+def choose_skewed_ids(rng: np.random.Generator, items: Sequence[Any], count: int, exponent: float,
+                      key: int | None = None) -> np.ndarray:
+    """Como `choose_ids`, mas com popularidade Zipf (expoente 0 = exatamente `choose_ids`)."""
+    if exponent <= 0:
+        return choose_ids(rng, items, count)
+    return ids_at(items, skewed_indices(rng, len(items), count, exponent, key))
+
+
+@lru_cache(maxsize=8)
+def _pair_quotas(len_hot: int, len_other: int, total: int, exponent: float) -> tuple[np.ndarray, np.ndarray]:
+    # Os pesos decrescem com o ranking, logo os pais que estouram o limite
+    # (len_other pares) formam um prefixo: c é o menor prefixo tal que o
+    # restante, dividido pelos pesos dos demais, não estoura mais nenhum
+    weights = _zipf_weights(len_hot, exponent)
+    tail = np.cumsum(weights[::-1])[::-1]
+    capped = np.arange(len_hot)
+    fits = (total - capped * len_other) * weights <= len_other * tail
+    c = int(np.argmax(fits)) if fits.any() else len_hot
+    quotas = np.full(len_hot, len_other, dtype=np.float64)
+    if c < len_hot:
+        quotas[c:] = (total - c * len_other) * weights[c:] / tail[c]
+    # Arredondamento preservando o total (maiores restos recebem +1)
+    floors = np.floor(quotas).astype(np.int64)
+    missing = total - int(floors.sum())
+    if missing > 0:
+        floors[np.argsort(floors - quotas, kind='stable')[:missing]] += 1
+    return floors, np.cumsum(floors)
+
+
+def _coprime_step(n: int) -> int:
+    # Passo próximo da razão áurea de n e primo com n: r -> r * passo mod n é uma bijeção
+    step = max(1, int(n * 0.6180339887)) | 1
+    while math.gcd(step, n) != 1:
+        step += 2 if n % 2 == 0 else 1
+    return step
+
+
+def skewed_pairs(len_hot: int, len_other: int, count: int, offset: int = 0, key: int | None = None,
+                 exponent: float = 0.0, total_pairs: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Sorteia pares (i, j) distintos com popularidade Zipf no lado `hot`, sem rejeição.
+
+    Os pares continuam únicos entre lotes com a mesma chave e offsets
+    disjuntos. Com expoente 0 equivale a `sample_pairs`.
+
+    Args:
+        len_hot: Quantidade de elementos do lado com popularidade assimétrica
+        len_other: Quantidade de elementos do outro lado
+        count: Quantidade de pares do lote
+        offset: Posição do lote na sequência de pares
+        key: Chave das permutações (obrigatória quando há mais de um lote)
+        exponent: Expoente da Zipf (0 = uniforme)
+        total_pairs: Total de pares de todos os lotes (define as cotas por pai)
+
+    Returns:
+        Tupla (índices no lado hot, índices no outro lado)
+    """
+    if exponent <= 0:
+        return sample_pairs(len_hot, len_other, count, offset, key)
+    if total_pairs is None:
+        raise ValueError("O total de pares é obrigatório para sortear pares com popularidade assimétrica.")
+    total = min(total_pairs, len_hot * len_other)
+    count = max(0, min(count, total - offset))
+    if count == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    if key is None:
+        key = random.getrandbits(64)
+
+    quotas, ends = _pair_quotas(len_hot, len_other, total, exponent)
+    # Posição global permutada -> pai (pela cota) e posição dentro da cota
+    flat = KeyedPermutation(total, key).permute_range(offset, count)
+    ranks = np.searchsorted(ends, flat, side='right')
+    within = flat - (ends[ranks] - quotas[ranks])
+    hot = KeyedPermutation(len_hot, key ^ SKEW_KEY).permute(ranks)
+    # Posições distintas na cota de um pai levam a elementos distintos do outro lado
+    start = (hot * 0x9E3779B1) % len_other
+    other = (within * _coprime_step(len_other) + start) % len_other
+    return hot, other
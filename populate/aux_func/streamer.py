@@ -2,27 +2,32 @@
 
 from faker import Faker
 from models import StreamerPais, Usuario, Pais
-import random
+from .permutation import sample_pairs
+from .identifiers import IdentifierService
 
 
-def generate_streamer_paises(fake: Faker, streamers: list[Usuario], paises: list[Pais], count: int) -> list[StreamerPais]:
-    """Gera relações fictícias de nacionalidade para streamers."""
-    streamer_paises: list[StreamerPais] = []
-    pairs = set()
-    max_possible_pairs = len(streamers) * len(paises)
-    if count > max_possible_pairs:
-        count = max_possible_pairs
+def generate_streamer_paises(fake: Faker, count: int, streamers: list[Usuario] | list[int], paises: list[Pais] | list[int],
+                             offset: int = 0, key: int | None = None) -> list[StreamerPais]:
+    """Gera relações fictícias de nacionalidade para streamers (pares sorteados sem rejeição).
+
+    O passaporte é a imagem da posição global da relação por uma permutação
+    com chave (formato AA000000), único entre lotes que compartilham a chave.
 
-    while len(streamer_paises) < count:
-        streamer = random.choice(streamers)
-        pais = random.choice(paises)
-        if (streamer.id, pais.ddi) not in pairs:
-            pairs.add((streamer.id, pais.ddi))
-            streamer_paises.append(
-                StreamerPais(
-                    id_usuario=streamer.id,
-                    ddi_pais=pais.ddi,
-                    nro_passaporte=fake.unique.ssn()
-                )
+    Args:
+        streamers: Lista de objetos Usuario OU lista/faixa de IDs de streamers
+        paises: Lista de objetos Pais OU lista de DDIs
+    """
+    idx_streamers, idx_paises = sample_pairs(len(streamers), len(paises), count, offset, key)
+    passaportes = IdentifierService(key).passports(range(offset, offset + len(idx_streamers)))
+    streamer_paises: list[StreamerPais] = []
+    for i, j, passaporte in zip(idx_streamers.tolist(), idx_paises.tolist(), passaportes):
+        streamer = streamers[i]
+        pais = paises[j]
+        streamer_paises.append(
+            StreamerPais(
+                id_usuario=streamer.id if hasattr(streamer, 'id') else streamer,
+                ddi_pais=pais.ddi if hasattr(pais, 'ddi') else pais,
+                nro_passaporte=passaporte
             )
+        )
     return streamer_paises
@@ -0,0 +1,33 @@
+"""Geração em fluxo: linhas produzidas em trechos de tamanho fixo.
+
+As funções `generate_*` devolvem listas completas, o que é adequado para um
+lote. As variantes `iter_*` percorrem a entrada (ou a contagem total) em
+trechos e repassam as linhas uma a uma, de modo que apenas um trecho fica
+materializado por vez; o BatchInserter reagrupa o fluxo em lotes de escrita.
+"""
+
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
+
+from faker import Faker
+
+
+# Tamanho padrão dos trechos gerados de uma vez (vetorização numpy por trecho)
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def chunks(items: Iterable[Any], size: int) -> Iterator[list]:
+    """Agrupa um iterável em listas de até `size` elementos."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def iter_generated(generator_func: Callable, fake: Faker, count: int, chunk_size: int, *args, **kwargs) -> Iterator[Any]:
+    """Gera `count` linhas com uma função no formato dos lotes (fake, count, *args, offset, **kwargs).
+
+    Os trechos recebem offsets disjuntos, como os lotes do BatchInserter, mas
+    são gerados no próprio processo (ex: entradas com objetos do ORM).
+    """
+    for offset in range(0, count, chunk_size):
+        yield from generator_func(fake, min(chunk_size, count - offset), *args, offset, **kwargs)
@@ -5,15 +5,17 @@ from models import Usuario, Pais
 import random
 
 
-def generate_usuarios(fake: Faker, count: int, paises: list[Pais], offset: int = 0) -> list[Usuario]:
+def generate_usuarios(fake: Faker, count: int, paises: list[Pais] | list[int], offset: int = 0, id_start: int | None = None) -> list[Usuario]:
     """Gera uma lista de usuários fictícios.
     
     Args:
         fake: Instância do Faker
         count: Quantidade de usuários a gerar
-        paises: Lista de países disponíveis
+        paises: Lista de objetos Pais OU lista de DDIs dos países disponíveis
         offset: Offset para garantir unicidade de nick/email entre lotes
+        id_start: Primeiro ID da faixa reservada (None deixa o banco gerar os IDs)
     """
+    ddis = [pais.ddi if hasattr(pais, 'ddi') else pais for pais in paises]
     usuarios: list[Usuario] = []
     for i in range(count):
         # Manually ensure uniqueness for nick and email to support large quantities,
@@ -26,11 +28,12 @@ def generate_usuarios(fake: Faker, count: int, paises: list[Pais], offset: int =
 
         usuarios.append(
             Usuario(
+                id=id_start + unique_id if id_start is not None else None,
                 nick=unique_nick,
                 email=unique_email,
                 data_nasc=fake.date_of_birth(minimum_age=13, maximum_age=80),
                 telefone=fake.phone_number(),
-                pais_residencia=random.choice(paises).ddi if paises else None,
+                pais_residencia=random.choice(ddis) if ddis else None,
                 end_postal=fake.postcode()
             )
         )
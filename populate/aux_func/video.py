@@ -2,51 +2,68 @@
 
 from faker import Faker
 from models import Video, Participa, Canal, Usuario
-import random
-from datetime import timedelta
+from .columns import numpy_rng, choose_ids, datetimes_this_year, durations, integers
+from .permutation import sample_pairs
+from .skew import skewed_pairs
 
 
-def generate_videos(fake: Faker, count: int, canais: list[Canal], offset: int = 0) -> list[Video]:
+def generate_videos(fake: Faker, count: int, canais: list[Canal] | list[int], offset: int = 0, id_start: int | None = None) -> list[Video]:
     """Gera uma lista de vídeos fictícios.
     
     Args:
+        canais: Lista de objetos Canal OU lista de IDs de canais
         offset: Offset para garantir unicidade de títulos entre lotes
+        id_start: Primeiro ID da faixa reservada (None deixa o banco gerar os IDs)
     """
+    # Colunas numéricas e temporais geradas de uma vez; as linhas são montadas no final
+    rng = numpy_rng()
+    canal_ids = choose_ids(rng, canais, count).tolist()
+    datas = datetimes_this_year(rng, count)
+    # Até 4h59m59s, como horas 0-4, minutos 0-59 e segundos 0-59
+    duracoes = durations(rng, 5 * 3600 - 1, count)
+    visu_simult = integers(rng, 0, 10000, count)
+    visu_total = integers(rng, 10000, 1000000, count)
+    
     videos: list[Video] = []
     for i in range(count):
         # Adiciona offset + i ao título para garantir unicidade entre lotes
         unique_id = offset + i
         videos.append(
             Video(
-                id_canal=random.choice(canais).id,
+                id=id_start + unique_id if id_start is not None else None,
+                id_canal=canal_ids[i],
                 titulo=f"{fake.sentence(nb_words=4)} {unique_id}",
-                data_h=fake.date_time_this_year(),
+                data_h=datas[i],
                 tema=fake.word(),
-                duracao=timedelta(hours=random.randint(0, 4), minutes=random.randint(0, 59), seconds=random.randint(0, 59)),
-                visu_simult=random.randint(0, 10000),
-                visu_total=random.randint(10000, 1000000)
+                duracao=duracoes[i],
+                visu_simult=visu_simult[i],
+                visu_total=visu_total[i]
             )
         )
     return videos
 
 
-def generate_participacoes(videos: list[Video], streamers: list[Usuario], count: int) -> list[Participa]:
-    """Gera participações de streamers em vídeos."""
+def generate_participacoes(fake: Faker, count: int, videos: list[Video] | list[int], streamers: list[Usuario] | list[int],
+                           offset: int = 0, key: int | None = None, skew: float = 0.0,
+                           total_pairs: int | None = None) -> list[Participa]:
+    """Gera participações de streamers em vídeos (aceita objetos ou IDs; pares sorteados sem rejeição).
+    
+    O Faker não é utilizado; a assinatura segue a dos lotes do BatchInserter.
+    Com `skew` > 0, os streamers seguem uma popularidade Zipf (poucos
+    streamers participam de muitos vídeos); `total_pairs` é então obrigatório.
+    """
+    if skew > 0:
+        idx_streamers, idx_videos = skewed_pairs(len(streamers), len(videos), count, offset, key, skew, total_pairs)
+    else:
+        idx_videos, idx_streamers = sample_pairs(len(videos), len(streamers), count, offset, key)
     participacoes: list[Participa] = []
-    pairs = set()
-    max_possible = len(videos) * len(streamers)
-    if count > max_possible:
-        count = max_possible
-
-    while len(participacoes) < count:
-        video = random.choice(videos)
-        streamer = random.choice(streamers)
-        if (video.id, streamer.id) not in pairs:
-            pairs.add((video.id, streamer.id))
-            participacoes.append(
-                Participa(
-                    id_video=video.id,
-                    id_streamer=streamer.id
-                )
+    for i, j in zip(idx_videos.tolist(), idx_streamers.tolist()):
+        video = videos[i]
+        streamer = streamers[j]
+        participacoes.append(
+            Participa(
+                id_video=video.id if hasattr(video, 'id') else video,
+                id_streamer=streamer.id if hasattr(streamer, 'id') else streamer
             )
+        )
     return participacoes
@@ -0,0 +1,18 @@
+"""
+Benchmarks - Medições de desempenho da população
+
+Executados a partir do diretório `populate`, como módulos:
+
+- generators.py: micro-benchmark dos geradores `aux_func` (sem banco)
+  python3 -m benchmarks.generators [--sizes=10000,100000] [--save] [--only=comentarios]
+- inserts.py: estratégias de inserção (ORM, executemany, execute_values,
+  insertmanyvalues, COPY) em um banco descartável do PostgreSQL local
+  python3 -m benchmarks.inserts [--strategies=orm,copy] [--batch-sizes=1000,10000] [--triggers=on,off]
+- queries.py: consultas de `consultas.sql` e views de faturamento, frias e
+  quentes, com EXPLAIN (ANALYZE, BUFFERS) e comparação da forma do plano
+  python3 -m benchmarks.queries [--populate=PRESET] [--warm=20] [--cold=5] [--plans=dir]
+
+As linhas de base ficam em `benchmarks/baselines/` e são comparadas a cada
+execução; elas dependem da máquina, então devem ser geradas (--save) no
+mesmo ambiente em que as comparações serão feitas.
+"""
@@ -0,0 +1,284 @@
+"""
+Micro-benchmark dos geradores `aux_func`, sem banco de dados.
+
+Cada gerador `generate_*` é executado em tamanhos fixos (10k, 100k e 1M
+linhas por padrão) com semente fixa e entradas sintéticas (faixas de IDs e
+objetos leves no lugar das linhas lidas do banco). Para cada caso são
+medidos:
+
+- linhas/s: melhor de `--repeat` execuções, sem tracemalloc
+- bytes/linha: pico alocado (tracemalloc) em uma execução separada
+
+Os resultados são comparados com a linha de base salva (se houver) e
+casos mais lentos ou que alocam mais que a tolerância são apontados como
+regressão (código de saída 1).
+
+Uso (a partir do diretório populate):
+    python3 -m benchmarks.generators
+    python3 -m benchmarks.generators --sizes=10000,100000 --only=comentarios,pagamentos
+    python3 -m benchmarks.generators --save   # grava a linha de base
+
+Opções:
+    --sizes=N,N,...     Tamanhos dos lotes (padrão: 10000,100000,1000000)
+    --repeat=N          Execuções cronometradas por caso (padrão: 3)
+    --only=a,b          Apenas os geradores cujo nome contém um dos termos
+    --save              Grava os resultados como nova linha de base
+    --baseline=arquivo  Arquivo da linha de base (padrão: baselines/generators.json)
+    --tolerance=0.10    Variação aceita antes de apontar regressão
+"""
+
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import faker
+import numpy as np
+from faker import Faker
+
+from aux_func import (
+    generate_empresas, generate_conversoes, generate_paises, generate_plataformas,
+    generate_plataforma_usuarios, generate_usuarios, generate_streamer_paises,
+    generate_empresa_paises, generate_canais, generate_nivel_canais, generate_patrocinios,
+    generate_inscricoes, generate_videos, generate_participacoes, generate_comentarios,
+    generate_doacoes, generate_pagamentos, generate_comentarios_com_doacoes,
+)
+from main import parse_options
+from main_module.memory import format_size
+
+
+SEED = 42
+SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'generators.json')
+
+# Quantidades fixas do domínio (não escalam com o tamanho do caso)
+N_PAISES = 192
+N_PLATAFORMAS = 10
+NIVEIS_POR_CANAL = 3
+
+
+class Chave(NamedTuple):
+    """Chave de comentário/doação, como as linhas lidas do banco nos níveis 8 e 9."""
+    id_video: int
+    num_seq: int
+    id_usuario: int
+
+
+class Case(NamedTuple):
+    """Caso de benchmark: prepara as entradas (fora da medição) e devolve a chamada medida."""
+    name: str
+    prepare: Callable[[Faker, int], Callable[[], Any]]
+
+
+def _paises() -> List[SimpleNamespace]:
+    return [SimpleNamespace(ddi=ddi) for ddi in range(1, N_PAISES + 1)]
+
+
+def _chaves(count: int) -> List[Chave]:
+    return [Chave(i, 1, i) for i in range(1, count + 1)]
+
+
+def _prepare_canais(fake: Faker, n: int) -> Callable[[], Any]:
+    plataformas = [SimpleNamespace(nro=i) for i in range(1, N_PLATAFORMAS + 1)]
+    streamers = [SimpleNamespace(id=i, nick=f"streamer{i}") for i in range(1, n + 1)]
+    return lambda: generate_canais(fake, plataformas, streamers, id_start=1)
+
+
+def _prepare_doacoes(fake: Faker, n: int) -> Callable[[], Any]:
+    # Metade dos comentários recebe doação: o dobro de chaves gera n doações
+    comentarios = _chaves(2 * n)
+    return lambda: generate_doacoes(fake, comentarios)
+
+
+def _prepare_pagamentos(fake: Faker, n: int) -> Callable[[], Any]:
+    doacoes = _chaves(n)
+    return lambda: generate_pagamentos(fake, doacoes)
+
+
+def _cases() -> List[Case]:
+    # Entradas sintéticas no formato que os níveis passam aos geradores
+    def ids(n):
+        return range(1, n + 1)
+
+    return [
+        Case('generate_empresas', lambda fake, n: lambda: generate_empresas(fake, n)),
+        Case('generate_conversoes', lambda fake, n: lambda: generate_conversoes(fake, n)),
+        Case('generate_paises', lambda fake, n: lambda: generate_paises(
+            fake, min(n, N_PAISES), [SimpleNamespace(id=i) for i in ids(N_PAISES)])),
+        Case('generate_plataformas', lambda fake, n: lambda: generate_plataformas(
+            fake, n, [SimpleNamespace(nro=i) for i in ids(100)])),
+        Case('generate_usuarios', lambda fake, n: lambda: generate_usuarios(fake, n, _paises(), id_start=1)),
+        Case('generate_plataforma_usuarios', lambda fake, n: lambda: generate_plataforma_usuarios(
+            fake, n, list(ids(N_PLATAFORMAS)), ids(n), key=SEED)),
+        Case('generate_streamer_paises', lambda fake, n: lambda: generate_streamer_paises(
+            fake, n, ids(n), _paises(), key=SEED)),
+        Case('generate_empresa_paises', lambda fake, n: lambda: generate_empresa_paises(
+            fake, n, [SimpleNamespace(nro=i) for i in ids(n)], _paises(), key=SEED)),
+        Case('generate_canais', _prepare_canais),
+        Case('generate_nivel_canais', lambda fake, n: lambda: generate_nivel_canais(
+            fake, ids(n // NIVEIS_POR_CANAL), NIVEIS_POR_CANAL, id_start=1)),
+        Case('generate_patrocinios', lambda fake, n: lambda: generate_patrocinios(fake, n, ids(n), ids(n), key=SEED)),
+        Case('generate_inscricoes', lambda fake, n: lambda: generate_inscricoes(fake, n, ids(n), ids(n), key=SEED)),
+        Case('generate_videos', lambda fake, n: lambda: generate_videos(fake, n, ids(n), id_start=1)),
+        Case('generate_participacoes', lambda fake, n: lambda: generate_participacoes(fake, n, ids(n), ids(n), key=SEED)),
+        Case('generate_comentarios', lambda fake, n: lambda: generate_comentarios(fake, n, ids(n), ids(n))),
+        Case('generate_doacoes', _prepare_doacoes),
+        Case('generate_pagamentos', _prepare_pagamentos),
+        Case('generate_comentarios_com_doacoes', lambda fake, n: lambda: generate_comentarios_com_doacoes(
+            fake, n, ids(n), ids(n), n)),
+    ]
+
+
+def _count_rows(result: Any) -> int:
+    # Alguns geradores devolvem uma tupla de listas (ex: pagamentos por método)
+    if isinstance(result, tuple):
+        return sum(len(part) for part in result)
+    return len(result)
+
+
+def _seed(fake: Faker) -> None:
+    random.seed(SEED)
+    fake.seed_instance(SEED)
+    fake.unique.clear()
+
+
+def run_case(fake: Faker, case: Case, size: int, repeat: int) -> Dict[str, float]:
+    """
+    Mede um gerador em um tamanho.
+
+    Args:
+        fake: Instância do Faker (re-semeada antes de cada execução)
+        case: Caso de benchmark
+        size: Linhas pedidas ao gerador
+        repeat: Execuções cronometradas (vale a mais rápida)
+
+    Returns:
+        Dicionário com linhas, segundos, linhas/s e bytes/linha
+    """
+    best = float('inf')
+    rows = 0
+    for _ in range(repeat):
+        _seed(fake)
+        call = case.prepare(fake, size)
+        inicio = time.perf_counter()
+        result = call()
+        best = min(best, time.perf_counter() - inicio)
+        rows = _count_rows(result)
+        del result, call
+
+    # Alocação medida à parte: o tracemalloc deixa a geração mais lenta
+    _seed(fake)
+    call = case.prepare(fake, size)
+    tracemalloc.start()
+    try:
+        result = call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result, call
+
+    return {
+        'linhas': rows,
+        'segundos': best,
+        'linhas_por_s': rows / best if best > 0 else 0.0,
+        'bytes_por_linha': peak / max(rows, 1),
+    }
+
+
+def load_baseline(path: str) -> Optional[dict]:
+    """Lê a linha de base, se existir."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: Dict[str, dict]) -> None:
+    """Grava os resultados como linha de base, com a descrição do ambiente."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    baseline = {
+        'ambiente': {
+            'python': platform.python_version(),
+            'faker': faker.VERSION,
+            'numpy': np.__version__,
+            'maquina': platform.machine(),
+            'processador': platform.processor() or platform.machine(),
+        },
+        'semente': SEED,
+        'resultados': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def compare(result: dict, base: Optional[dict], tolerance: float) -> tuple[str, bool]:
+    """
+    Compara um resultado com a linha de base.
+
+    Returns:
+        Tupla (descrição da variação, se é uma regressão)
+    """
+    if base is None:
+        return "sem linha de base", False
+    speed = result['linhas_por_s'] / base['linhas_por_s'] - 1 if base['linhas_por_s'] else 0.0
+    memory = result['bytes_por_linha'] / base['bytes_por_linha'] - 1 if base['bytes_por_linha'] else 0.0
+    regression = speed < -tolerance or memory > tolerance
+    mark = "❌" if regression else "✓"
+    return f"{mark} {speed:+.1%} linhas/s, {memory:+.1%} bytes/linha", regression
+
+
+def main() -> int:
+    """Executa o benchmark e retorna o código de saída (1 = regressão)."""
+    _, options = parse_options(sys.argv[1:])
+    sizes = [int(size) for size in options['sizes'].split(',')] if 'sizes' in options else list(SIZES)
+    repeat = int(options.get('repeat', 3))
+    tolerance = float(options.get('tolerance', 0.10))
+    baseline_path = options.get('baseline', DEFAULT_BASELINE)
+    terms = options['only'].split(',') if 'only' in options else None
+
+    cases = [case for case in _cases() if terms is None or any(term in case.name for term in terms)]
+    baseline = load_baseline(baseline_path)
+    base_results = baseline['resultados'] if baseline else {}
+    if baseline and baseline.get('semente') != SEED:
+        print("⚠️  Linha de base gerada com outra semente; comparação pode não ser significativa")
+
+    print("=" * 100)
+    print(f"BENCHMARK DOS GERADORES (semente {SEED}, melhor de {repeat})")
+    print("=" * 100)
+    print(f"  {'gerador':<36} {'tamanho':>10} {'linhas/s':>12} {'bytes/linha':>12}  comparação")
+
+    fake = Faker('pt_BR')
+    results: Dict[str, dict] = {}
+    regressions = []
+    for case in cases:
+        for size in sizes:
+            key = f"{case.name}@{size}"
+            result = run_case(fake, case, size, repeat)
+            results[key] = result
+            description, regression = compare(result, base_results.get(key), tolerance)
+            if regression:
+                regressions.append(key)
+            print(f"  {case.name:<36} {size:>10,} {result['linhas_por_s']:>12,.0f} "
+                  f"{format_size(result['bytes_por_linha']):>12}  {description}")
+
+    print("=" * 100)
+    if 'save' in options:
+        # Resultados de casos não executados agora são preservados
+        save_baseline(baseline_path, {**base_results, **results})
+        print(f"💾 Linha de base gravada em {baseline_path}")
+        return 0
+    if regressions:
+        print(f"❌ {len(regressions)} regressão(ões) acima de {tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print("✅ Nenhuma regressão" if base_results else "ℹ️  Sem linha de base: use --save para gravar uma")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
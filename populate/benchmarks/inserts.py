@@ -0,0 +1,399 @@
+"""
+Benchmark das estratégias de inserção contra um PostgreSQL local.
+
+Compara, para este schema, as formas de enviar os mesmos lotes pré-gerados
+de Usuario, Video e Comentario:
+
+- orm: session.add_all + flush (motor "orm" do BatchInserter)
+- executemany: cursor.executemany do psycopg2 (um INSERT por linha)
+- execute_values: psycopg2.extras.execute_values (INSERT com várias tuplas)
+- insertmanyvalues: INSERT do SQLAlchemy Core com lista de parâmetros
+- copy: COPY FROM STDIN (motor "copy" do BatchInserter)
+
+Cada combinação de estratégia, tamanho de lote e triggers (ligados ou
+desligados) roda em um banco descartável criado a partir de `schema/*.sql`
+no servidor da conexão padrão (o container do repositório) ou no informado
+em --url (ex: um cluster temporário criado com initdb). Para cada tabela são
+medidos linhas/s, bytes de WAL gerados (pg_current_wal_insert_lsn) e CPU do
+processo servidor da sessão (/proc/self/stat lido com pg_read_file, o que
+exige superusuário ou pg_read_server_files; sem permissão a coluna fica "-").
+
+Uso (a partir do diretório populate):
+    python3 -m benchmarks.inserts
+    python3 -m benchmarks.inserts --strategies=orm,copy --batch-sizes=1000,10000 --triggers=on
+
+Opções:
+    --strategies=a,b       Estratégias (padrão: todas)
+    --batch-sizes=N,N      Tamanhos de lote (padrão: 1000,10000)
+    --triggers=on,off      Execuções com e/ou sem os triggers por linha (padrão: on,off)
+    --usuarios=N           Usuários por execução (padrão: 20000)
+    --videos=N             Vídeos por execução (padrão: 20000)
+    --comentarios=N        Comentários por execução (padrão: 50000)
+    --url=URL              Servidor (URL SQLAlchemy; padrão: a conexão de db.py)
+    --database=nome        Banco descartável (padrão: populate_bench)
+    --keep                 Mantém o banco descartável ao final
+    --json=arquivo         Grava os resultados também em JSON
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from faker import Faker
+from psycopg2.extras import execute_values
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, URL
+from sqlalchemy.orm import Session
+
+from aux_func import (
+    generate_conversoes, generate_paises, generate_empresas, generate_plataformas,
+    generate_usuarios, generate_canais, generate_videos, generate_comentarios, chunks,
+)
+from db import conn_db
+from main import parse_options
+from main_module.copy_writer import CopyWriter, extract_rows
+from main_module.id_allocator import IdAllocator
+from main_module.memory import format_size
+from main_module.trigger_bypass import disable_triggers, enable_triggers
+from models import Usuario, Canal, Video, Comentario
+
+
+SEED = 42
+SCHEMA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'schema')
+# Mesma ordem do docker-entrypoint-initdb.d do docker-compose.yml
+SCHEMA_FILES = ['tabelas.sql', 'views.sql', 'funcoes.sql', 'triggers-schedules.sql', 'indices.sql']
+EXTENSIONS = ['btree_gist', 'pg_cron']
+
+BENCH_TABLES = "MecPlat, Paypal, CartaoCredito, Bitcoin, Doacao, Comentario, Video, Canal, Usuario, Plataforma, Pais, Conversao, Empresa"
+
+# Tamanhos das tabelas de apoio (carregadas via COPY, fora da medição)
+N_CONVERSOES = 192
+N_EMPRESAS = 100
+N_PLATAFORMAS = 10
+
+
+class LoadResult(NamedTuple):
+    """Medição da carga de uma tabela com uma estratégia."""
+    estrategia: str
+    lote: int
+    triggers: bool
+    tabela: str
+    linhas: int
+    segundos: float
+    wal_bytes: int
+    cpu_servidor_s: Optional[float]
+
+    @property
+    def linhas_por_s(self) -> float:
+        return self.linhas / self.segundos if self.segundos > 0 else 0.0
+
+
+# ============================================================================
+# Estratégias: cada uma recebe objetos ORM novos de um lote
+# ============================================================================
+
+def _insert_sql(layout, columns: Sequence[str], values: str) -> str:
+    # IDs explícitos em colunas GENERATED ALWAYS exigem OVERRIDING SYSTEM VALUE
+    override = "OVERRIDING SYSTEM VALUE " if layout.identity is not None and layout.identity in columns else ""
+    return f"INSERT INTO {layout.qualified_name} ({', '.join(columns)}) {override}VALUES {values}"
+
+
+def insert_orm(session: Session, objs: List[Any]) -> None:
+    """add_all + flush (o IdAllocator adiciona OVERRIDING SYSTEM VALUE)."""
+    session.add_all(objs)
+    session.flush()
+    session.expunge_all()
+
+
+def insert_executemany(session: Session, objs: List[Any]) -> None:
+    """cursor.executemany: o psycopg2 envia um INSERT por linha."""
+    layout, columns, rows = extract_rows(objs)
+    sql = _insert_sql(layout, columns, f"({', '.join(['%s'] * len(columns))})")
+    with session.connection().connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def insert_execute_values(session: Session, objs: List[Any]) -> None:
+    """psycopg2.extras.execute_values: um INSERT com todas as tuplas do lote."""
+    layout, columns, rows = extract_rows(objs)
+    with session.connection().connection.cursor() as cursor:
+        execute_values(cursor, _insert_sql(layout, columns, "%s"), rows, page_size=len(rows))
+
+
+def insert_insertmanyvalues(session: Session, objs: List[Any]) -> None:
+    """INSERT do SQLAlchemy Core com lista de parâmetros (insertmanyvalues)."""
+    layout, columns, rows = extract_rows(objs)
+    connection = session.connection().execution_options(insertmanyvalues_page_size=len(rows))
+    connection.execute(layout.table.insert(), [dict(zip(columns, row)) for row in rows])
+
+
+def insert_copy(session: Session, objs: List[Any]) -> None:
+    """COPY FROM STDIN com os objetos codificados no cliente."""
+    CopyWriter(session).write(objs)
+
+
+STRATEGIES: Dict[str, Callable[[Session, List[Any]], None]] = {
+    'orm': insert_orm,
+    'executemany': insert_executemany,
+    'execute_values': insert_execute_values,
+    'insertmanyvalues': insert_insertmanyvalues,
+    'copy': insert_copy,
+}
+
+
+# ============================================================================
+# Banco descartável
+# ============================================================================
+
+def _schema_sql(name: str, has_cron: bool) -> str:
+    with open(os.path.join(SCHEMA_DIR, name), encoding='utf-8') as f:
+        sql = f.read()
+    if not has_cron:
+        # Agendamentos do pg_cron não fazem parte do que é medido
+        sql = re.sub(r"SELECT cron\.schedule\(.*?\);", "", sql, flags=re.S)
+    return sql
+
+
+def create_bench_database(server_url: URL, name: str) -> Engine:
+    """
+    (Re)cria o banco descartável e aplica o schema do repositório.
+
+    Args:
+        server_url: URL de qualquer banco do servidor (usada para o CREATE DATABASE)
+        name: Nome do banco descartável
+
+    Returns:
+        Engine conectada ao banco criado, com search_path=core
+    """
+    print(f"🧪 Criando banco descartável '{name}' em {server_url.host}:{server_url.port}...")
+    admin = create_engine(server_url.set(database='postgres'), isolation_level='AUTOCOMMIT')
+    with admin.connect() as connection:
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+        connection.execute(text(f"""CREATE DATABASE "{name}" ENCODING 'UTF8' TEMPLATE template0"""))
+    admin.dispose()
+
+    engine = create_engine(server_url.set(database=name), connect_args={"options": "-csearch_path=core"})
+    raw = engine.raw_connection()
+    try:
+        raw.driver_connection.autocommit = True
+        cursor = raw.driver_connection.cursor()
+        installed = set()
+        for extension in EXTENSIONS:
+            try:
+                cursor.execute(f"CREATE EXTENSION IF NOT EXISTS {extension}")
+                installed.add(extension)
+            except Exception as e:
+                print(f"    ⚠️  Extensão {extension} indisponível ({str(e).splitlines()[0]})")
+        for file_name in SCHEMA_FILES:
+            cursor.execute(_schema_sql(file_name, 'pg_cron' in installed))
+        cursor.close()
+    finally:
+        raw.close()
+    print("    ✓ Schema aplicado\n")
+    return engine
+
+
+def drop_bench_database(engine: Engine) -> None:
+    """Remove o banco descartável."""
+    url = engine.url
+    engine.dispose()
+    admin = create_engine(url.set(database='postgres'), isolation_level='AUTOCOMMIT')
+    with admin.connect() as connection:
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{url.database}"'))
+    admin.dispose()
+
+
+# ============================================================================
+# Dados pré-gerados
+# ============================================================================
+
+class BenchData(NamedTuple):
+    """Atributos das linhas pré-geradas (objetos ORM novos são criados a cada execução)."""
+    apoio: List[Any]  # Conversões, países, empresas e plataformas (ORM, via COPY)
+    usuarios: List[dict]
+    canais: List[dict]
+    videos: List[dict]
+    comentarios: List[dict]
+
+
+def _attrs(objs: List[Any]) -> List[dict]:
+    return [{k: v for k, v in vars(obj).items() if not k.startswith('_')} for obj in objs]
+
+
+def pregenerate(n_usuarios: int, n_videos: int, n_comentarios: int) -> BenchData:
+    """
+    Gera uma única vez (semente fixa) as linhas usadas por todas as execuções.
+
+    Os IDs partem de 1, como as faixas reservadas logo após o
+    TRUNCATE ... RESTART IDENTITY de cada execução.
+    """
+    print(f"🎲 Pré-gerando {n_usuarios:,} usuários, {n_videos:,} vídeos e {n_comentarios:,} comentários...")
+    random.seed(SEED)
+    fake = Faker('pt_BR')
+    fake.seed_instance(SEED)
+
+    conversoes = generate_conversoes(fake, N_CONVERSOES)
+    paises = generate_paises(fake, N_CONVERSOES, [SimpleNamespace(id=i) for i in range(1, N_CONVERSOES + 1)])
+    empresas = generate_empresas(fake, N_EMPRESAS)
+    plataformas = generate_plataformas(fake, N_PLATAFORMAS, [SimpleNamespace(nro=i) for i in range(1, N_EMPRESAS + 1)])
+
+    usuarios = generate_usuarios(fake, n_usuarios, paises, id_start=1)
+    # Um canal por streamer (10% dos usuários), vídeos distribuídos entre os canais
+    streamers = usuarios[:max(1, n_usuarios // 10)]
+    canais = generate_canais(fake, [SimpleNamespace(nro=i) for i in range(1, N_PLATAFORMAS + 1)], streamers, id_start=1)
+    videos = generate_videos(fake, n_videos, range(1, len(canais) + 1), id_start=1)
+    comentarios = generate_comentarios(fake, n_comentarios, range(1, n_videos + 1), range(1, n_usuarios + 1))
+    print()
+    return BenchData(
+        conversoes + paises + empresas + plataformas,
+        _attrs(usuarios), _attrs(canais), _attrs(videos), _attrs(comentarios)
+    )
+
+
+# ============================================================================
+# Medição
+# ============================================================================
+
+def _wal_lsn(session: Session) -> str:
+    return session.execute(text("SELECT pg_current_wal_insert_lsn()::text")).scalar_one()
+
+
+def _server_cpu(session: Session) -> Optional[float]:
+    # utime + stime do processo servidor desta sessão, em segundos
+    try:
+        stat = session.execute(text("SELECT pg_read_file('/proc/self/stat')")).scalar_one()
+    except Exception:
+        session.rollback()
+        return None
+    fields = stat.rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def _load(session: Session, strategy: Callable, model: type, rows: List[dict], batch_size: int,
+          label: str, triggers: bool, table: str) -> LoadResult:
+    # Objetos novos (fora da medição): o ORM não reaproveita instâncias já persistidas
+    objs = [model(**attrs) for attrs in rows]
+    lsn_before = _wal_lsn(session)
+    cpu_before = _server_cpu(session)
+
+    inicio = time.perf_counter()
+    for batch in chunks(objs, batch_size):
+        strategy(session, batch)
+    session.commit()
+    segundos = time.perf_counter() - inicio
+
+    cpu_after = _server_cpu(session)
+    wal = session.execute(
+        text("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), CAST(:lsn AS pg_lsn))"), {'lsn': lsn_before}
+    ).scalar_one()
+    session.commit()
+    cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+    return LoadResult(label, batch_size, triggers, table, len(objs), segundos, int(wal), cpu)
+
+
+def run_strategy(engine: Engine, data: BenchData, name: str, batch_size: int, triggers: bool) -> List[LoadResult]:
+    """
+    Carrega Usuario, Video e Comentario com uma estratégia, a partir de tabelas vazias.
+
+    Returns:
+        Uma medição por tabela
+    """
+    strategy = STRATEGIES[name]
+    with Session(engine) as session:
+        session.execute(text(f"TRUNCATE TABLE {BENCH_TABLES} RESTART IDENTITY CASCADE"))
+        session.commit()
+
+        writer = CopyWriter(session)
+        writer.write(data.apoio)
+        ids = IdAllocator(session)
+        ids.reserve(Usuario, len(data.usuarios))
+        ids.reserve(Canal, len(data.canais))
+        ids.reserve(Video, len(data.videos))
+        session.commit()
+
+        try:
+            results = [_load(session, strategy, Usuario, data.usuarios, batch_size, name, triggers, 'usuario')]
+            # Canais só dependem dos usuários e não são medidos
+            writer.write([Canal(**attrs) for attrs in data.canais])
+            session.commit()
+            results.append(_load(session, strategy, Video, data.videos, batch_size, name, triggers, 'video'))
+            results.append(_load(session, strategy, Comentario, data.comentarios, batch_size, name, triggers, 'comentario'))
+        finally:
+            ids.close()
+    return results
+
+
+def print_results(results: List[LoadResult]) -> None:
+    """Exibe a tabela comparativa, agrupada por tabela e triggers."""
+    print("\n" + "=" * 100)
+    print("COMPARAÇÃO DAS ESTRATÉGIAS DE INSERÇÃO")
+    print("=" * 100)
+    groups: Dict[tuple, List[LoadResult]] = {}
+    for result in results:
+        groups.setdefault((result.tabela, result.triggers), []).append(result)
+
+    for (tabela, triggers), group in groups.items():
+        best = max(result.linhas_por_s for result in group)
+        print(f"\n  📋 {tabela} (triggers {'ligados' if triggers else 'desligados'}, {group[0].linhas:,} linhas)")
+        print(f"    {'estratégia':<18} {'lote':>8} {'linhas/s':>12} {'relativo':>9} {'WAL':>10} {'CPU servidor':>13}")
+        for result in sorted(group, key=lambda r: -r.linhas_por_s):
+            cpu = f"{result.cpu_servidor_s:.2f}s" if result.cpu_servidor_s is not None else "-"
+            print(f"    {result.estrategia:<18} {result.lote:>8,} {result.linhas_por_s:>12,.0f} "
+                  f"{result.linhas_por_s / best:>8.0%} {format_size(result.wal_bytes):>10} {cpu:>13}")
+    print("=" * 100 + "\n")
+
+
+def main() -> int:
+    """Executa o benchmark das estratégias de inserção."""
+    _, options = parse_options(sys.argv[1:])
+    strategies = options['strategies'].split(',') if 'strategies' in options else list(STRATEGIES)
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Estratégias desconhecidas: {', '.join(unknown)}. Disponíveis: {', '.join(STRATEGIES)}")
+    batch_sizes = [int(size) for size in options.get('batch-sizes', '1000,10000').split(',')]
+    trigger_modes = [mode == 'on' for mode in options.get('triggers', 'on,off').split(',')]
+    server_url = create_engine(options['url']).url if 'url' in options else conn_db().url
+
+    data = pregenerate(
+        int(options.get('usuarios', 20_000)),
+        int(options.get('videos', 20_000)),
+        int(options.get('comentarios', 50_000)),
+    )
+    engine = create_bench_database(server_url, options.get('database', 'populate_bench'))
+
+    results: List[LoadResult] = []
+    try:
+        for triggers in trigger_modes:
+            if triggers:
+                enable_triggers(engine)
+            else:
+                disable_triggers(engine)
+            for name in strategies:
+                for batch_size in batch_sizes:
+                    inicio = time.time()
+                    run = run_strategy(engine, data, name, batch_size, triggers)
+                    results.extend(run)
+                    print(f"    ✓ {name} (lote {batch_size:,}, triggers {'on' if triggers else 'off'}) "
+                          f"em {time.time() - inicio:.2f}s")
+    finally:
+        if 'keep' in options:
+            engine.dispose()
+            print(f"ℹ️  Banco '{engine.url.database}' mantido")
+        else:
+            drop_bench_database(engine)
+
+    print_results(results)
+    if 'json' in options:
+        with open(options['json'], 'w', encoding='utf-8') as f:
+            json.dump([{**result._asdict(), 'linhas_por_s': result.linhas_por_s} for result in results], f, indent=2)
+        print(f"💾 Resultados gravados em {options['json']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
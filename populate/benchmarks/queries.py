@@ -0,0 +1,405 @@
+"""
+Benchmark das consultas de relatório (`schema/consultas.sql`) e das views de faturamento.
+
+Cada consulta (as oito funções de `funcoes.sql`, com as sobrecargas por ID e
+por nome, e as views de faturamento) é executada sobre o banco populado:
+
+- fria: antes de cada execução, conexão nova (caches de plano e catálogo
+  vazios) e, quando disponível, `pg_buffercache_evict` (PostgreSQL 17+) para
+  esvaziar o shared_buffers do banco; --cold-cmd permite ir além (ex:
+  reiniciar o container e limpar o cache do sistema operacional)
+- quente: mesma conexão, após uma execução de aquecimento
+
+São registradas as latências p50/p95 de cada modo e o plano de
+`EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`. Como as funções são `LANGUAGE
+sql` voláteis (o planejador não as expande), o EXPLAIN é feito sobre o
+corpo da função, preparado com os mesmos argumentos. A forma do plano
+(tipos de nó e relações/índices) é comparada com a linha de base, junto com
+as latências: uma mudança de forma ou um p95 acima da tolerância é
+regressão (código de saída 1).
+
+Uso (a partir do diretório populate):
+    python3 -m benchmarks.queries --populate=TESTE_FUNCIONAL --seed=42 --save
+    python3 -m benchmarks.queries
+
+Opções:
+    --populate=PRESET   Limpa e popula o banco com o preset antes de medir
+    --seed=N            Semente da população (com --populate)
+    --warm=N            Execuções quentes por consulta (padrão: 20)
+    --cold=N            Execuções frias por consulta (padrão: 5)
+    --cold-cmd="..."    Comando de shell executado antes de cada execução fria
+    --only=a,b          Apenas as consultas cujo nome contém um dos termos
+    --plans=diretório   Grava os planos EXPLAIN em JSON (um arquivo por consulta e modo)
+    --save              Grava os resultados como nova linha de base
+    --baseline=arquivo  Arquivo da linha de base (padrão: baselines/queries.json)
+    --tolerance=0.25    Aumento relativo de p95 aceito antes de apontar regressão
+    --min-delta-ms=2    Aumento absoluto de p95 ignorado (ruído em consultas rápidas)
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from faker import Faker
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from db import conn_db
+from main import parse_options
+from main_module.config import get_preset
+from main_module.database_cleaner import clean_database
+from main_module.data_population import populate_all_data
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'queries.json')
+
+# Tabelas cujas contagens identificam o conjunto de dados medido
+DATASET_TABLES = ['usuario', 'canal', 'video', 'comentario', 'doacao', 'inscricao', 'patrocinio']
+
+# Argumentos das sobrecargas: consulta que escolhe um valor existente (determinística)
+SAMPLE_SQL = {
+    'empresa_nro': "SELECT nro_empresa FROM patrocinio ORDER BY nro_empresa LIMIT 1",
+    'empresa_nome': "SELECT e.nome FROM empresa e JOIN patrocinio p ON p.nro_empresa = e.nro ORDER BY e.nro LIMIT 1",
+    'membro_id': "SELECT id_membro FROM inscricao ORDER BY id_membro LIMIT 1",
+    'membro_nick': "SELECT u.nick FROM usuario u WHERE u.id = (SELECT MIN(id_membro) FROM inscricao)",
+    'canal_id': "SELECT v.id_canal FROM doacao d JOIN video v ON v.id = d.id_video ORDER BY v.id_canal LIMIT 1",
+    'canal_nome': "SELECT c.nome FROM canal c WHERE c.id = (SELECT MIN(v.id_canal) FROM doacao d JOIN video v ON v.id = d.id_video)",
+    'video_id': "SELECT id_video FROM doacao ORDER BY id_video LIMIT 1",
+    'video_titulo': "SELECT v.titulo FROM video v WHERE v.id = (SELECT MIN(id_video) FROM doacao)",
+}
+
+
+class QueryCase(NamedTuple):
+    """Consulta medida: função (com a sobrecarga) ou view."""
+    name: str
+    function: Optional[str]  # None para views
+    arg: Optional[str] = None  # Chave de SAMPLE_SQL, ou valor literal
+    arg_type: Optional[str] = None  # Tipo da sobrecarga ('integer', 'character varying')
+
+
+K = '5'  # O k usado em consultas.sql
+
+CASES: List[QueryCase] = [
+    QueryCase('canaispatrocinadosempresa()', 'canaispatrocinadosempresa'),
+    QueryCase('canaispatrocinadosempresa(id)', 'canaispatrocinadosempresa', 'empresa_nro', 'integer'),
+    QueryCase('canaispatrocinadosempresa(nome)', 'canaispatrocinadosempresa', 'empresa_nome', 'character varying'),
+    QueryCase('gastomembresia()', 'gastomembresia'),
+    QueryCase('gastomembresia(id)', 'gastomembresia', 'membro_id', 'integer'),
+    QueryCase('gastomembresia(nick)', 'gastomembresia', 'membro_nick', 'character varying'),
+    QueryCase('doacoescanal()', 'doacoescanal'),
+    QueryCase('doacoescanal(id)', 'doacoescanal', 'canal_id', 'integer'),
+    QueryCase('doacoescanal(nome)', 'doacoescanal', 'canal_nome', 'character varying'),
+    QueryCase('doacoescomentarioslidos()', 'doacoescomentarioslidos'),
+    QueryCase('doacoescomentarioslidos(id)', 'doacoescomentarioslidos', 'video_id', 'integer'),
+    QueryCase('doacoescomentarioslidos(titulo)', 'doacoescomentarioslidos', 'video_titulo', 'character varying'),
+    QueryCase('maiorpatrocinio(5)', 'maiorpatrocinio', K, 'integer'),
+    QueryCase('maiorapoiomembros(5)', 'maiorapoiomembros', K, 'integer'),
+    QueryCase('maisdoacoes(5)', 'maisdoacoes', K, 'integer'),
+    QueryCase('maiorfaturamento(5)', 'maiorfaturamento', K, 'integer'),
+    QueryCase('vw_faturamento_doacao', None),
+    QueryCase('vw_faturamento_patrocinio', None),
+    QueryCase('vw_faturamento_inscricao', None),
+    QueryCase('vw_faturamento_total', None),
+]
+
+
+class Prepared(NamedTuple):
+    """Consulta pronta para execução e para o EXPLAIN."""
+    case: QueryCase
+    call_sql: str  # O que o usuário executa (ex: SELECT * FROM f(%s))
+    explain_sql: str  # Corpo da função com o parâmetro em $1 (ou a própria consulta)
+    arg_value: Any
+
+
+def _resolve_arg(session: Session, case: QueryCase) -> Any:
+    if case.arg is None:
+        return None
+    if case.arg in SAMPLE_SQL:
+        value = session.execute(text(SAMPLE_SQL[case.arg])).scalar()
+        if value is None:
+            raise ValueError(f"Sem dados para o argumento de {case.name}: popule o banco antes (--populate)")
+        return value
+    return int(case.arg) if case.arg_type == 'integer' else case.arg
+
+
+def _function_body(session: Session, case: QueryCase) -> str:
+    # Corpo da sobrecarga, com os parâmetros nomeados trocados por $n
+    row = session.execute(text("""
+        SELECT p.prosrc, p.proargnames, p.proargmodes
+        FROM pg_proc p JOIN pg_namespace n ON n.oid = p.pronamespace
+        WHERE n.nspname = 'core' AND p.proname = :name AND oidvectortypes(p.proargtypes) = :types
+    """), {'name': case.function, 'types': case.arg_type or ''}).mappings().first()
+    if row is not None:
+        body = row['prosrc'].strip().rstrip(';')
+        names = row['proargnames'] or []
+        modes = row['proargmodes'] or ['i'] * len(names)
+        inputs = [name for name, mode in zip(names, modes) if mode in ('i', 'b')]
+        for position, name in enumerate(inputs, start=1):
+            body = re.sub(rf"\b{re.escape(name)}\b", f"${position}", body, flags=re.I)
+        return body
+    raise ValueError(f"Função {case.function}({case.arg_type or ''}) não encontrada no schema core")
+
+
+def prepare(session: Session, case: QueryCase) -> Prepared:
+    """Resolve o argumento e monta as consultas de execução e de EXPLAIN."""
+    if case.function is None:
+        sql = f"SELECT * FROM {case.name}"
+        return Prepared(case, sql, sql, None)
+    value = _resolve_arg(session, case)
+    call_sql = f"SELECT * FROM {case.function}(%s)" if case.arg else f"SELECT * FROM {case.function}()"
+    return Prepared(case, call_sql, _function_body(session, case), value)
+
+
+# ============================================================================
+# Medição
+# ============================================================================
+
+def _execute(cursor, prepared: Prepared) -> float:
+    inicio = time.perf_counter()
+    cursor.execute(prepared.call_sql, (prepared.arg_value,) if prepared.case.arg else None)
+    cursor.fetchall()
+    return (time.perf_counter() - inicio) * 1000
+
+
+def _explain(cursor, prepared: Prepared) -> dict:
+    options = "ANALYZE, BUFFERS, FORMAT JSON"
+    if prepared.case.arg:
+        cursor.execute(f"PREPARE bench_q({prepared.case.arg_type}) AS {prepared.explain_sql}")
+        try:
+            cursor.execute(f"EXPLAIN ({options}) EXECUTE bench_q(%s)", (prepared.arg_value,))
+            plan = cursor.fetchone()[0]
+        finally:
+            cursor.execute("DEALLOCATE bench_q")
+    else:
+        cursor.execute(f"EXPLAIN ({options}) {prepared.explain_sql}")
+        plan = cursor.fetchone()[0]
+    return plan[0] if isinstance(plan, list) else plan
+
+
+def plan_shape(node: dict) -> str:
+    """Forma do plano: tipos de nó e relações/índices, sem custos nem contagens."""
+    label = node['Node Type']
+    target = node.get('Relation Name') or node.get('Index Name')
+    if target:
+        label += f"[{target}]"
+    children = node.get('Plans', [])
+    if children:
+        label += "(" + ", ".join(plan_shape(child) for child in children) + ")"
+    return label
+
+
+class ColdCache:
+    """Prepara execuções frias: comando externo, evicção do shared_buffers e conexão nova."""
+
+    def __init__(self, engine: Engine, command: Optional[str]):
+        self.engine = engine
+        self.command = command
+        self.evict = self._setup_evict()
+
+    def _setup_evict(self) -> bool:
+        # pg_buffercache_evict existe a partir do PostgreSQL 17
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_buffercache"))
+                return connection.execute(
+                    text("SELECT 1 FROM pg_proc WHERE proname = 'pg_buffercache_evict'")
+                ).scalar() is not None
+        except Exception:
+            return False
+
+    def describe(self) -> str:
+        parts = ["conexão nova"]
+        if self.evict:
+            parts.append("pg_buffercache_evict")
+        if self.command:
+            parts.append(f"comando '{self.command}'")
+        return " + ".join(parts)
+
+    def connect(self):
+        """Esvazia os caches disponíveis e devolve uma conexão DBAPI nova."""
+        if self.command:
+            subprocess.run(self.command, shell=True, check=True)
+            self.engine.dispose()
+        if self.evict:
+            with self.engine.begin() as connection:
+                connection.execute(text("""
+                    SELECT count(pg_buffercache_evict(bufferid)) FROM pg_buffercache
+                    WHERE reldatabase = (SELECT oid FROM pg_database WHERE datname = current_database())
+                """))
+        self.engine.dispose()
+        return self.engine.raw_connection()
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return {'p50_ms': float(p50), 'p95_ms': float(p95)}
+
+
+def _buffers(plan: dict) -> Dict[str, int]:
+    top = plan['Plan']
+    return {'hit': top.get('Shared Hit Blocks', 0), 'read': top.get('Shared Read Blocks', 0)}
+
+
+def run_query(engine: Engine, cold: ColdCache, prepared: Prepared, warm_runs: int, cold_runs: int) -> Tuple[dict, dict]:
+    """
+    Mede uma consulta fria e quente.
+
+    Returns:
+        Tupla (resultado resumido, planos EXPLAIN por modo)
+    """
+    cold_latencies = []
+    cold_plan = None
+    for run in range(cold_runs):
+        connection = cold.connect()
+        try:
+            cursor = connection.cursor()
+            if run == 0:
+                # O EXPLAIN frio usa a primeira conexão; as latências, as seguintes
+                cold_plan = _explain(cursor, prepared)
+                connection.close()
+                connection = cold.connect()
+                cursor = connection.cursor()
+            cold_latencies.append(_execute(cursor, prepared))
+        finally:
+            connection.rollback()
+            connection.close()
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        _execute(cursor, prepared)  # Aquecimento
+        warm_latencies = [_execute(cursor, prepared) for _ in range(warm_runs)]
+        warm_plan = _explain(cursor, prepared)
+    finally:
+        connection.rollback()
+        connection.close()
+
+    result = {
+        'argumento': prepared.arg_value,
+        'forma_plano': plan_shape(warm_plan['Plan']),
+        'quente': {**_percentiles(warm_latencies), 'buffers': _buffers(warm_plan)},
+    }
+    if cold_latencies:
+        result['fria'] = {**_percentiles(cold_latencies), 'buffers': _buffers(cold_plan)}
+    return result, {'quente': warm_plan, 'fria': cold_plan}
+
+
+def compare(result: dict, base: Optional[dict], tolerance: float, min_delta_ms: float) -> List[str]:
+    """Lista as regressões de um resultado em relação à linha de base."""
+    if base is None:
+        return []
+    problems = []
+    if result['forma_plano'] != base['forma_plano']:
+        problems.append("forma do plano mudou")
+    for mode in ('quente', 'fria'):
+        if mode not in result or mode not in base:
+            continue
+        atual, antes = result[mode]['p95_ms'], base[mode]['p95_ms']
+        if atual > antes * (1 + tolerance) and atual - antes > min_delta_ms:
+            problems.append(f"p95 {mode} {antes:.1f}ms → {atual:.1f}ms")
+    return problems
+
+
+def dataset_counts(engine: Engine) -> Dict[str, int]:
+    """Contagens das tabelas principais (identificam o conjunto de dados)."""
+    with engine.connect() as connection:
+        return {table: connection.execute(text(f"SELECT COUNT(*) FROM core.{table}")).scalar_one() for table in DATASET_TABLES}
+
+
+def populate(engine: Engine, preset: str, seed: Optional[int]) -> None:
+    """Limpa e popula o banco com um preset."""
+    config = get_preset(preset, seed)
+    config.seed = seed
+    clean_database(engine)
+    with Session(engine) as session:
+        populate_all_data(session, Faker('pt_BR'), config)
+
+
+def main() -> int:
+    """Executa o benchmark das consultas e retorna o código de saída (1 = regressão)."""
+    _, options = parse_options(sys.argv[1:])
+    warm_runs = int(options.get('warm', 20))
+    cold_runs = int(options.get('cold', 5))
+    tolerance = float(options.get('tolerance', 0.25))
+    min_delta_ms = float(options.get('min-delta-ms', 2))
+    baseline_path = options.get('baseline', DEFAULT_BASELINE)
+    terms = options['only'].split(',') if 'only' in options else None
+    plans_dir = options.get('plans')
+
+    engine = conn_db()
+    if 'populate' in options:
+        populate(engine, options['populate'], int(options['seed']) if 'seed' in options else None)
+
+    # A view materializada só é atualizada pelo pg_cron; estatísticas frescas para o planejador
+    with engine.begin() as connection:
+        connection.execute(text("REFRESH MATERIALIZED VIEW core.vw_faturamento_total"))
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text("ANALYZE"))
+
+    counts = dataset_counts(engine)
+    baseline = None
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('dados') != counts:
+            print("⚠️  Conjunto de dados diferente do da linha de base; comparação pode não ser significativa")
+
+    cold = ColdCache(engine, options.get('cold-cmd'))
+    print("=" * 100)
+    print(f"BENCHMARK DAS CONSULTAS ({warm_runs} quentes, {cold_runs} frias: {cold.describe()})")
+    print("  " + ", ".join(f"{table}={count:,}" for table, count in counts.items()))
+    print("=" * 100)
+    print(f"  {'consulta':<36} {'p50 q':>9} {'p95 q':>9} {'p50 f':>9} {'p95 f':>9} {'lidos f':>9}  comparação")
+
+    results: Dict[str, dict] = {}
+    regressions: Dict[str, List[str]] = {}
+    if plans_dir:
+        os.makedirs(plans_dir, exist_ok=True)
+    with Session(engine) as session:
+        prepared_cases = [prepare(session, case) for case in CASES
+                          if terms is None or any(term in case.name for term in terms)]
+
+    for prepared in prepared_cases:
+        name = prepared.case.name
+        result, plans = run_query(engine, cold, prepared, warm_runs, cold_runs)
+        results[name] = result
+        problems = compare(result, (baseline or {}).get('resultados', {}).get(name), tolerance, min_delta_ms)
+        if problems:
+            regressions[name] = problems
+        if plans_dir:
+            for mode, plan in plans.items():
+                if plan is not None:
+                    file_name = re.sub(r'[^\w]+', '_', name).strip('_') + f"_{mode}.json"
+                    with open(os.path.join(plans_dir, file_name), 'w', encoding='utf-8') as f:
+                        json.dump(plan, f, indent=2)
+
+        quente, fria = result['quente'], result.get('fria', {})
+        status = "❌ " + "; ".join(problems) if problems else ("✓" if baseline else "sem linha de base")
+        print(f"  {name:<36} {quente['p50_ms']:>7.1f}ms {quente['p95_ms']:>7.1f}ms "
+              f"{fria.get('p50_ms', 0):>7.1f}ms {fria.get('p95_ms', 0):>7.1f}ms "
+              f"{fria.get('buffers', {}).get('read', 0):>9,}  {status}")
+
+    print("=" * 100)
+    if 'save' in options:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        saved = {**(baseline or {}).get('resultados', {}), **results}
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump({'dados': counts, 'resultados': saved}, f, indent=2, ensure_ascii=False, default=str)
+            f.write('\n')
+        print(f"💾 Linha de base gravada em {baseline_path}")
+        return 0
+    if regressions:
+        print(f"❌ {len(regressions)} consulta(s) com regressão: {', '.join(regressions)}")
+        return 1
+    print("✅ Nenhuma regressão" if baseline else "ℹ️  Sem linha de base: use --save para gravar uma")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
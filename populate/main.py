@@ -5,10 +5,12 @@ from sqlalchemy.orm import Session
 from faker import Faker
 
 from db import conn_db
-from main_module.config import get_preset, list_presets
+from main_module.config import EXPORT_FORMATS, INSERT_ENGINES, get_preset, list_presets, parse_skew
+from main_module.memory import format_size
 from main_module.statistics import print_data_statistics
 from main_module.database_cleaner import clean_database
 from main_module.data_population import populate_all_data
+from main_module.dataset import load_dataset, read_manifest
 
 def print_timings_summary(timings: dict) -> None:
     """Exibe resumo dos tempos de execução por nível."""
@@ -21,36 +23,186 @@ def print_timings_summary(timings: dict) -> None:
         if key in timings:
             print(f"  Nível {i}: {timings[key]:.2f}s ({timings[key]/60:.1f}min)")
     
+    # Tempos por tarefa do agendador em DAG
+    for key, value in timings.items():
+        if key.startswith('dag_'):
+            print(f"  {key[4:]}: {value:.2f}s")
+    # Reconstrução de índices e restrições por tabela
+    for key, value in timings.items():
+        if key.startswith('rebuild_') and key != 'rebuild_total':
+            print(f"  Índices {key[8:]}: {value:.2f}s")
+    if 'rebuild_total' in timings:
+        print(f"  Reconstrução de índices: {timings['rebuild_total']:.2f}s")
+    if 'reconciliacao_pagamentos' in timings:
+        print(f"  Verificação de pagamentos: {timings['reconciliacao_pagamentos']:.2f}s")
+    if 'gravacao_snapshot' in timings:
+        print(f"  Gravação do snapshot: {timings['gravacao_snapshot']:.2f}s")
+    if 'restauracao_snapshot' in timings:
+        restauracao, geracao = timings['restauracao_snapshot'], timings['geracao_substituida']
+        print(f"  ♻️  Snapshot restaurado: {restauracao:.2f}s (geração substituída: {geracao:.2f}s, "
+              f"{geracao / restauracao if restauracao else 0:.1f}x mais rápido)")
+    if 'caminho_critico' in timings:
+        print(f"\n  📐 Caminho crítico: {timings['caminho_critico']:.2f}s ({timings['caminho_critico_tarefas']})")
+    
+    # Pico de memória por nível e por entidade
+    memoria = timings.get('memoria')
+    if memoria:
+        print("\n  🧠 Pico de memória (RSS / Python):")
+        for name, pico in memoria.items():
+            rotulo = f"Nível {name[6:]}" if name.startswith('nivel_') else name
+            print(f"    {rotulo}: {format_size(pico['pico_rss'])} / {format_size(pico['pico_python'])}")
+            for alocador in pico['top']:
+                print(f"      · {alocador}")
+    
     total = timings.get('total', 0)
     print(f"\n  ⏱️  TEMPO TOTAL: {total:.2f}s ({total/60:.2f}min)")
     print("="*80 + "\n")
 
 
+def parse_options(argv: list[str]) -> tuple[list[str], dict]:
+    """Separa argumentos posicionais das opções no formato --chave=valor ou --flag."""
+    positional = []
+    options = {}
+    for arg in argv:
+        if arg.startswith('--') and '=' in arg:
+            key, value = arg[2:].split('=', 1)
+            options[key] = value
+        elif arg.startswith('--') and arg not in ('--help', '--list'):
+            # Flags sem valor (ex: --bypass-triggers)
+            options[arg[2:]] = 'true'
+        else:
+            positional.append(arg)
+    return positional, options
+
+
+def run_load(directory: str, options: dict) -> None:
+    """Limpa o banco e carrega um conjunto de dados exportado com --export."""
+    try:
+        manifest = read_manifest(directory)
+    except ValueError as e:
+        print(f"❌ Erro: {e}")
+        return
+    
+    total = sum(info['linhas'] for info in manifest['tabelas'].values())
+    print(f"\n📦 Conjunto de dados em {directory}: preset {manifest.get('preset')}, "
+          f"semente {manifest.get('semente')}, {total:,} linhas ({manifest['formato']})")
+    resposta = input("O banco será limpo antes da carga. Deseja prosseguir? (s/n): ")
+    if resposta.lower() not in ['s', 'sim', 'y', 'yes']:
+        print("Operação cancelada pelo usuário.")
+        return
+    
+    engine = conn_db()
+    clean_database(engine)
+    load_dataset(engine, directory, int(options.get('connections', 4)))
+
+
 def main():
     """Função principal do script."""
     
     # Determina qual preset usar
     preset_name = "DESENVOLVIMENTO_RAPIDO"  # Padrão
+    args, options = parse_options(sys.argv[1:])
     
-    if len(sys.argv) > 1:
-        if sys.argv[1] in ['--help', '-h', 'help']:
+    if len(args) > 0:
+        if args[0] in ['--help', '-h', 'help']:
             print(__doc__)
             list_presets()
             return
-        elif sys.argv[1] == '--list':
+        elif args[0] == '--list':
             list_presets()
             return
+        elif args[0] == 'load':
+            # python main.py load <diretório> [--connections=N]
+            if len(args) < 2:
+                print("❌ Informe o diretório exportado: python main.py load <diretório>")
+                return
+            run_load(args[1], options)
+            return
         else:
-            preset_name = sys.argv[1]
+            preset_name = args[0]
     
     # Carrega configuração
     try:
-        config = get_preset(preset_name)
+        # Com --seed as contagens do preset também são sorteadas com a semente
+        config = get_preset(preset_name, int(options['seed']) if 'seed' in options else None)
     except KeyError as e:
         print(f"❌ Erro: {e}")
         print("\nUse 'python main_optimized.py --list' para ver os presets disponíveis.")
         return
     
+    # Opções de execução (--engine=orm|copy|async, --workers=N, --seed=N, --scheduler=dag, --connections=N,
+    # --overlap, --in-flight=N, --pool-size=N, --pool-cache=arquivo, --bypass-triggers, --fused,
+    # --rebuild-indexes, --maintenance-work-mem=1GB, --checkpoint, --resume,
+    # --checkpoint-every=N, --memory-budget=4GB, --trace-memory,
+    # --metrics=arquivo.jsonl|.csv, --quiet, --export=diretório, --export-format=csv|parquet,
+    # --snapshot=diretório, --skew=comentarios:1.1,patrocinios:top=0.5)
+    if 'engine' in options:
+        if options['engine'] not in INSERT_ENGINES:
+            print(f"❌ Erro: motor de inserção '{options['engine']}' inválido. Disponíveis: {', '.join(INSERT_ENGINES)}")
+            return
+        config.insert_engine = options['engine']
+    if 'workers' in options:
+        config.workers = int(options['workers'])
+    if 'seed' in options:
+        config.seed = int(options['seed'])
+    if 'scheduler' in options:
+        config.scheduler = options['scheduler']
+    if 'connections' in options:
+        config.connections = int(options['connections'])
+    if 'overlap' in options:
+        config.overlap_writes = options['overlap'].lower() in ('true', '1', 's', 'sim')
+    if 'in-flight' in options:
+        config.writes_in_flight = int(options['in-flight'])
+    if 'pool-size' in options:
+        config.faker_pool_size = int(options['pool-size'])
+    if 'pool-cache' in options:
+        config.faker_pool_cache = options['pool-cache']
+    if 'bypass-triggers' in options:
+        config.bypass_triggers = options['bypass-triggers'].lower() in ('true', '1', 's', 'sim')
+    if 'fused' in options:
+        config.fused_donations = options['fused'].lower() in ('true', '1', 's', 'sim')
+    if 'rebuild-indexes' in options:
+        config.rebuild_indexes = options['rebuild-indexes'].lower() in ('true', '1', 's', 'sim')
+    if 'maintenance-work-mem' in options:
+        config.maintenance_work_mem = options['maintenance-work-mem']
+    if 'checkpoint' in options:
+        config.checkpoint = options['checkpoint'].lower() in ('true', '1', 's', 'sim')
+    if 'resume' in options:
+        config.resume = options['resume'].lower() in ('true', '1', 's', 'sim')
+    if 'checkpoint-every' in options:
+        config.checkpoint_every = int(options['checkpoint-every'])
+    if 'memory-budget' in options:
+        config.memory_budget = options['memory-budget']
+    if 'trace-memory' in options:
+        config.trace_memory = options['trace-memory'].lower() in ('true', '1', 's', 'sim')
+    if 'metrics' in options:
+        config.metrics_file = options['metrics']
+    if 'quiet' in options:
+        config.quiet = options['quiet'].lower() in ('true', '1', 's', 'sim')
+    if 'export' in options:
+        config.export_dir = options['export']
+    if 'export-format' in options:
+        if options['export-format'] not in EXPORT_FORMATS:
+            print(f"❌ Erro: formato de exportação '{options['export-format']}' inválido. Disponíveis: {', '.join(EXPORT_FORMATS)}")
+            return
+        config.export_format = options['export-format']
+    if 'snapshot' in options:
+        config.snapshot_dir = options['snapshot']
+    if 'skew' in options:
+        try:
+            config.skew.update(parse_skew(options['skew']))
+        except ValueError as e:
+            print(f"❌ Erro: {e}")
+            return
+
+    # As opções acima são aplicadas depois da construção do preset:
+    # valida de novo antes da confirmação e da limpeza do banco
+    try:
+        config.validate()
+    except ValueError as e:
+        print(f"❌ Erro: {e}")
+        return
+
     # Inicialização
     engine = conn_db()
     fake = Faker('pt_BR')
@@ -64,12 +216,14 @@ def main():
         print("Operação cancelada pelo usuário.")
         return
     
-    # Limpeza do banco
-    try:
-        clean_database(engine)
-    except Exception as e:
-        print(f"❌ Erro durante limpeza: {e}")
-        return
+    # Limpeza do banco (a retomada continua sobre os dados já confirmados;
+    # a exportação para arquivos não usa o banco)
+    if not config.resume and not config.export_dir:
+        try:
+            clean_database(engine)
+        except Exception as e:
+            print(f"❌ Erro durante limpeza: {e}")
+            return
     
     # População dos dados
     with Session(engine) as session:
@@ -89,6 +243,8 @@ def main():
             import traceback
             traceback.print_exc()
             session.rollback()
+            if config.checkpoint or config.resume:
+                print(f"\n♻️  Progresso confirmado salvo. Para continuar: python main.py {config.preset_name} --resume")
 
 
 if __name__ == "__main__":
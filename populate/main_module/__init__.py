@@ -9,7 +9,18 @@ Estrutura:
 - statistics.py: Estatísticas e relatórios sobre os dados
 - database_cleaner.py: Limpeza e reset do banco de dados
 - batch_inserter.py: Funções genéricas para inserção em lotes
-- data_population.py: Lógica de população organizada por níveis
+- copy_writer.py: Motor de inserção via COPY usado pelo BatchInserter
+- id_allocator.py: Reserva de faixas de IDs das colunas de identidade
+- parallel_generation.py: Geração de lotes em múltiplos processos
+- value_pools.py: Pools pré-computados de valores do Faker
+- trigger_bypass.py: Carga sem triggers por linha e reconciliação em conjunto
+- index_rebuild.py: Remoção e reconstrução de índices e restrições
+- checkpoint.py: Checkpoints por etapa e por lote para retomar execuções
+- memory.py: Pico de memória por nível/entidade e orçamento de memória
+- metrics.py: Métricas de vazão por lote em JSON Lines ou CSV
+- dataset.py: Exportação do conjunto de dados para CSV/Parquet e carga em ordem de FKs
+- snapshot.py: Cache de snapshots por preset/semente/schema com restauração paralela
+- data_population/: Lógica de população organizada por níveis (e agendador em DAG)
 """
 
 from .config import DataConfig
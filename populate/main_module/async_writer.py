@@ -0,0 +1,191 @@
+"""
+Motor de inserção assíncrono (asyncio + asyncpg) para o BatchInserter.
+
+A geração continua no processo principal (ou no pool de processos); cada
+lote escrito vira uma lista de linhas por tabela e entra em uma fila
+limitada. Um loop asyncio em uma thread própria consome a fila com um pool
+pequeno de conexões asyncpg, de modo que vários lotes fiquem em voo ao mesmo
+tempo, um por conexão, enviados com `copy_records_to_table` (COPY binário).
+
+- contrapressão: com a fila cheia, `write` bloqueia até um lote ser enviado
+- ordem dos níveis: um lote de tabelas diferentes das dos lotes em voo
+  espera todos terminarem (as novas tabelas podem referenciar as anteriores)
+- pontos de commit: cada lote é confirmado na sua própria transação e
+  `flush` (chamado nos commits do BatchInserter) espera a fila esvaziar
+- tabelas com triggers dependentes da ordem (ex: num_seq dos comentários,
+  que trava o usuário com FOR UPDATE) são escritas uma de cada vez
+
+O pacote asyncpg é opcional: só é importado quando o motor é usado.
+"""
+
+import asyncio
+import threading
+from itertools import groupby
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.engine import URL
+
+from models import SCHEMA
+from .copy_writer import extract_rows
+
+
+# Lotes na fila por conexão (além dos que estão sendo enviados)
+QUEUE_BATCHES_PER_CONNECTION = 2
+
+# Trecho de um lote: (schema, tabela, colunas, linhas)
+TableRows = Tuple[str, str, List[str], List[tuple]]
+
+
+def _require_asyncpg():
+    try:
+        import asyncpg
+    except ImportError:
+        raise ValueError("O motor de inserção async requer o pacote asyncpg (pip install asyncpg)")
+    return asyncpg
+
+
+def asyncpg_dsn(url: URL) -> str:
+    """DSN do asyncpg a partir da URL do SQLAlchemy (sem o driver, ex: +psycopg2)."""
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class AsyncWriter:
+    """
+    Escreve lotes de objetos ORM no banco com várias conexões asyncpg.
+
+    Características:
+    - Fila limitada entre a geração (thread principal) e a escrita (loop asyncio)
+    - Um lote por conexão em voo, cada um em sua transação
+    - Barreira entre tabelas diferentes, preservando a ordem das FKs
+    - Erros de um lote reaparecem na próxima chamada a `write` ou `flush`
+    """
+
+    def __init__(self, url: URL, connections: int = 4, serial_tables: Iterable[str] = (),
+                 queue_size: Optional[int] = None):
+        """
+        Inicializa o AsyncWriter (abre o pool de conexões).
+
+        Args:
+            url: URL do banco (a mesma da engine do SQLAlchemy)
+            connections: Conexões do pool (lotes escritos simultaneamente)
+            serial_tables: Tabelas escritas um lote de cada vez, na ordem dos lotes
+            queue_size: Lotes aguardando na fila (padrão: 2 por conexão)
+        """
+        self.asyncpg = _require_asyncpg()
+        self.dsn = asyncpg_dsn(url)
+        self.connections = connections
+        self.serial_tables = frozenset(serial_tables)
+        self.queue_size = queue_size or QUEUE_BATCHES_PER_CONNECTION * connections
+        self.rows_sent = 0  # Linhas confirmadas no banco (acumulado)
+        self._tables: frozenset = frozenset()  # Tabelas dos lotes enfileirados desde a última barreira
+        self._error: Optional[BaseException] = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-writer", daemon=True)
+        self._thread.start()
+        try:
+            self._call(self._open())
+        except BaseException:
+            self._stop_loop()
+            raise
+
+    def write(self, objs: Sequence[Any]) -> int:
+        """
+        Enfileira os objetos para envio, bloqueando enquanto a fila estiver cheia.
+
+        Cada trecho consecutivo do mesmo modelo vira um COPY, na ordem da
+        lista, dentro da transação do lote.
+
+        Returns:
+            Número de linhas enfileiradas
+        """
+        self._raise_error()
+        groups: List[TableRows] = []
+        for _, group in groupby(objs, key=type):
+            layout, columns, rows = extract_rows(list(group))
+            groups.append((layout.table.schema or SCHEMA, layout.table.name, columns, rows))
+        if not groups:
+            return 0
+
+        tables = frozenset(table for _, table, _, _ in groups)
+        if tables != self._tables:
+            # As tabelas novas podem referenciar linhas dos lotes ainda em voo
+            self.flush()
+            self._tables = tables
+        self._call(self._queue.put((groups, bool(tables & self.serial_tables))))
+        return sum(len(rows) for _, _, _, rows in groups)
+
+    def flush(self) -> None:
+        """Espera todos os lotes enfileirados serem confirmados no banco."""
+        self._call(self._queue.join())
+        self._raise_error()
+
+    def close(self) -> None:
+        """Espera os lotes pendentes, fecha o pool e encerra o loop."""
+        if self._loop.is_closed():
+            return
+        try:
+            self._call(self._queue.join())
+            self._call(self._close())
+        finally:
+            self._stop_loop()
+
+    # ------------------------------------------------------------------
+    # Loop asyncio (thread do escritor)
+    # ------------------------------------------------------------------
+
+    async def _open(self) -> None:
+        # O search_path da engine (connect_args) também vale para as funções de trigger
+        self._pool = await self.asyncpg.create_pool(
+            self.dsn, min_size=self.connections, max_size=self.connections,
+            server_settings={'search_path': SCHEMA}
+        )
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._serial = asyncio.Lock()
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.connections)]
+
+    async def _close(self) -> None:
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        await self._pool.close()
+
+    async def _consume(self) -> None:
+        while True:
+            groups, serial = await self._queue.get()
+            try:
+                # Depois de um erro os lotes restantes são descartados
+                if self._error is None:
+                    if serial:
+                        # O lock do asyncio é justo: os lotes seguem a ordem da fila
+                        async with self._serial:
+                            await self._send(groups)
+                    else:
+                        await self._send(groups)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, groups: List[TableRows]) -> None:
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                for schema, table, columns, rows in groups:
+                    await connection.copy_records_to_table(table, records=rows, columns=columns, schema_name=schema)
+        self.rows_sent += sum(len(rows) for _, _, _, rows in groups)
+
+    # ------------------------------------------------------------------
+    # Auxiliares da thread principal
+    # ------------------------------------------------------------------
+
+    def _call(self, coro) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _stop_loop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
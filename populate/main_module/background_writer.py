@@ -0,0 +1,150 @@
+"""
+Escrita em segundo plano (buffer duplo) para o BatchInserter.
+
+Sem ela, o lote N+1 só começa a ser gerado quando a escrita do lote N
+termina, e o tempo de cada lote é geração + escrita. Aqui uma thread
+escritora, com sessão e conexão próprias, envia o lote N (ORM ou COPY)
+enquanto a thread principal gera o N+1; o tempo tende a
+max(geração, escrita).
+
+- contrapressão: no máximo `in_flight` lotes entregues e ainda não escritos;
+  `write` bloqueia enquanto o limite estiver atingido
+- erros: um lote que falha desfaz a transação da thread escritora, os lotes
+  seguintes são descartados e o erro reaparece no próximo `write` ou `flush`
+- commits: `flush` espera os lotes pendentes e faz commit da sessão da
+  thread escritora, tornando os dados visíveis para a sessão principal
+
+O ganho vem do tempo em que o driver espera o servidor (rede, COPY,
+restrições e triggers), no qual o GIL fica livre para a geração.
+"""
+
+import queue
+import threading
+from itertools import groupby
+from typing import Any, Optional, Sequence
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .copy_writer import CopyWriter, EncodedBatch
+
+
+# Tarefas da fila da thread escritora
+WRITE = "write"
+COMMIT = "commit"
+
+
+def write_orm(session: Session, objs: Sequence[Any]) -> int:
+    """
+    Insere objetos com add_all + flush, um flush por trecho do mesmo modelo.
+
+    Sem relationships, o unit of work não ordena os INSERTs pelas FKs entre
+    tabelas: o flush por trecho preserva a ordem da lista.
+
+    Returns:
+        Número de linhas enviadas
+    """
+    for _, group in groupby(objs, key=type):
+        session.add_all(list(group))
+        session.flush()
+    return len(objs)
+
+
+def count_rows(objs: Sequence[Any]) -> int:
+    """Linhas de uma lista de objetos ORM e/ou lotes já codificados para COPY."""
+    return sum(item.rows if isinstance(item, EncodedBatch) else 1 for item in objs)
+
+
+class BackgroundWriter:
+    """
+    Escreve os lotes em uma thread dedicada, com conexão própria.
+
+    Características:
+    - Mesmos motores do BatchInserter ("orm" ou "copy"), na sessão da thread
+    - Limite de lotes em voo (contrapressão) com um semáforo
+    - Ordem dos lotes preservada (uma única thread consome a fila)
+    - Erros de um lote reaparecem na próxima chamada a `write` ou `flush`
+    """
+
+    def __init__(self, engine: Engine, insert_engine: str = "orm", in_flight: int = 2):
+        """
+        Inicializa o BackgroundWriter (inicia a thread escritora).
+
+        Args:
+            engine: Engine do SQLAlchemy (a thread abre a sua própria sessão)
+            insert_engine: Motor de inserção da thread ("orm" ou "copy")
+            in_flight: Lotes entregues e ainda não escritos (1 = buffer duplo: um lote
+                é escrito enquanto o próximo é gerado)
+
+        Raises:
+            ValueError: Se in_flight for menor que 1 (o primeiro `write` bloquearia para sempre)
+        """
+        if in_flight < 1:
+            raise ValueError("O número de lotes em voo deve ser pelo menos 1")
+        self.insert_engine = insert_engine
+        self.in_flight = in_flight
+        self.session = Session(engine)
+        self.copy_writer = CopyWriter(self.session) if insert_engine == "copy" else None
+        self._slots = threading.BoundedSemaphore(in_flight)
+        self._queue: queue.Queue = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="background-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, objs: Sequence[Any]) -> int:
+        """
+        Entrega um lote à thread escritora, bloqueando se o limite de lotes
+        em voo tiver sido atingido.
+
+        Returns:
+            Número de linhas entregues
+        """
+        self._slots.acquire()
+        if self._error is not None:
+            # O erro pode ter surgido enquanto a vaga era aguardada
+            self._slots.release()
+            raise self._error
+        self._queue.put((WRITE, objs))
+        return count_rows(objs)
+
+    def flush(self) -> None:
+        """Espera os lotes pendentes e faz commit da sessão da thread escritora."""
+        self._queue.put((COMMIT, None))
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Espera os lotes pendentes e encerra a thread (sem commit do que restar)."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self.session.close()
+
+    def _run(self) -> None:
+        while True:
+            task = self._queue.get()
+            if task is None:
+                self._queue.task_done()
+                return
+            action, objs = task
+            try:
+                # Depois de um erro os lotes restantes são descartados
+                if self._error is None:
+                    if action == COMMIT:
+                        self.session.commit()
+                    elif self.copy_writer is not None:
+                        self.copy_writer.write(objs)
+                    else:
+                        write_orm(self.session, objs)
+            except Exception as error:
+                self._error = error
+                self.session.rollback()
+            finally:
+                if action == WRITE:
+                    self._slots.release()
+                self._queue.task_done()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
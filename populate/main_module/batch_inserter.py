@@ -2,16 +2,32 @@
 Módulo genérico para inserção de dados em lotes.
 
 Este módulo fornece uma classe BatchInserter que abstrai toda a lógica
-de inserção em lotes, controle de progresso, garbage collection e commits.
+de inserção em lotes, controle de progresso e commits. Cada lote é liberado
+assim que escrito (a contagem de referências basta), sem coletas forçadas
+do garbage collector entre lotes.
 """
 
 import gc
 import time
 import random
-from typing import Callable, Any, Optional, Dict, List
+from contextlib import nullcontext
+from typing import Callable, Any, Optional, Iterable, List, Sequence, Iterator, Tuple, Union
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from faker import Faker
 
+from aux_func.streaming import chunks
+
+from .async_writer import AsyncWriter
+from .background_writer import BackgroundWriter, write_orm
+from .checkpoint import Checkpoint
+from .copy_writer import CopyWriter
+from .dataset import DatasetWriter
+from .id_allocator import IdAllocator
+from .memory import MemoryMonitor
+from .metrics import BatchMetric, MetricsRecorder
+from .parallel_generation import ParallelGenerator, batch_seed
+
 
 class BatchInserter:
     """
@@ -20,22 +36,330 @@ class BatchInserter:
     Características:
     - Inserção em lotes com tamanho configurável
     - Controle de progresso com impressão em tempo real
-    - Garbage collection automático entre lotes
+    - Inserção de fluxos (iteradores) reagrupados em lotes de memória limitada
     - Commits intermediários configuráveis
     - Suporte a offset para garantir unicidade
-    - Suporte a estados compartilhados entre lotes
+    - Motor de inserção selecionável: ORM (add_all + flush), COPY ou assíncrono
+      (vários lotes em voo em conexões asyncpg, AsyncWriter)
+    - Escrita em segundo plano sobreposta à geração (BackgroundWriter opcional)
+    - Geração paralela em múltiplos processos com um único escritor
+    - Checkpoints por lote para retomar cargas interrompidas
+    - Pico de memória por entidade (MemoryMonitor opcional)
+    - Métricas por lote em arquivo (MetricsRecorder opcional) e modo silencioso
+    - Exportação para arquivos em vez do banco (DatasetWriter opcional)
     """
     
-    def __init__(self, session: Session, fake: Faker):
+    def __init__(
+        self,
+        session: Session,
+        fake: Faker,
+        insert_engine: str = "orm",
+        ids: Optional[IdAllocator] = None,
+        workers: int = 1,
+        seed: Optional[int] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        memory: Optional[MemoryMonitor] = None,
+        metrics: Optional[MetricsRecorder] = None,
+        quiet: bool = False,
+        dataset: Optional[DatasetWriter] = None,
+        writer: Optional[Union[AsyncWriter, BackgroundWriter]] = None
+    ):
         """
         Inicializa o BatchInserter.
         
         Args:
             session: Sessão do SQLAlchemy
             fake: Instância do Faker para geração de dados
+            insert_engine: Motor de inserção ("orm", "copy" ou "async")
+            ids: Alocador de faixas de IDs compartilhado entre os níveis
+            workers: Processos para geração paralela (1 = gera no processo principal)
+            seed: Semente da execução, usada para derivar a semente de cada lote paralelo
+            checkpoint: Registro de progresso para retomada (None = sem checkpoints)
+            memory: Monitor do pico de memória por entidade (None = sem medição)
+            metrics: Gravador das métricas por lote (None = sem métricas)
+            quiet: Se True, não imprime o progresso de cada lote
+            dataset: Destino em arquivos (None = escreve no banco); as releituras
+                de `fetch_columns` e `fetch_keys` passam a vir dos arquivos
+            writer: Escritor em segundo plano: AsyncWriter (obrigatório no motor "async",
+                exceto na exportação) ou BackgroundWriter (escrita sobreposta à geração);
+                os commits e releituras esperam os lotes pendentes
         """
+        if insert_engine == "async" and dataset is None and writer is None:
+            raise ValueError("O motor de inserção async requer um AsyncWriter")
+        if workers < 1:
+            raise ValueError("O número de workers deve ser pelo menos 1")
         self.session = session
         self.fake = fake
+        self.insert_engine = insert_engine
+        self.ids = ids if ids is not None else IdAllocator(session)
+        self.dataset = dataset
+        self.writer = writer if dataset is None else None
+        self.copy_writer = CopyWriter(session) if insert_engine == "copy" and dataset is None and self.writer is None else None
+        self.workers = workers
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self._pool: Optional[ParallelGenerator] = None
+        self.checkpoint = checkpoint
+        self.step: Optional[str] = None  # Etapa em execução (definida por `checkpointed`)
+        self.memory = memory
+        self.metrics = metrics
+        self.quiet = quiet
+        self.batch_metric: Optional[BatchMetric] = None  # Lote em andamento (com métricas ativas)
+    
+    def write(self, objs: Sequence[Any]) -> int:
+        """
+        Envia objetos ao banco usando o motor de inserção configurado
+        (ou aos arquivos do conjunto de dados, na exportação).
+        
+        Args:
+            objs: Objetos ORM a inserir (podem ser de modelos diferentes)
+                ou lotes já codificados para COPY
+            
+        Returns:
+            Número de linhas enviadas
+        """
+        inicio = time.perf_counter()
+        if self.dataset is not None:
+            sent = self.dataset.bytes_written
+            rows = self.dataset.write(objs)
+        elif self.copy_writer is not None:
+            sent = self.copy_writer.bytes_sent
+            rows = self.copy_writer.write(objs)
+        elif self.writer is not None:
+            rows = self.writer.write(objs)
+        else:
+            rows = write_orm(self.session, objs)
+        
+        metric = self.batch_metric
+        if metric is not None:
+            metric.linhas += rows
+            metric.escrita_s += time.perf_counter() - inicio
+            if self.dataset is not None and self.dataset.file_format == "csv":
+                metric.bytes = (metric.bytes or 0) + self.dataset.bytes_written - sent
+            elif self.copy_writer is not None:
+                metric.bytes = (metric.bytes or 0) + self.copy_writer.bytes_sent - sent
+        return rows
+    
+    def fetch_columns(self, *columns: Any, batch_size: Optional[int] = None, limit: Optional[int] = None,
+                      order_by: Optional[Any] = None) -> Iterable[Any]:
+        """
+        Percorre colunas de uma tabela já populada, sob demanda.
+        
+        Args:
+            *columns: Atributos ORM de um mesmo modelo (ex: Comentario.id_video)
+            batch_size: Linhas buscadas por vez com um cursor no servidor (None = todas de uma vez)
+            limit: Máximo de linhas (None = todas)
+            order_by: Ordenação no banco (None = ordem física, que o PostgreSQL não garante);
+                os arquivos da exportação são lidos na ordem em que foram escritos
+            
+        Returns:
+            Iterável de linhas com os atributos pedidos
+        """
+        if self.dataset is not None:
+            return self.dataset.read(columns, limit)
+        self.flush()
+        query = select(*columns)
+        if order_by is not None:
+            query = query.order_by(order_by)
+        if limit is not None:
+            query = query.limit(limit)
+        if batch_size is not None:
+            query = query.execution_options(yield_per=batch_size)
+        return self.session.execute(query)
+    
+    def fetch_keys(self, column: Any) -> List[Any]:
+        """
+        Lê uma coluna de chave de uma tabela já populada, sem montar objetos do ORM.
+        
+        Os relacionamentos mapeiam índices de permutação para posições desta
+        lista: a ordem precisa ser a mesma em toda execução (e na retomada).
+        
+        Args:
+            column: Atributo ORM da chave (ex: Plataforma.nro, Pais.ddi)
+            
+        Returns:
+            Lista com os valores da coluna, em ordem crescente
+        """
+        if self.dataset is not None:
+            return sorted(key for key, in self.fetch_columns(column))
+        return [key for key, in self.fetch_columns(column, order_by=column)]
+    
+    def flush(self) -> None:
+        """Espera os lotes ainda em voo no escritor em segundo plano, se houver."""
+        if self.writer is not None:
+            self.writer.flush()
+    
+    def commit(self) -> None:
+        """Faz commit da sessão, contando o tempo no lote em andamento."""
+        inicio = time.perf_counter()
+        self.flush()
+        self.session.commit()
+        if self.batch_metric is not None:
+            self.batch_metric.commit_s += time.perf_counter() - inicio
+    
+    def iter_batches(
+        self,
+        generator_func: Callable,
+        total_count: int,
+        batch_size: int,
+        entity_name: str,
+        *args,
+        use_offset: bool = True,
+        **kwargs
+    ) -> Iterator[Tuple[int, int, List[Any]]]:
+        """
+        Gera os lotes de uma entidade, em sequência ou no pool de processos.
+        
+        Os lotes são sempre entregues na ordem, com offsets disjuntos. Com
+        workers > 1, a função geradora precisa ser importável (nível de módulo)
+        e os argumentos serializáveis; no motor "copy" os lotes já chegam
+        codificados.
+        
+        Args:
+            generator_func: Função que gera os dados (fake, count, *args, [offset], **kwargs)
+            total_count: Total de registros a gerar
+            batch_size: Tamanho de cada lote
+            entity_name: Nome da entidade (usado para derivar a semente dos lotes)
+            *args: Argumentos posicionais para a função geradora
+            use_offset: Se True, passa o offset do lote após *args
+            **kwargs: Argumentos nomeados para a função geradora
+            
+        Yields:
+            Tuplas (número do lote, total de lotes, lote gerado)
+        """
+        total_batches = (total_count + batch_size - 1) // batch_size
+        
+        # Lotes já confirmados em uma execução anterior são pulados
+        skipped, _ = self.resume_point()
+        if skipped:
+            print(f"    ↪️  Retomando {entity_name} a partir do lote {skipped + 1}/{total_batches}")
+        
+        def call_args():
+            offset = 0
+            for batch_num in range(1, total_batches + 1):
+                current_size = min(batch_size, total_count - offset)
+                extra = (offset,) if use_offset else ()
+                if batch_num > skipped:
+                    yield batch_num, (current_size, *args, *extra)
+                offset += current_size
+        
+        if self.workers <= 1:
+            def sequential():
+                for batch_num, batch_args in call_args():
+                    # Mesma semente por lote usada pelos processos trabalhadores
+                    seed = batch_seed(self.seed, entity_name, batch_num)
+                    random.seed(seed)
+                    self.fake.seed_instance(seed)
+                    yield generator_func(self.fake, *batch_args, **kwargs)
+            batches = sequential()
+        else:
+            tasks = (
+                (batch_seed(self.seed, entity_name, batch_num), batch_args, kwargs)
+                for batch_num, batch_args in call_args()
+            )
+            batches = self._get_pool().map_ordered(generator_func, tasks)
+        
+        # O escopo de memória cobre geração e escrita de todos os lotes; as
+        # métricas de um lote são gravadas quando o consumidor pede o próximo
+        with self.track_memory(entity_name):
+            generation_start = time.perf_counter()
+            for batch_num, batch_data in enumerate(batches, start=skipped + 1):
+                self._start_metric(entity_name, batch_num, generation_start)
+                yield batch_num, total_batches, batch_data
+                self._finish_metric()
+                if batch_num == skipped + 1:
+                    self.snapshot_memory(entity_name)
+                generation_start = time.perf_counter()
+    
+    def fork(self, session: Session, fake: Faker) -> 'BatchInserter':
+        """
+        Cria um BatchInserter para outra sessão (ex: uma tarefa do agendador
+        em DAG), compartilhando IDs reservados, semente, checkpoints e pool de processos.
+        
+        Args:
+            session: Sessão própria da tarefa
+            fake: Instância do Faker da tarefa
+            
+        Returns:
+            Novo BatchInserter ligado à sessão informada
+        """
+        forked = BatchInserter(
+            session, fake, self.insert_engine, self.ids, self.workers, self.seed, self.checkpoint,
+            self.memory, self.metrics, self.quiet, self.dataset, self.writer
+        )
+        if self.workers > 1:
+            forked._pool = self._get_pool()
+        return forked
+    
+    def resume_point(self) -> Tuple[int, int]:
+        """Retorna (lotes, linhas) já confirmados da etapa em execução."""
+        if self.checkpoint is None or self.step is None:
+            return 0, 0
+        return self.checkpoint.resume_point(self.step)
+    
+    def save_progress(self, batch_num: int, rows: int) -> None:
+        """
+        Registra o último lote da etapa em execução, se houver checkpoints.
+        
+        O registro entra na transação da sessão: deve preceder todo commit
+        feito no meio de uma etapa.
+        """
+        if self.checkpoint is not None and self.step is not None:
+            self.checkpoint.save_progress(self.session, self.step, batch_num, rows)
+    
+    def track_memory(self, name: str):
+        """Escopo de medição do pico de memória (nível ou entidade), se houver monitor."""
+        if self.memory is None:
+            return nullcontext()
+        return self.memory.track(name)
+    
+    def snapshot_memory(self, name: str) -> None:
+        """Registra os maiores alocadores do escopo, se o monitor usar tracemalloc."""
+        if self.memory is not None:
+            self.memory.snapshot(name)
+    
+    def _start_metric(self, entity_name: str, batch_num: int, generation_start: float) -> None:
+        # Abre as métricas do lote recém-gerado (geração = espera pelo lote)
+        if self.metrics is not None:
+            self.batch_metric = BatchMetric(
+                entity_name, batch_num,
+                geracao_s=time.perf_counter() - generation_start,
+                inicio_s=generation_start - self.metrics.started
+            )
+    
+    def _finish_metric(self) -> None:
+        if self.batch_metric is not None:
+            self.metrics.record(self.batch_metric)
+            self.batch_metric = None
+    
+    def checkpoint_batch(self, batch_num: int, rows: int, every: Optional[int] = None) -> None:
+        """
+        Commit periódico junto com o registro do lote no checkpoint.
+        
+        Com checkpoint ativo segue o intervalo do checkpoint (--checkpoint-every);
+        sem ele, faz um commit simples a cada `every` lotes, se informado.
+        
+        Args:
+            batch_num: Número do lote recém-escrito (a partir de 1)
+            rows: Linhas escritas na etapa até este lote
+            every: Intervalo de commits sem checkpoint (None = sem commits)
+        """
+        if self.checkpoint is not None and self.step is not None:
+            if batch_num % self.checkpoint.every == 0:
+                self.save_progress(batch_num, rows)
+                self.commit()
+        elif every is not None and batch_num % every == 0:
+            self.commit()
+    
+    def close(self) -> None:
+        """Encerra o pool de processos, se tiver sido criado."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+    
+    def _get_pool(self) -> ParallelGenerator:
+        if self._pool is None:
+            self._pool = ParallelGenerator(self.fake, self.workers, encode=self.insert_engine == "copy" and self.dataset is None)
+        return self._pool
     
     def insert_simple(
         self,
@@ -61,28 +385,21 @@ class BatchInserter:
             Tempo total de execução em segundos
         """
         inicio = time.time()
-        inserted = 0
-        total_batches = (total_count + batch_size - 1) // batch_size
+        _, inserted = self.resume_point()
         
-        for batch_num in range(1, total_batches + 1):
-            current_size = min(batch_size, total_count - inserted)
-            
-            # Gera o lote
-            batch_data = generator_func(self.fake, current_size, *args, **kwargs)
-            
+        batches = self.iter_batches(
+            generator_func, total_count, batch_size, entity_name, *args, use_offset=False, **kwargs
+        )
+        for batch_num, total_batches, batch_data in batches:
             # Insere no banco
-            self.session.add_all(batch_data)
-            self.session.flush()
-            
-            inserted += len(batch_data)
-            progress = (inserted / total_count) * 100
-            print(f"    [{batch_num}/{total_batches}] {progress:.1f}% - {inserted:,}/{total_count:,} {entity_name}", end='\r')
-            
-            # Limpa memória
-            del batch_data
-            gc.collect()
+            inserted += self.write(batch_data)
+            if not self.quiet:
+                progress = (inserted / total_count) * 100
+                print(f"    [{batch_num}/{total_batches}] {progress:.1f}% - {inserted:,}/{total_count:,} {entity_name}", end='\r')
+            self.checkpoint_batch(batch_num, inserted)
         
-        print()  # Nova linha após progresso
+        if not self.quiet:
+            print()  # Nova linha após progresso
         return time.time() - inicio
     
     def insert_with_offset(
@@ -109,96 +426,69 @@ class BatchInserter:
             Tempo total de execução em segundos
         """
         inicio = time.time()
-        inserted = 0
-        offset = 0
-        total_batches = (total_count + batch_size - 1) // batch_size
+        _, inserted = self.resume_point()
         
-        for batch_num in range(1, total_batches + 1):
-            current_size = min(batch_size, total_count - inserted)
-            
-            # Gera o lote com offset
-            batch_data = generator_func(self.fake, current_size, *args, offset, **kwargs)
-            
+        # Gera os lotes com offset (em paralelo, se configurado)
+        batches = self.iter_batches(
+            generator_func, total_count, batch_size, entity_name, *args, **kwargs
+        )
+        for batch_num, total_batches, batch_data in batches:
             # Insere no banco
-            self.session.add_all(batch_data)
-            self.session.flush()
-            
-            inserted += len(batch_data)
-            offset += current_size
-            progress = (inserted / total_count) * 100
-            print(f"    [{batch_num}/{total_batches}] {progress:.1f}% - {inserted:,}/{total_count:,} {entity_name}", end='\r')
-            
-            # Limpa memória
-            del batch_data
-            gc.collect()
+            inserted += self.write(batch_data)
+            if not self.quiet:
+                progress = (inserted / total_count) * 100
+                print(f"    [{batch_num}/{total_batches}] {progress:.1f}% - {inserted:,}/{total_count:,} {entity_name}", end='\r')
+            self.checkpoint_batch(batch_num, inserted)
         
-        print()
+        if not self.quiet:
+            print()
         return time.time() - inicio
     
-    def insert_with_state(
+    def insert_stream(
         self,
-        generator_func: Callable,
-        total_count: int,
+        rows: Iterable[Any],
         batch_size: int,
         entity_name: str,
-        state: Dict[str, Any],
-        sample_data: List[Any],
-        sample_size_multiplier: int = 2,
-        fetch_model: Optional[Any] = None,
-        *args,
-        **kwargs
+        total_count: Optional[int] = None
     ) -> float:
         """
-        Insere dados em lotes com estado compartilhado (para relacionamentos complexos).
+        Insere um fluxo de linhas em lotes, materializando um lote por vez.
+        
+        Usado com as variantes `iter_*` dos geradores. Não há checkpoints por
+        lote: o fluxo não pode ser retomado no meio, então a etapa é refeita
+        por inteiro.
         
         Args:
-            generator_func: Função que gera os dados (sample, count, state, *args, **kwargs)
-            total_count: Total de registros a inserir
+            rows: Iterável de objetos ORM (consumido sob demanda)
             batch_size: Tamanho de cada lote
             entity_name: Nome da entidade (para logging)
-            state: Dicionário de estado compartilhado entre lotes
-            sample_data: Lista de IDs ou objetos para amostrar
-            sample_size_multiplier: Multiplicador do tamanho da amostra (padrão: 2x)
-            fetch_model: Se fornecido, busca objetos do modelo a partir dos IDs em sample_data
-            *args: Argumentos posicionais para a função geradora
-            **kwargs: Argumentos nomeados para a função geradora
+            total_count: Total esperado, apenas para o progresso (opcional)
             
         Returns:
             Tempo total de execução em segundos
         """
         inicio = time.time()
         inserted = 0
-        total_batches = (total_count + batch_size - 1) // batch_size
         
-        for batch_num in range(1, total_batches + 1):
-            current_size = min(batch_size, total_count - inserted)
-            
-            # Amostra dados para este lote
-            sample_size = min(current_size * sample_size_multiplier, len(sample_data))
-            sample_ids = random.sample(sample_data, sample_size)
-            
-            # Se fetch_model foi fornecido, busca os objetos correspondentes
-            if fetch_model is not None:
-                sample = self.session.query(fetch_model).filter(fetch_model.id.in_(sample_ids)).all()
-            else:
-                sample = sample_ids
-            
-            # Gera o lote com estado
-            batch_data = generator_func(sample, current_size, state, *args, **kwargs)
-            
-            # Insere no banco
-            self.session.add_all(batch_data)
-            self.session.flush()
-            
-            inserted += len(batch_data)
-            progress = (inserted / total_count) * 100
-            print(f"    [{batch_num}/{total_batches}] {progress:.1f}% - {inserted:,}/{total_count:,} {entity_name}", end='\r')
-            
-            # Limpa memória
-            del batch_data, sample
-            gc.collect()
+        with self.track_memory(entity_name):
+            generation_start = time.perf_counter()
+            for batch_num, batch_data in enumerate(chunks(rows, batch_size), start=1):
+                self._start_metric(entity_name, batch_num, generation_start)
+                inserted += self.write(batch_data)
+                if not self.quiet:
+                    if total_count:
+                        progress = min(inserted / total_count, 1) * 100
+                        print(f"    [{batch_num}] {progress:.1f}% - {inserted:,}/{total_count:,} {entity_name}", end='\r')
+                    else:
+                        print(f"    [{batch_num}] {inserted:,} {entity_name}", end='\r')
+                self._finish_metric()
+                if batch_num == 1:
+                    self.snapshot_memory(entity_name)
+                del batch_data
+                generation_start = time.perf_counter()
         
-        print()
+        if not self.quiet:
+            print()
         return time.time() - inicio
     
     def commit_with_timing(self, label: str = "Commit") -> float:
@@ -213,8 +503,12 @@ class BatchInserter:
         """
         print(f"    💾 Realizando {label}...")
         inicio = time.time()
+        self.flush()
         self.session.commit()
         tempo = time.time() - inicio
         print(f"    ✓ {label} concluído em {tempo:.2f}s")
+        if self.metrics is not None:
+            # Commits entre níveis aparecem como um registro sem linhas
+            self.metrics.record(BatchMetric(label, 0, commit_s=tempo, inicio_s=self.metrics.elapsed() - tempo))
         gc.collect()
         return tempo
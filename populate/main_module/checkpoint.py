@@ -0,0 +1,234 @@
+"""
+Checkpoints duráveis da população, para retomar execuções interrompidas.
+
+Uma execução longa que falha no meio não precisa recomeçar do zero: o
+progresso fica registrado na tabela `core.checkpoint_populacao`, sempre na
+mesma transação dos dados a que se refere:
+
+- uma linha da execução (`__execucao__`) com a semente, as contagens
+  sorteadas pelo preset, as faixas de IDs reservadas e as seleções nomeadas
+- uma linha por etapa (tabela do agendador), com o último lote confirmado
+  e se a etapa terminou
+
+Os geradores derivam a unicidade do offset de cada lote e as chaves das
+permutações da semente da execução, de modo que retomar a partir do lote
+seguinte não repete chaves. Etapas sem lotes (uma única escrita) são
+refeitas por inteiro, pois seus dados só são confirmados junto com o
+registro de conclusão.
+"""
+
+import functools
+import json
+from dataclasses import asdict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import models
+
+
+# Linha com o estado da execução (semente, contagens, IDs)
+RUN_STEP = "__execucao__"
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS core.checkpoint_populacao (
+    etapa TEXT PRIMARY KEY,
+    concluida BOOLEAN NOT NULL DEFAULT FALSE,
+    lotes INTEGER NOT NULL DEFAULT 0,
+    linhas BIGINT NOT NULL DEFAULT 0,
+    estado JSONB,
+    atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+UPSERT_SQL = """
+INSERT INTO core.checkpoint_populacao (etapa, concluida, lotes, linhas, estado, atualizado_em)
+VALUES (:etapa, :concluida, :lotes, :linhas, CAST(:estado AS JSONB), now())
+ON CONFLICT (etapa) DO UPDATE
+SET concluida = EXCLUDED.concluida,
+    lotes = EXCLUDED.lotes,
+    linhas = EXCLUDED.linhas,
+    estado = COALESCE(EXCLUDED.estado, checkpoint_populacao.estado),
+    atualizado_em = now()
+"""
+
+
+class StepProgress(NamedTuple):
+    """Progresso confirmado de uma etapa."""
+    concluida: bool
+    lotes: int
+    linhas: int
+
+
+class Checkpoint:
+    """
+    Registra e restaura o progresso de uma execução de população.
+
+    Características:
+    - Checkpoints gravados na mesma transação dos dados (nunca adiantados)
+    - Estado da execução restaurado na retomada (semente, contagens e IDs)
+    - Retomada por etapa concluída e, dentro da etapa, pelo último lote
+    """
+
+    def __init__(self, engine: Engine, every: int = 5):
+        """
+        Inicializa o Checkpoint.
+
+        Args:
+            engine: Engine do SQLAlchemy
+            every: Lotes entre checkpoints (cada checkpoint faz commit)
+        """
+        if every < 1:
+            raise ValueError("O intervalo entre checkpoints deve ser de pelo menos 1 lote")
+        self.engine = engine
+        self.every = every
+        self.steps: Dict[str, StepProgress] = {}
+        self.run_state: Optional[Dict[str, Any]] = None
+
+    @property
+    def resuming(self) -> bool:
+        """Indica se a execução atual retoma um checkpoint anterior."""
+        return self.run_state is not None
+
+    def reset(self) -> None:
+        """Cria a tabela de checkpoints, se necessário, e descarta o progresso anterior."""
+        with self.engine.begin() as connection:
+            connection.execute(text(CREATE_SQL))
+            connection.execute(text("TRUNCATE core.checkpoint_populacao"))
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Lê o progresso confirmado da última execução.
+
+        Returns:
+            Estado da execução (semente, contagens, IDs reservados)
+
+        Raises:
+            ValueError: Se não houver execução registrada para retomar
+        """
+        with self.engine.begin() as connection:
+            connection.execute(text(CREATE_SQL))
+            rows = connection.execute(text(
+                "SELECT etapa, concluida, lotes, linhas, estado FROM core.checkpoint_populacao"
+            )).mappings().all()
+
+        for row in rows:
+            if row['etapa'] == RUN_STEP:
+                self.run_state = row['estado']
+            else:
+                self.steps[row['etapa']] = StepProgress(row['concluida'], row['lotes'], row['linhas'])
+        if self.run_state is None:
+            raise ValueError("Nenhum checkpoint encontrado para retomar; execute sem --resume")
+        return self.run_state
+
+    def begin(self, session: Session, config, seed: int, ids) -> None:
+        """
+        Registra o estado da execução (na transação da sessão).
+
+        Args:
+            session: Sessão do SQLAlchemy
+            config: Configuração de volume de dados
+            seed: Semente da execução usada pelo BatchInserter
+            ids: Alocador com as faixas e seleções já reservadas
+        """
+        state = {
+            'preset': config.preset_name,
+            'seed': seed,
+            'fused_donations': config.fused_donations,
+            'batch_sizes': asdict(config.batch_sizes),
+            # As contagens do preset são sorteadas a cada importação
+            'contagens': config.counts(),
+            'faixas': {model.__name__: [reserved.start, reserved.stop] for model, reserved in ids.ranges.items()},
+            'selecoes': ids.selections,
+        }
+        self._upsert(session, RUN_STEP, StepProgress(False, 0, 0), state)
+
+    def apply(self, config) -> int:
+        """
+        Restaura na configuração as contagens e os tamanhos de lote da
+        execução interrompida (que podem ter sido ajustados ao orçamento de memória).
+
+        Returns:
+            Semente da execução interrompida
+
+        Raises:
+            ValueError: Se a configuração for incompatível com o checkpoint
+        """
+        state = self.run_state
+        if state['preset'] != config.preset_name:
+            raise ValueError(f"Checkpoint do preset '{state['preset']}', não de '{config.preset_name}'")
+        if state['fused_donations'] != config.fused_donations:
+            raise ValueError("O passe fundido deve ser o mesmo da execução interrompida")
+        # Os lotes já confirmados foram contados com estes tamanhos
+        config.batch_sizes = type(config.batch_sizes)(**state['batch_sizes'])
+        for name, value in state['contagens'].items():
+            setattr(config, name, value)
+        return state['seed']
+
+    def restore_ids(self, ids) -> None:
+        """Restaura no alocador as faixas e seleções da execução interrompida."""
+        for name, (start, stop) in self.run_state['faixas'].items():
+            ids.restore(getattr(models, name), range(start, stop))
+        ids.selections.update(self.run_state['selecoes'])
+
+    def is_done(self, step: str) -> bool:
+        """Indica se a etapa já foi concluída e confirmada."""
+        progress = self.steps.get(step)
+        return progress is not None and progress.concluida
+
+    def resume_point(self, step: str) -> Tuple[int, int]:
+        """Retorna (lotes, linhas) já confirmados da etapa."""
+        progress = self.steps.get(step)
+        if progress is None or progress.concluida:
+            return 0, 0
+        return progress.lotes, progress.linhas
+
+    def save_progress(self, session: Session, step: str, batches: int, rows: int) -> None:
+        """Registra o último lote da etapa (confirmado no próximo commit da sessão)."""
+        self._upsert(session, step, StepProgress(False, batches, rows))
+
+    def mark_done(self, session: Session, step: str) -> None:
+        """Registra a conclusão da etapa (confirmada no próximo commit da sessão)."""
+        self._upsert(session, step, StepProgress(True, 0, 0))
+
+    def _upsert(self, session: Session, step: str, progress: StepProgress, state: Optional[dict] = None) -> None:
+        session.execute(text(UPSERT_SQL), {
+            'etapa': step,
+            'concluida': progress.concluida,
+            'lotes': progress.lotes,
+            'linhas': progress.linhas,
+            'estado': json.dumps(state) if state is not None else None,
+        })
+
+
+def checkpointed(populate: Callable) -> Callable:
+    """
+    Torna uma função `populate_<tabela>` retomável.
+
+    O nome da etapa é o sufixo da função (o mesmo das tarefas do agendador).
+    Etapas concluídas são puladas; as demais rodam com o BatchInserter
+    apontando para a etapa e, ao final, a conclusão é confirmada com os dados.
+    """
+    step = populate.__name__.removeprefix('populate_')
+
+    @functools.wraps(populate)
+    def wrapper(session: Session, fake, config, inserter) -> None:
+        checkpoint = inserter.checkpoint
+        if checkpoint is None:
+            return populate(session, fake, config, inserter)
+        if checkpoint.is_done(step):
+            print(f"    ↪️  {step}: concluída na execução anterior")
+            return None
+
+        inserter.step = step
+        try:
+            populate(session, fake, config, inserter)
+        finally:
+            inserter.step = None
+        checkpoint.mark_done(session, step)
+        session.commit()
+        return None
+
+    return wrapper
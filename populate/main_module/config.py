@@ -6,8 +6,11 @@ desde desenvolvimento rápido até testes de stress extremos.
 """
 
 import random
-from dataclasses import dataclass
-from typing import Dict, Any
+from dataclasses import dataclass, replace
+from typing import Dict, Any, Optional
+
+from aux_func.skew import zipf_exponent
+from .memory import parse_size
 
 
 def suggest(base_value, variation_percent=10):
@@ -43,6 +46,74 @@ class BatchSizes:
     huge: int = 50_000      # Para relacionamentos simples
 
 
+# Motores de inserção suportados pelo BatchInserter
+INSERT_ENGINES = ("orm", "copy", "async")
+
+# Agendadores de população: níveis em sequência ou tabelas em DAG de FKs
+SCHEDULERS = ("levels", "dag")
+
+# Formatos de arquivo da exportação do conjunto de dados
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Relacionamentos com popularidade configurável e o lado "popular" de cada um
+SKEWED_RELATIONS = {
+    "comentarios": "vídeos",
+    "inscricoes": "níveis de canal",
+    "patrocinios": "canais",
+    "participacoes": "streamers",
+}
+
+
+@dataclass
+class Skew:
+    """Popularidade dos pais de um relacionamento (Zipf truncada; 0 = uniforme)."""
+    exponent: float = 0.0  # Expoente s: o pai de posição r recebe peso 1 / r^s
+    top_share: Optional[float] = None  # Alternativa ao expoente: fração das linhas no topo
+    top_fraction: float = 0.01  # Fração dos pais considerada "topo" (padrão: 1%)
+    
+    def __post_init__(self):
+        if self.exponent < 0:
+            raise ValueError("O expoente de popularidade não pode ser negativo")
+        if not 0 < self.top_fraction < 1:
+            raise ValueError("A fração do topo deve estar entre 0 e 1")
+        if self.top_share is not None and not self.top_fraction < self.top_share < 1:
+            raise ValueError(f"A fração das linhas no topo deve estar entre {self.top_fraction} e 1")
+    
+    def exponent_for(self, n: int) -> float:
+        """Expoente efetivo para `n` pais (resolve `top_share`, se informado)."""
+        if self.top_share is not None and n > 0:
+            return zipf_exponent(n, self.top_share, self.top_fraction)
+        return self.exponent
+
+
+def parse_skew(spec: str) -> Dict[str, Skew]:
+    """
+    Lê a popularidade por relacionamento da linha de comando.
+    
+    Args:
+        spec: Itens separados por vírgula no formato relacionamento:valor, em
+            que o valor é o expoente (ex: 1.1) ou top=fração (ex: top=0.5,
+            metade das linhas no 1% de pais mais populares); sem relacionamento,
+            o valor vale para todos
+    
+    Returns:
+        Dicionário relacionamento -> Skew
+    """
+    skew: Dict[str, Skew] = {}
+    for item in spec.split(','):
+        relation, _, value = item.strip().rpartition(':')
+        relations = [relation] if relation else list(SKEWED_RELATIONS)
+        if relation and relation not in SKEWED_RELATIONS:
+            available = ", ".join(SKEWED_RELATIONS)
+            raise ValueError(f"Relacionamento '{relation}' inválido. Disponíveis: {available}")
+        if value.startswith('top='):
+            parsed = Skew(top_share=float(value[4:]))
+        else:
+            parsed = Skew(exponent=float(value))
+        skew.update({name: parsed for name in relations})
+    return skew
+
+
 @dataclass
 class DataConfig:
     """Configuração de volume de dados."""
@@ -66,12 +137,45 @@ class DataConfig:
     n_paises: int = 192  # Realista, fixo
     batch_sizes: BatchSizes = None
     preset_name: str = "CUSTOM"
+    insert_engine: str = "orm"  # "orm" (add_all + flush), "copy" (COPY FROM STDIN) ou "async" (asyncpg, vários lotes em voo)
+    workers: int = 1  # Processos de geração paralela (1 = sem paralelismo)
+    seed: Optional[int] = None  # Semente da execução (None = aleatória)
+    scheduler: str = "levels"  # "levels" (níveis em sequência) ou "dag" (tabelas em paralelo)
+    connections: int = 4  # Conexões simultâneas do agendador em DAG e do motor async
+    overlap_writes: bool = False  # Escreve cada lote em uma thread com conexão própria enquanto o próximo é gerado
+    writes_in_flight: int = 2  # Lotes entregues à thread escritora e ainda não escritos (contrapressão)
+    faker_pool_size: int = 0  # Valores distintos por campo de preenchimento do Faker (0 = sem pools)
+    faker_pool_cache: Optional[str] = None  # Arquivo para reusar os pools entre execuções
+    bypass_triggers: bool = False  # Desabilita triggers por linha na carga e reconcilia depois
+    fused_donations: bool = False  # Gera comentários, doações e pagamentos no mesmo lote
+    rebuild_indexes: bool = False  # Remove índices/UNIQUE/FKs dos níveis 6-9 e recria ao final
+    maintenance_work_mem: str = "1GB"  # maintenance_work_mem usado na reconstrução
+    parallel_maintenance_workers: int = 4  # max_parallel_maintenance_workers na reconstrução
+    checkpoint: bool = False  # Registra o progresso por etapa e por lote (permite retomar)
+    resume: bool = False  # Retoma a última execução interrompida em vez de recomeçar
+    checkpoint_every: int = 5  # Lotes entre checkpoints (cada checkpoint faz commit)
+    memory_budget: Optional[str] = None  # Orçamento de memória (ex: "4GB"); reduz lotes que o excederiam
+    trace_memory: bool = False  # Usa tracemalloc: pico Python e maiores alocadores por entidade
+    metrics_file: Optional[str] = None  # Métricas por lote em JSON Lines (ou CSV, se terminar em .csv)
+    quiet: bool = False  # Sem progresso por lote no console
+    export_dir: Optional[str] = None  # Exporta para arquivos neste diretório em vez de popular o banco
+    export_format: str = "csv"  # "csv" (gzip, compatível com COPY) ou "parquet"
+    snapshot_dir: Optional[str] = None  # Cache de snapshots por preset/semente/schema (restaura em vez de gerar)
+    skew: Dict[str, Skew] = None  # Popularidade por relacionamento (ver SKEWED_RELATIONS; padrão uniforme)
     
     def __post_init__(self):
         """Calcula valores derivados após inicialização."""
         if self.batch_sizes is None:
             self.batch_sizes = BatchSizes()
         
+        unknown = set(self.skew or {}) - set(SKEWED_RELATIONS)
+        if unknown:
+            available = ", ".join(SKEWED_RELATIONS)
+            raise ValueError(f"Relacionamentos inválidos em skew: {', '.join(sorted(unknown))}. Disponíveis: {available}")
+        self.skew = {relation: (self.skew or {}).get(relation, Skew()) for relation in SKEWED_RELATIONS}
+        
+        self.validate()
+        
         # Aplica variação aos valores
         self.n_usuarios = suggest(self.n_usuarios)
         self.n_empresas = suggest(self.n_empresas)
@@ -97,6 +201,50 @@ class DataConfig:
         # Estimativa de doações (10% dos comentários)
         self.n_doacoes_estimado = int(self.n_comentarios * 0.10)
     
+    def validate(self) -> None:
+        """
+        Valida as opções da execução.
+
+        Chamado na construção e de novo depois que main aplica as opções da
+        linha de comando, antes da confirmação e da limpeza do banco.
+
+        Raises:
+            ValueError: Se alguma opção for inválida
+        """
+        if self.insert_engine not in INSERT_ENGINES:
+            available = ", ".join(INSERT_ENGINES)
+            raise ValueError(f"Motor de inserção '{self.insert_engine}' inválido. Disponíveis: {available}")
+        
+        if self.workers < 1:
+            raise ValueError("O número de workers deve ser pelo menos 1")
+        
+        if self.scheduler not in SCHEDULERS:
+            available = ", ".join(SCHEDULERS)
+            raise ValueError(f"Agendador '{self.scheduler}' inválido. Disponíveis: {available}")
+        
+        if self.connections < 1:
+            raise ValueError("O número de conexões deve ser pelo menos 1")
+        
+        if self.writes_in_flight < 1:
+            raise ValueError("O número de lotes em voo deve ser pelo menos 1")
+        
+        if self.faker_pool_size < 0:
+            raise ValueError("O tamanho dos pools do Faker não pode ser negativo")
+        
+        if self.checkpoint_every < 1:
+            raise ValueError("O intervalo entre checkpoints deve ser de pelo menos 1 lote")
+        
+        if self.memory_budget is not None:
+            parse_size(self.memory_budget)
+        
+        if self.export_format not in EXPORT_FORMATS:
+            available = ", ".join(EXPORT_FORMATS)
+            raise ValueError(f"Formato de exportação '{self.export_format}' inválido. Disponíveis: {available}")
+    
+    def counts(self) -> Dict[str, Any]:
+        """Contagens sorteadas da execução (atributos n_*), que junto com a semente definem os dados."""
+        return {name: value for name, value in vars(self).items() if name.startswith('n_')}
+    
     def get_total_records(self) -> int:
         """Retorna o total estimado de registros."""
         return (
@@ -127,8 +275,9 @@ class DataConfig:
 # PRESETS DE CONFIGURAÇÃO
 # ========================================
 
-PRESETS: Dict[str, DataConfig] = {
-    "DESENVOLVIMENTO_RAPIDO": DataConfig(
+# Parâmetros de cada preset (as contagens são sorteadas ao construir o DataConfig)
+PRESET_ARGS: Dict[str, Dict[str, Any]] = {
+    "DESENVOLVIMENTO_RAPIDO": dict(
         preset_name="DESENVOLVIMENTO_RAPIDO",
         n_usuarios=10_000,
         n_empresas=1_000,
@@ -144,7 +293,7 @@ PRESETS: Dict[str, DataConfig] = {
         batch_sizes=BatchSizes(tiny=500, small=1000, medium=2000, large=5000, huge=10000)
     ),
     
-    "TESTE_FUNCIONAL": DataConfig(
+    "TESTE_FUNCIONAL": dict(
         preset_name="TESTE_FUNCIONAL",
         n_usuarios=50_000,
         n_empresas=1_000,
@@ -160,7 +309,7 @@ PRESETS: Dict[str, DataConfig] = {
         batch_sizes=BatchSizes(tiny=1000, small=2500, medium=5000, large=10000, huge=20000)
     ),
     
-    "TESTE_PERFORMANCE": DataConfig(
+    "TESTE_PERFORMANCE": dict(
         preset_name="TESTE_PERFORMANCE",
         n_usuarios=500_000,
         n_empresas=5_000,
@@ -173,10 +322,11 @@ PRESETS: Dict[str, DataConfig] = {
         participacoes_por_video=1.8,
         niveis_por_canal=4,
         patrocinios_por_empresa=15,
-        batch_sizes=BatchSizes()  # Usa valores padrão
+        batch_sizes=BatchSizes(),  # Usa valores padrão
+        insert_engine="copy"
     ),
     
-    "TESTE_INDICES": DataConfig(
+    "TESTE_INDICES": dict(
         preset_name="TESTE_INDICES",
         n_usuarios=800_000,
         n_empresas=8_000,
@@ -189,10 +339,11 @@ PRESETS: Dict[str, DataConfig] = {
         participacoes_por_video=2.0,
         niveis_por_canal=5,
         patrocinios_por_empresa=20,
-        batch_sizes=BatchSizes()
+        batch_sizes=BatchSizes(),
+        insert_engine="copy"
     ),
     
-    "STRESS_TEST_EXTREMO": DataConfig(
+    "STRESS_TEST_EXTREMO": dict(
         preset_name="STRESS_TEST_EXTREMO",
         n_usuarios=1_000_000,
         n_empresas=10_000,
@@ -205,17 +356,22 @@ PRESETS: Dict[str, DataConfig] = {
         participacoes_por_video=2.2,
         niveis_por_canal=6,
         patrocinios_por_empresa=25,
-        batch_sizes=BatchSizes()
+        batch_sizes=BatchSizes(),
+        insert_engine="copy"
     )
 }
 
+PRESETS: Dict[str, DataConfig] = {name: DataConfig(**args) for name, args in PRESET_ARGS.items()}
+
 
-def get_preset(name: str = "TESTE_PERFORMANCE") -> DataConfig:
+def get_preset(name: str = "TESTE_PERFORMANCE", seed: Optional[int] = None) -> DataConfig:
     """
     Retorna um preset de configuração.
     
     Args:
         name: Nome do preset (padrão: TESTE_PERFORMANCE)
+        seed: Semente da execução; se informada, as contagens do preset são
+            sorteadas com ela (mesmo preset e semente, mesmas contagens)
     
     Returns:
         DataConfig com as configurações do preset
@@ -227,7 +383,15 @@ def get_preset(name: str = "TESTE_PERFORMANCE") -> DataConfig:
         available = ", ".join(PRESETS.keys())
         raise KeyError(f"Preset '{name}' não encontrado. Disponíveis: {available}")
     
-    return PRESETS[name]
+    if seed is None:
+        return PRESETS[name]
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        args = PRESET_ARGS[name]
+        return DataConfig(**{**args, 'batch_sizes': replace(args['batch_sizes'])})
+    finally:
+        random.setstate(state)
 
 
 def list_presets() -> None:
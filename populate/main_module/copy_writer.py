@@ -0,0 +1,309 @@
+"""
+Motor de inserção via COPY para o BatchInserter.
+
+Este módulo codifica objetos ORM diretamente no formato texto do COPY do
+PostgreSQL e os envia com `cursor.copy_expert`, evitando o unit-of-work do
+SQLAlchemy e o INSERT por linha. Os dados são codificados incrementalmente
+em um buffer em memória, que é descarregado sempre que atinge o limite
+configurado.
+"""
+
+import enum
+import io
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from psycopg2.extensions import encodings as pg_encodings
+from sqlalchemy import inspect
+from sqlalchemy import types as sqltypes
+from sqlalchemy.orm import Session
+
+
+# Caracteres que precisam de escape no formato texto do COPY
+_ESCAPE_TABLE = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+NULL = '\\N'
+
+# Buffer padrão de 8MB antes de enviar ao servidor
+DEFAULT_BUFFER_BYTES = 8 * 1024 * 1024
+
+
+def _encode_text(value: Any) -> str:
+    return NULL if value is None else str(value).translate(_ESCAPE_TABLE)
+
+
+def _encode_plain(value: Any) -> str:
+    return NULL if value is None else str(value)
+
+
+def _encode_bool(value: Any) -> str:
+    if value is None:
+        return NULL
+    return 't' if value else 'f'
+
+
+def _encode_enum(value: Any) -> str:
+    if value is None:
+        return NULL
+    if isinstance(value, enum.Enum):
+        value = value.value
+    return str(value).translate(_ESCAPE_TABLE)
+
+
+def _encode_temporal(value: Any) -> str:
+    if value is None:
+        return NULL
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _encode_interval(value: Any) -> str:
+    if value is None:
+        return NULL
+    if isinstance(value, timedelta):
+        return f"{value.days} days {value.seconds}.{value.microseconds:06d} seconds"
+    return str(value)
+
+
+def encoder_for(column_type: sqltypes.TypeEngine) -> Callable[[Any], str]:
+    """Retorna a função de codificação COPY adequada ao tipo da coluna."""
+    if isinstance(column_type, sqltypes.Boolean):
+        return _encode_bool
+    if isinstance(column_type, sqltypes.Enum):
+        return _encode_enum
+    if isinstance(column_type, sqltypes.Interval):
+        return _encode_interval
+    if isinstance(column_type, (sqltypes.Date, sqltypes.DateTime, sqltypes.Time)):
+        return _encode_temporal
+    if isinstance(column_type, (sqltypes.Integer, sqltypes.Numeric)):
+        return _encode_plain
+    return _encode_text
+
+
+class TableLayout:
+    """
+    Descreve como extrair e codificar as colunas de um modelo ORM.
+
+    Attributes:
+        table: Tabela do SQLAlchemy associada ao modelo
+        attrs: Nomes dos atributos ORM, na ordem das colunas
+        columns: Nomes das colunas no banco
+        encoders: Funções de codificação por coluna
+        defaults: Valores padrão escalares (aplicados quando o atributo é None)
+        identity: Nome do atributo da coluna de identidade (ou None)
+    """
+
+    def __init__(self, model: type):
+        mapper = inspect(model)
+        self.table = mapper.local_table
+        self.attrs: List[str] = []
+        self.columns: List[str] = []
+        self.encoders: List[Callable[[Any], str]] = []
+        self.defaults: List[Any] = []
+        self.identity = None
+
+        for prop in mapper.column_attrs:
+            column = prop.columns[0]
+            self.attrs.append(prop.key)
+            self.columns.append(column.name)
+            self.encoders.append(encoder_for(column.type))
+            default = column.default
+            self.defaults.append(default.arg if default is not None and default.is_scalar else None)
+            if column.primary_key and column.autoincrement is True:
+                self.identity = prop.key
+
+    @property
+    def qualified_name(self) -> str:
+        if self.table.schema:
+            return f"{self.table.schema}.{self.table.name}"
+        return self.table.name
+
+    def copy_sql(self, columns: Sequence[str]) -> str:
+        return f"COPY {self.qualified_name} ({', '.join(columns)}) FROM STDIN"
+
+
+_LAYOUTS: Dict[type, TableLayout] = {}
+
+
+def get_layout(model: type) -> TableLayout:
+    """Retorna (com cache) o TableLayout de um modelo."""
+    layout = _LAYOUTS.get(model)
+    if layout is None:
+        layout = _LAYOUTS[model] = TableLayout(model)
+    return layout
+
+
+def _select_fields(layout: TableLayout, first: Any) -> Tuple[List[str], List[Tuple[str, Callable, Any]]]:
+    """Seleciona as colunas a enviar (omitindo a identidade quando não definida)."""
+    skip = layout.identity if layout.identity is not None and getattr(first, layout.identity) is None else None
+    columns = []
+    fields = []
+    for attr, column, encoder, default in zip(layout.attrs, layout.columns, layout.encoders, layout.defaults):
+        if attr == skip:
+            continue
+        columns.append(column)
+        fields.append((attr, encoder, default))
+    return columns, fields
+
+
+def _encode_row(obj: Any, fields: List[Tuple[str, Callable, Any]]) -> str:
+    values = obj.__dict__
+    row = []
+    for attr, encoder, default in fields:
+        value = values.get(attr)
+        if value is None:
+            value = default
+        row.append(encoder(value))
+    return '\t'.join(row) + '\n'
+
+
+def encode_objects(objs: Sequence[Any]) -> Tuple[TableLayout, List[str], str]:
+    """
+    Codifica uma sequência homogênea de objetos ORM no formato texto do COPY.
+
+    A coluna de identidade só é incluída se o primeiro objeto tiver valor
+    definido; caso contrário o banco gera os IDs.
+
+    Args:
+        objs: Objetos do mesmo modelo
+
+    Returns:
+        Tupla (layout, colunas enviadas, payload codificado)
+    """
+    layout = get_layout(type(objs[0]))
+    columns, fields = _select_fields(layout, objs[0])
+    return layout, columns, ''.join(_encode_row(obj, fields) for obj in objs)
+
+
+def extract_rows(objs: Sequence[Any]) -> Tuple[TableLayout, List[str], List[tuple]]:
+    """
+    Extrai os valores das colunas de uma sequência homogênea de objetos ORM,
+    com as mesmas regras do COPY (identidade omitida se indefinida, padrões
+    escalares aplicados, Enum pelo valor). Usado por motores com parâmetros
+    (ex: executemany) que precisam das linhas como tuplas.
+
+    Returns:
+        Tupla (layout, colunas enviadas, linhas)
+    """
+    layout = get_layout(type(objs[0]))
+    columns, fields = _select_fields(layout, objs[0])
+    rows = []
+    for obj in objs:
+        values = obj.__dict__
+        row = []
+        for attr, _, default in fields:
+            value = values.get(attr)
+            if value is None:
+                value = default
+            row.append(value.value if isinstance(value, enum.Enum) else value)
+        rows.append(tuple(row))
+    return layout, columns, rows
+
+
+class EncodedBatch(NamedTuple):
+    """Trecho já codificado para COPY (ex: produzido por um processo trabalhador)."""
+    sql: str
+    payload: str
+    rows: int
+
+
+def encode_batch(objs: Sequence[Any]) -> List[EncodedBatch]:
+    """
+    Codifica uma lista de objetos (possivelmente de modelos diferentes) em
+    trechos COPY, um por sequência consecutiva do mesmo modelo.
+    """
+    encoded = []
+    for _, group in groupby(objs, key=type):
+        group = list(group)
+        layout, columns, payload = encode_objects(group)
+        encoded.append(EncodedBatch(layout.copy_sql(columns), payload, len(group)))
+    return encoded
+
+
+class CopyWriter:
+    """
+    Escreve objetos ORM no banco usando COPY FROM STDIN.
+
+    Usa a mesma conexão (e transação) da sessão, portanto os commits
+    continuam sendo controlados pelo BatchInserter/levels.
+    """
+
+    def __init__(self, session: Session, buffer_bytes: int = DEFAULT_BUFFER_BYTES):
+        """
+        Inicializa o CopyWriter.
+
+        Args:
+            session: Sessão do SQLAlchemy cuja conexão será usada
+            buffer_bytes: Tamanho máximo do buffer antes de enviar ao servidor
+        """
+        self.session = session
+        self.buffer_bytes = buffer_bytes
+        self.bytes_sent = 0  # Bytes enviados ao servidor (acumulado)
+
+    def write(self, objs: Sequence[Any]) -> int:
+        """
+        Envia os objetos ao banco via COPY.
+
+        Objetos de modelos diferentes são aceitos na mesma lista; cada trecho
+        consecutivo do mesmo modelo vira um COPY separado, preservando a ordem
+        (e portanto as dependências de FK) da lista original. Itens do tipo
+        EncodedBatch são enviados diretamente, sem nova codificação.
+
+        Returns:
+            Número de linhas enviadas
+        """
+        total = 0
+        for model, group in groupby(objs, key=type):
+            if model is EncodedBatch:
+                total += self._write_encoded(list(group))
+            else:
+                total += self._write_homogeneous(list(group))
+        return total
+
+    def _write_encoded(self, batches: List[EncodedBatch]) -> int:
+        cursor = self.session.connection().connection.cursor()
+        try:
+            for batch in batches:
+                self._send(cursor, batch.sql, batch.payload)
+        finally:
+            cursor.close()
+        return sum(batch.rows for batch in batches)
+
+    def _write_homogeneous(self, objs: List[Any]) -> int:
+        if not objs:
+            return 0
+
+        layout = get_layout(type(objs[0]))
+        columns, fields = _select_fields(layout, objs[0])
+        sql = layout.copy_sql(columns)
+
+        cursor = self.session.connection().connection.cursor()
+        try:
+            buffer = io.StringIO()
+            size = 0
+            for obj in objs:
+                line = _encode_row(obj, fields)
+                buffer.write(line)
+                size += len(line)
+                if size >= self.buffer_bytes:
+                    self._send(cursor, sql, buffer.getvalue())
+                    buffer = io.StringIO()
+                    size = 0
+            if size:
+                self._send(cursor, sql, buffer.getvalue())
+        finally:
+            cursor.close()
+        return len(objs)
+
+    def _send(self, cursor: Any, sql: str, payload: str) -> None:
+        # Codificado aqui (em vez de pelo psycopg2) para contar os bytes enviados
+        data = payload.encode(pg_encodings[cursor.connection.encoding])
+        cursor.copy_expert(sql, io.BytesIO(data))
+        self.bytes_sent += len(data)
@@ -5,12 +5,26 @@ Este módulo coordena a execução de todos os níveis de inserção de dados,
 gerenciando a hierarquia de dependências e coletando estatísticas de tempo.
 """
 
+import random
 import time
+from typing import Optional
 from sqlalchemy.orm import Session
 from faker import Faker
 
+from ..async_writer import AsyncWriter
+from ..background_writer import BackgroundWriter
 from ..config import DataConfig
 from ..batch_inserter import BatchInserter
+from ..checkpoint import Checkpoint
+from ..dataset import DatasetWriter
+from ..id_allocator import IdAllocator
+from ..value_pools import PooledFaker
+from ..trigger_bypass import disable_triggers, enable_triggers, reconcile_pagamentos
+from ..index_rebuild import IndexRebuilder
+from ..memory import MemoryMonitor, fit_batch_sizes, parse_size
+from ..metrics import MetricsRecorder
+from ..snapshot import open_cache
+from models import Usuario, Canal, Video, NivelCanal
 
 from .levels import (
     populate_level_1,
@@ -23,6 +37,81 @@ from .levels import (
     populate_level_8,
     populate_level_9
 )
+from .scheduler import populate_dag
+
+
+def reserve_ids(ids: IdAllocator, config: DataConfig) -> None:
+    """
+    Reserva antecipadamente as faixas de IDs das entidades referenciadas
+    pelos níveis seguintes, para que nenhum nível precise reler chaves do banco.
+    
+    Args:
+        ids: Alocador de IDs
+        config: Configuração de volume de dados
+    """
+    print("🔢 Reservando faixas de IDs...")
+    ids.reserve(Usuario, config.n_usuarios)
+    ids.reserve(Canal, config.n_canais)
+    ids.reserve(Video, config.n_videos)
+    ids.reserve(NivelCanal, config.n_canais * config.niveis_por_canal)
+    # Streamers são sorteados uma única vez e reusados por vários níveis
+    ids.select('streamers', ids.get(Usuario), config.n_streamers)
+    for model, reserved in ids.ranges.items():
+        if reserved:
+            print(f"    {model.__name__}: {reserved.start:,} a {reserved.stop - 1:,}")
+    print()
+
+
+def check_export(config: DataConfig) -> None:
+    """Recusa as opções que dependem do banco quando a saída é para arquivos."""
+    conflicts = [option for option, enabled in (
+        ('--scheduler=dag', config.scheduler == "dag"),
+        ('--bypass-triggers', config.bypass_triggers),
+        ('--rebuild-indexes', config.rebuild_indexes),
+        ('--overlap', config.overlap_writes),
+        ('--checkpoint', config.checkpoint),
+        ('--resume', config.resume),
+    ) if enabled]
+    if conflicts:
+        raise ValueError(f"Opções incompatíveis com a exportação para arquivos: {', '.join(conflicts)}")
+
+
+def check_background_writes(config: DataConfig) -> None:
+    """
+    Recusa as opções que dependem de uma única transação por sessão quando
+    os lotes são escritos em outras conexões (motor async ou --overlap).
+    """
+    mode = "o motor de inserção async" if config.insert_engine == "async" else "--overlap"
+    conflicts = [option for option, enabled in (
+        ('--overlap', config.overlap_writes and config.insert_engine == "async"),
+        ('--scheduler=dag', config.scheduler == "dag"),
+        ('--checkpoint', config.checkpoint),
+        ('--resume', config.resume),
+    ) if enabled]
+    if conflicts:
+        raise ValueError(f"Opções incompatíveis com {mode}: {', '.join(conflicts)}")
+
+
+def prepare_ids(session: Session, config: DataConfig, inserter: BatchInserter) -> None:
+    """
+    Reserva as faixas de IDs (ou restaura as da execução interrompida) e
+    confirma o estado da execução no checkpoint, se houver.
+    
+    Args:
+        session: Sessão do SQLAlchemy
+        config: Configuração de volume de dados
+        inserter: BatchInserter com o alocador de IDs e o checkpoint
+    """
+    checkpoint = inserter.checkpoint
+    if checkpoint is not None and checkpoint.resuming:
+        checkpoint.restore_ids(inserter.ids)
+        print("🔢 Faixas de IDs restauradas do checkpoint\n")
+        return
+    
+    reserve_ids(inserter.ids, config)
+    if checkpoint is not None:
+        checkpoint.begin(session, config, inserter.seed, inserter.ids)
+    session.commit()
 
 
 def populate_all_data(session: Session, fake: Faker, config: DataConfig) -> dict:
@@ -37,65 +126,214 @@ def populate_all_data(session: Session, fake: Faker, config: DataConfig) -> dict
     Returns:
         Dicionário com estatísticas de tempo por nível
     """
-    inserter = BatchInserter(session, fake)
+    dataset = None
+    if config.export_dir:
+        # Sem conexões: IDs a partir de 1 e releituras a partir dos arquivos
+        check_export(config)
+        dataset = DatasetWriter(config.export_dir, config.export_format)
+    elif config.insert_engine == "async" or config.overlap_writes:
+        check_background_writes(config)
+    
+    checkpoint = None
+    seed = config.seed
+    if config.checkpoint or config.resume:
+        checkpoint = Checkpoint(session.get_bind(), config.checkpoint_every)
+        if config.resume:
+            # Contagens e semente voltam a ser as da execução interrompida
+            checkpoint.load()
+            seed = checkpoint.apply(config)
+            concluidas = sum(1 for step in checkpoint.steps if checkpoint.is_done(step))
+            print(f"♻️  Retomando execução interrompida (semente {seed}, {concluidas} etapas concluídas)\n")
+        else:
+            checkpoint.reset()
+    if seed is None:
+        seed = random.getrandbits(32)
+    
+    # Pools, calibração e etapas fora de `iter_batches` também seguem a semente
+    random.seed(seed)
+    fake.seed_instance(seed)
+    if config.faker_pool_size:
+        # Campos de preenchimento sorteados de pools pré-computados
+        fake = PooledFaker(fake, config.faker_pool_size, config.faker_pool_cache).seed_instance(seed)
+    
+    if config.memory_budget and not config.resume:
+        # Na retomada os tamanhos de lote ajustados vêm do checkpoint
+        fit_batch_sizes(config, fake, parse_size(config.memory_budget))
+    
+    # Sem --seed a semente é sorteada: não há dados reproduzíveis para guardar
+    cache = open_cache(config, session.get_bind(), config.seed)
+    if cache is not None:
+        key = cache.key(config, seed)
+        if cache.exists(key):
+            # Mesmos dados já gerados: restaura em vez de gerar
+            return cache.restore(key)
+        print(f"📸 Snapshot {key} ainda não existe: os dados serão gerados e gravados no cache\n")
+    
+    memory = MemoryMonitor(trace=config.trace_memory)
+    memory.start()
+    metrics = MetricsRecorder(config.metrics_file) if config.metrics_file else None
+    ids = IdAllocator(session if dataset is None else None)
+    writer = None
+    if config.insert_engine == "async" and dataset is None:
+        # Com o trigger de num_seq ativo, os lotes de comentários seguem um a um
+        writer = AsyncWriter(
+            session.get_bind().url, config.connections,
+            serial_tables=() if config.bypass_triggers else ('comentario',)
+        )
+    elif config.overlap_writes and dataset is None:
+        # Lote N escrito em outra conexão enquanto o N+1 é gerado
+        writer = BackgroundWriter(session.get_bind(), config.insert_engine, config.writes_in_flight)
+    inserter = BatchInserter(
+        session, fake, config.insert_engine, ids, config.workers, seed, checkpoint,
+        memory, metrics, config.quiet, dataset, writer
+    )
     timings = {}
     inicio_total = time.time()
     
-    # Executa cada nível sequencialmente
-    print("🚀 Iniciando população do banco de dados...\n")
+    if dataset is not None:
+        print(f"📁 Exportando para {config.export_dir} ({config.export_format}), sem acesso ao banco...\n")
+    else:
+        print("🚀 Iniciando população do banco de dados...\n")
+    
+    if config.bypass_triggers:
+        disable_triggers(session.get_bind())
+    
+    rebuilder = None
+    if config.rebuild_indexes:
+        rebuilder = IndexRebuilder(
+            session.get_bind(),
+            connections=config.connections,
+            maintenance_work_mem=config.maintenance_work_mem,
+            parallel_workers=config.parallel_maintenance_workers
+        )
+    
+    try:
+        if config.scheduler == "dag":
+            # Tabelas independentes em paralelo, cada uma em sua conexão
+            prepare_ids(session, config, inserter)
+            if rebuilder is not None:
+                rebuilder.drop()
+            populate_dag(session, fake, config, inserter, timings)
+        else:
+            # Executa cada nível sequencialmente
+            _populate_levels(session, fake, config, inserter, timings, rebuilder)
+        
+        if rebuilder is not None:
+            rebuilder.rebuild(timings)
+            rebuilder = None
+        
+        if config.bypass_triggers:
+            # Exclusividade do método de pagamento verificada em conjunto
+            reconcile_pagamentos(session, timings)
+        
+        if dataset is not None:
+            # O manifesto só é gravado quando todas as tabelas foram escritas
+            dataset.close({'preset': config.preset_name, 'semente': inserter.seed, 'contagens': config.counts()})
+    finally:
+        inserter.close()
+        if writer is not None:
+            writer.close()
+        if dataset is not None:
+            dataset.close()
+        ids.close()
+        memory.stop()
+        if metrics is not None:
+            metrics.close()
+        if config.bypass_triggers or rebuilder is not None:
+            # Libera as travas da sessão antes do DDL
+            session.rollback()
+        if rebuilder is not None:
+            # A carga falhou depois da remoção: recria o que foi removido
+            rebuilder.rebuild(timings)
+        if config.bypass_triggers:
+            enable_triggers(session.get_bind())
+    
+    timings['total'] = time.time() - inicio_total
+    timings['memoria'] = memory.report()
+    
+    if cache is not None:
+        timings['gravacao_snapshot'] = cache.save(key, timings['total'])
+    
+    if dataset is not None:
+        print(f"\n✅ Exportação concluída em {config.export_dir}")
+    else:
+        print("\n✅ População concluída com sucesso!")
+    return timings
+
+
+def _populate_levels(
+    session: Session,
+    fake: Faker,
+    config: DataConfig,
+    inserter: BatchInserter,
+    timings: dict,
+    rebuilder: Optional[IndexRebuilder] = None
+) -> None:
+    """Executa os nove níveis em sequência, com os commits intermediários."""
+    # IDs das entidades mais referenciadas são conhecidos antes da geração
+    prepare_ids(session, config, inserter)
     
     # Nível 1: Entidades sem dependências
-    tempo_nivel1 = populate_level_1(session, fake, config, inserter)
+    with inserter.track_memory('nivel_1'):
+        tempo_nivel1 = populate_level_1(session, fake, config, inserter)
     timings['nivel_1'] = tempo_nivel1
     
     # Nível 2: Dependem de empresas e conversões
-    tempo_nivel2 = populate_level_2(session, fake, config, inserter)
+    with inserter.track_memory('nivel_2'):
+        tempo_nivel2 = populate_level_2(session, fake, config, inserter)
     timings['nivel_2'] = tempo_nivel2
     
     # Nível 3: Usuários (CRÍTICO - MAIOR VOLUME)
-    tempo_nivel3 = populate_level_3(session, fake, config, inserter)
+    with inserter.track_memory('nivel_3'):
+        tempo_nivel3 = populate_level_3(session, fake, config, inserter)
     timings['nivel_3'] = tempo_nivel3
     
     # Commit intermediário
     inserter.commit_with_timing("commit intermediário (após usuários)")
     
     # Nível 4: Relacionamentos de usuários e canais
-    tempo_nivel4 = populate_level_4(session, fake, config, inserter)
+    with inserter.track_memory('nivel_4'):
+        tempo_nivel4 = populate_level_4(session, fake, config, inserter)
     timings['nivel_4'] = tempo_nivel4
     
     # Commit intermediário
     inserter.commit_with_timing("commit intermediário (após canais)")
     
     # Nível 5: Patrocínios e níveis de canal
-    tempo_nivel5 = populate_level_5(session, fake, config, inserter)
+    with inserter.track_memory('nivel_5'):
+        tempo_nivel5 = populate_level_5(session, fake, config, inserter)
     timings['nivel_5'] = tempo_nivel5
     
+    if rebuilder is not None:
+        # Índices e restrições dos níveis 6-9 saem antes das cargas grandes
+        inserter.commit_with_timing("commit intermediário (após níveis de canal)")
+        rebuilder.drop()
+    
     # Nível 6: Inscrições e vídeos (CRÍTICO)
-    tempo_nivel6 = populate_level_6(session, fake, config, inserter)
+    with inserter.track_memory('nivel_6'):
+        tempo_nivel6 = populate_level_6(session, fake, config, inserter)
     timings['nivel_6'] = tempo_nivel6
     
     # Commit intermediário
     inserter.commit_with_timing("commit intermediário (após vídeos)")
     
     # Nível 7: Participações e comentários (MAIS CRÍTICO)
-    tempo_nivel7 = populate_level_7(session, fake, config, inserter)
+    with inserter.track_memory('nivel_7'):
+        tempo_nivel7 = populate_level_7(session, fake, config, inserter)
     timings['nivel_7'] = tempo_nivel7
     
     # Commit intermediário
     inserter.commit_with_timing("commit intermediário (após comentários)")
     
     # Nível 8: Doações
-    tempo_nivel8 = populate_level_8(session, fake, config, inserter)
+    with inserter.track_memory('nivel_8'):
+        tempo_nivel8 = populate_level_8(session, fake, config, inserter)
     timings['nivel_8'] = tempo_nivel8
     
     # Nível 9: Detalhes de pagamento
-    tempo_nivel9 = populate_level_9(session, fake, config, inserter)
+    with inserter.track_memory('nivel_9'):
+        tempo_nivel9 = populate_level_9(session, fake, config, inserter)
     timings['nivel_9'] = tempo_nivel9
     
     # Commit final
     inserter.commit_with_timing("commit final")
-    
-    timings['total'] = time.time() - inicio_total
-    
-    print("\n✅ População concluída com sucesso!")
-    return timings
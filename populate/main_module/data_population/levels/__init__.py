@@ -1,16 +1,54 @@
 """
 Módulos de população de dados organizados por níveis de dependência.
+
+Cada nível expõe `populate_level_N` e as funções por tabela que ele chama
+(usadas pelo agendador em DAG).
 """
 
-from .level_1 import populate_level_1
-from .level_2 import populate_level_2
-from .level_3 import populate_level_3
-from .level_4 import populate_level_4
-from .level_5 import populate_level_5
-from .level_6 import populate_level_6
-from .level_7 import populate_level_7
-from .level_8 import populate_level_8
-from .level_9 import populate_level_9
+from .level_1 import (
+    populate_level_1,
+    populate_empresas,
+    populate_conversoes,
+)
+from .level_2 import (
+    populate_level_2,
+    populate_paises,
+    populate_plataformas,
+)
+from .level_3 import (
+    populate_level_3,
+    populate_usuarios,
+)
+from .level_4 import (
+    populate_level_4,
+    populate_plataforma_usuarios,
+    populate_streamer_paises,
+    populate_empresa_paises,
+    populate_canais,
+)
+from .level_5 import (
+    populate_level_5,
+    populate_patrocinios,
+    populate_nivel_canais,
+)
+from .level_6 import (
+    populate_level_6,
+    populate_inscricoes,
+    populate_videos,
+)
+from .level_7 import (
+    populate_level_7,
+    populate_participacoes,
+    populate_comentarios,
+)
+from .level_8 import (
+    populate_level_8,
+    populate_doacoes,
+)
+from .level_9 import (
+    populate_level_9,
+    populate_pagamentos,
+)
 
 __all__ = [
     'populate_level_1',
@@ -22,4 +60,21 @@ __all__ = [
     'populate_level_7',
     'populate_level_8',
     'populate_level_9',
+    'populate_empresas',
+    'populate_conversoes',
+    'populate_paises',
+    'populate_plataformas',
+    'populate_usuarios',
+    'populate_plataforma_usuarios',
+    'populate_streamer_paises',
+    'populate_empresa_paises',
+    'populate_canais',
+    'populate_patrocinios',
+    'populate_nivel_canais',
+    'populate_inscricoes',
+    'populate_videos',
+    'populate_participacoes',
+    'populate_comentarios',
+    'populate_doacoes',
+    'populate_pagamentos',
 ]
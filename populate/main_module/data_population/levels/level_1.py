@@ -10,9 +10,28 @@ from faker import Faker
 
 from ...config import DataConfig
 from ...batch_inserter import BatchInserter
+from ...checkpoint import checkpointed
 from aux_func import generate_empresas, generate_conversoes
 
 
+@checkpointed
+def populate_empresas(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Empresa."""
+    inserter.insert_simple(
+        generate_empresas, config.n_empresas, config.batch_sizes.small,
+        "Empresas"
+    )
+
+
+@checkpointed
+def populate_conversoes(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Conversao."""
+    inserter.insert_simple(
+        generate_conversoes, config.n_conversoes, config.batch_sizes.tiny,
+        "Conversões"
+    )
+
+
 def populate_level_1(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> float:
     """
     Popula entidades do nível 1: Empresas e Conversões.
@@ -30,16 +49,10 @@ def populate_level_1(session: Session, fake: Faker, config: DataConfig, inserter
     inicio = time.time()
     
     # Empresas
-    inserter.insert_simple(
-        generate_empresas, config.n_empresas, config.batch_sizes.small,
-        "Empresas"
-    )
+    populate_empresas(session, fake, config, inserter)
     
     # Conversões
-    inserter.insert_simple(
-        generate_conversoes, config.n_conversoes, config.batch_sizes.tiny,
-        "Conversões"
-    )
+    populate_conversoes(session, fake, config, inserter)
     
     tempo_nivel = time.time() - inicio
     print(f"    ✓ Nível 1 concluído em {tempo_nivel:.2f}s\n")
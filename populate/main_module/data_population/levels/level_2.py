@@ -10,10 +10,31 @@ from faker import Faker
 
 from ...config import DataConfig
 from ...batch_inserter import BatchInserter
+from ...checkpoint import checkpointed
 from models import Empresa, Conversao
 from aux_func import generate_paises, generate_plataformas
 
 
+@checkpointed
+def populate_paises(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Pais (depende de Conversao)."""
+    moedas = inserter.fetch_keys(Conversao.id)
+    inserter.insert_simple(
+        generate_paises, config.n_paises, config.batch_sizes.tiny,
+        "Países", moedas
+    )
+
+
+@checkpointed
+def populate_plataformas(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Plataforma (depende de Empresa)."""
+    empresas = inserter.fetch_keys(Empresa.nro)
+    inserter.insert_simple(
+        generate_plataformas, config.n_plataformas, config.batch_sizes.tiny,
+        "Plataformas", empresas
+    )
+
+
 def populate_level_2(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> float:
     """
     Popula entidades do nível 2: Países e Plataformas.
@@ -31,18 +52,10 @@ def populate_level_2(session: Session, fake: Faker, config: DataConfig, inserter
     inicio = time.time()
     
     # Busca conversões para gerar países
-    conversoes = session.query(Conversao).all()
-    inserter.insert_simple(
-        generate_paises, config.n_paises, config.batch_sizes.tiny,
-        "Países", conversoes
-    )
+    populate_paises(session, fake, config, inserter)
     
     # Busca empresas para gerar plataformas
-    empresas = session.query(Empresa).all()
-    inserter.insert_simple(
-        generate_plataformas, config.n_plataformas, config.batch_sizes.tiny,
-        "Plataformas", empresas
-    )
+    populate_plataformas(session, fake, config, inserter)
     
     tempo_nivel = time.time() - inicio
     print(f"    ✓ Nível 2 concluído em {tempo_nivel:.2f}s\n")
@@ -10,10 +10,22 @@ from faker import Faker
 
 from ...config import DataConfig
 from ...batch_inserter import BatchInserter
-from models import Pais
+from ...checkpoint import checkpointed
+from models import Pais, Usuario
 from aux_func import generate_usuarios
 
 
+@checkpointed
+def populate_usuarios(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Usuario (depende de Pais)."""
+    ddis = inserter.fetch_keys(Pais.ddi)
+    usuario_ids = inserter.ids.get(Usuario)
+    inserter.insert_with_offset(
+        generate_usuarios, config.n_usuarios, config.batch_sizes.medium,
+        "Usuários", ddis, id_start=usuario_ids.start
+    )
+
+
 def populate_level_3(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> float:
     """
     Popula entidades do nível 3: Usuários.
@@ -30,11 +42,7 @@ def populate_level_3(session: Session, fake: Faker, config: DataConfig, inserter
     print(f"📦 [3/9] Gerando {config.n_usuarios:,} usuários em lotes...")
     inicio = time.time()
     
-    paises = session.query(Pais).all()
-    inserter.insert_with_offset(
-        generate_usuarios, config.n_usuarios, config.batch_sizes.medium,
-        "Usuários", paises
-    )
+    populate_usuarios(session, fake, config, inserter)
     
     tempo_nivel = time.time() - inicio
     print(f"    ✓ Nível 3 concluído em {tempo_nivel:.2f}s\n")
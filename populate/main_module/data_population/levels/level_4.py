@@ -5,21 +5,99 @@ Popula PlataformaUsuario, StreamerPais, EmpresaPais e Canais.
 """
 
 import time
-import random
 from sqlalchemy.orm import Session
 from faker import Faker
 
 from ...config import DataConfig
 from ...batch_inserter import BatchInserter
-from models import Usuario, Plataforma
+from ...checkpoint import checkpointed
+from ...parallel_generation import batch_seed
+from models import Usuario, Plataforma, Canal, Pais, Empresa
 from aux_func import (
     generate_plataforma_usuarios,
     generate_streamer_paises,
     generate_empresa_paises,
-    generate_canais
+    iter_canais
 )
 
 
+@checkpointed
+def populate_plataforma_usuarios(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela PlataformaUsuario (depende de Plataforma e Usuario)."""
+    print("    Gerando PlataformaUsuario...")
+    usuario_ids = inserter.ids.get(Usuario)
+    plataforma_nros = inserter.fetch_keys(Plataforma.nro)
+    
+    # Pares sorteados por uma permutação com chave derivada da semente da execução:
+    # os lotes (inclusive os de uma retomada) só compartilham a chave
+    total = min(config.n_plataforma_usuarios, len(plataforma_nros) * len(usuario_ids))
+    inserter.insert_with_offset(
+        generate_plataforma_usuarios, total, config.batch_sizes.huge,
+        "PlataformaUsuario", plataforma_nros, usuario_ids, key=batch_seed(inserter.seed, "PlataformaUsuario", 0)
+    )
+
+
+@checkpointed
+def populate_streamer_paises(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela StreamerPais (depende de Usuario e Pais)."""
+    print("    Gerando StreamerPais...")
+    streamer_ids = inserter.ids.selection('streamers')
+    ddis = inserter.fetch_keys(Pais.ddi)
+    
+    # Só IDs e DDIs: os lotes podem ser gerados em paralelo; pares e
+    # passaportes vêm de permutações com a chave da execução
+    total = min(config.n_streamer_paises, len(streamer_ids) * len(ddis))
+    inserter.insert_with_offset(
+        generate_streamer_paises, total, config.batch_sizes.medium,
+        "StreamerPais", streamer_ids, ddis, key=batch_seed(inserter.seed, "StreamerPais", 0)
+    )
+
+
+@checkpointed
+def populate_empresa_paises(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela EmpresaPais (depende de Empresa e Pais)."""
+    print("    Gerando EmpresaPais...")
+    ddis = inserter.fetch_keys(Pais.ddi)
+    empresa_nros = inserter.fetch_keys(Empresa.nro)
+    
+    # Só nros e DDIs: os lotes podem ser gerados em paralelo; pares e IDs
+    # nacionais vêm de permutações com a chave da execução
+    total = min(config.n_empresa_paises, len(empresa_nros) * len(ddis))
+    inserter.insert_with_offset(
+        generate_empresa_paises, total, config.batch_sizes.medium,
+        "EmpresaPais", empresa_nros, ddis, key=batch_seed(inserter.seed, "EmpresaPais", 0)
+    )
+
+
+# Streamers lidos por consulta ao montar os canais
+FETCH_BATCH = 10_000
+
+
+def _iter_streamer_nicks(session: Session, inserter: BatchInserter, streamer_ids: list[int], fetch_batch: int):
+    """Lê apenas (id, nick) dos streamers, em lotes - o nick compõe o nome do canal."""
+    if inserter.dataset is not None:
+        # Exportação: uma passada pelos usuários já escritos
+        wanted = set(streamer_ids)
+        yield from (row for row in inserter.fetch_columns(Usuario.id, Usuario.nick) if row.id in wanted)
+        return
+    for i in range(0, len(streamer_ids), fetch_batch):
+        batch_ids = streamer_ids[i:i+fetch_batch]
+        yield from session.query(Usuario.id, Usuario.nick).filter(Usuario.id.in_(batch_ids)).all()
+
+
+@checkpointed
+def populate_canais(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Canal (depende de Plataforma e Usuario)."""
+    print("    Gerando Canais...")
+    streamer_ids = inserter.ids.selection('streamers')
+    plataforma_nros = inserter.fetch_keys(Plataforma.nro)
+    
+    # Canais (gerador sem count - gera 1 por streamer), lendo os nicks sob demanda
+    streamers = _iter_streamer_nicks(session, inserter, streamer_ids, FETCH_BATCH)
+    rows = iter_canais(fake, plataforma_nros, streamers, inserter.ids.get(Canal).start, FETCH_BATCH)
+    inserter.insert_stream(rows, config.batch_sizes.medium, "Canais", len(streamer_ids))
+
+
 def populate_level_4(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> float:
     """
     Popula entidades do nível 4: Relacionamentos de usuários e canais.
@@ -36,65 +114,16 @@ def populate_level_4(session: Session, fake: Faker, config: DataConfig, inserter
     print(f"📦 [4/9] Gerando relações de usuários e {config.n_canais:,} canais...")
     inicio = time.time()
     
-    # Busca IDs de usuários e seleciona streamers
-    print("    Carregando usuários...")
-    usuario_ids = [row[0] for row in session.query(Usuario.id).all()]
-    print(f"    {len(usuario_ids):,} usuários carregados")
-    
-    streamer_ids = random.sample(usuario_ids, config.n_streamers)
-    print(f"    {len(streamer_ids):,} streamers selecionados")
-    
-    # Carrega objetos streamer em lotes
-    streamers = []
-    FETCH_BATCH = 10_000
-    for i in range(0, len(streamer_ids), FETCH_BATCH):
-        batch_ids = streamer_ids[i:i+FETCH_BATCH]
-        streamers.extend(session.query(Usuario).filter(Usuario.id.in_(batch_ids)).all())
-    
-    print("    Gerando PlataformaUsuario...")
-    plataformas_list = session.query(Plataforma).all()
+    # Streamers foram selecionados na reserva de IDs
+    print(f"    {len(inserter.ids.selection('streamers')):,} streamers selecionados")
     
-    # PlataformaUsuario com estado compartilhado
-    pk_pairs_state = set()
-    uk_state = {p.nro: set() for p in plataformas_list}
+    populate_plataforma_usuarios(session, fake, config, inserter)
     
-    def generate_pu_wrapper(sample_usuarios, count, state):
-        """Wrapper para adaptar generate_plataforma_usuarios ao formato do BatchInserter."""
-        return generate_plataforma_usuarios(
-            plataformas_list, sample_usuarios, count,
-            state['pk_pairs'], state['uk']
-        )
+    # StreamerPais e EmpresaPais (pares de chaves, como PlataformaUsuario)
+    populate_streamer_paises(session, fake, config, inserter)
+    populate_empresa_paises(session, fake, config, inserter)
     
-    state_pu = {'pk_pairs': pk_pairs_state, 'uk': uk_state}
-    inserter.insert_with_state(
-        generate_pu_wrapper, config.n_plataforma_usuarios, config.batch_sizes.huge,
-        "PlataformaUsuario", state_pu, usuario_ids, sample_size_multiplier=2,
-        fetch_model=Usuario
-    )
-    
-    # StreamerPais e EmpresaPais (geradores com assinatura diferente)
-    print("    Gerando StreamerPais...")
-    from models import Pais, Empresa
-    paises = session.query(Pais).all()
-    empresas = session.query(Empresa).all()
-    
-    streamer_paises_list = generate_streamer_paises(fake, streamers, paises, config.n_streamer_paises)
-    session.add_all(streamer_paises_list)
-    session.flush()
-    del streamer_paises_list
-    
-    print("    Gerando EmpresaPais...")
-    empresa_paises_list = generate_empresa_paises(fake, empresas, paises, config.n_empresa_paises)
-    session.add_all(empresa_paises_list)
-    session.flush()
-    del empresa_paises_list
-    
-    # Canais (gerador sem count - gera 1 por streamer)
-    print("    Gerando Canais...")
-    canais_list = generate_canais(fake, plataformas_list, streamers)
-    session.add_all(canais_list)
-    session.flush()
-    del canais_list
+    populate_canais(session, fake, config, inserter)
     
     tempo_nivel = time.time() - inicio
     print(f"    ✓ Nível 4 concluído em {tempo_nivel:.2f}s\n")
@@ -10,8 +10,40 @@ from faker import Faker
 
 from ...config import DataConfig
 from ...batch_inserter import BatchInserter
-from models import Canal, Empresa
-from aux_func import generate_patrocinios, generate_nivel_canais
+from ...checkpoint import checkpointed
+from models import Canal, Empresa, NivelCanal
+from ...parallel_generation import batch_seed
+from aux_func import generate_patrocinios, iter_nivel_canais
+
+
+@checkpointed
+def populate_patrocinios(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Patrocinio (depende de Empresa e Canal)."""
+    # IDs dos canais vêm da faixa reservada
+    canais = inserter.ids.get(Canal)
+    empresas = inserter.fetch_keys(Empresa.nro)
+    
+    # Patrocínios em lotes com offset (pares de uma permutação com chave da execução)
+    total = min(config.n_patrocinios, len(empresas) * len(canais))
+    inserter.insert_with_offset(
+        generate_patrocinios, total, config.batch_sizes.large,
+        "Patrocínios", empresas, canais, key=batch_seed(inserter.seed, "Patrocínios", 0),
+        skew=config.skew['patrocinios'].exponent_for(len(canais)), total_pairs=total
+    )
+
+
+@checkpointed
+def populate_nivel_canais(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela NivelCanal (depende de Canal)."""
+    canais = inserter.ids.get(Canal)
+    
+    # Níveis de Canal em fluxo (assinatura: fake, canais, niveis_por_canal)
+    rows = iter_nivel_canais(
+        fake, canais, config.niveis_por_canal, inserter.ids.get(NivelCanal).start, config.batch_sizes.medium
+    )
+    inserter.insert_stream(
+        rows, config.batch_sizes.large, "Níveis de Canal", len(canais) * config.niveis_por_canal
+    )
 
 
 def populate_level_5(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> float:
@@ -30,21 +62,8 @@ def populate_level_5(session: Session, fake: Faker, config: DataConfig, inserter
     print(f"📦 [5/9] Gerando {config.n_patrocinios:,} patrocínios e níveis de canal...")
     inicio = time.time()
     
-    # Busca os canais criados
-    canais = session.query(Canal).all()
-    empresas = session.query(Empresa).all()
-    
-    # Patrocínios (assinatura: fake, empresas, canais, count)
-    patrocinios_list = generate_patrocinios(fake, empresas, canais, config.n_patrocinios)
-    session.add_all(patrocinios_list)
-    session.flush()
-    del patrocinios_list
-    
-    # Níveis de Canal (assinatura: fake, canais, niveis_por_canal)
-    nivel_canais_list = generate_nivel_canais(fake, canais, config.niveis_por_canal)
-    session.add_all(nivel_canais_list)
-    session.flush()
-    del nivel_canais_list
+    populate_patrocinios(session, fake, config, inserter)
+    populate_nivel_canais(session, fake, config, inserter)
     
     tempo_nivel = time.time() - inicio
     print(f"    ✓ Nível 5 concluído em {tempo_nivel:.2f}s\n")
@@ -5,16 +5,47 @@ Popula Inscricoes (que dependem de NivelCanal e Usuario) e Videos (que dependem
 """
 
 import time
-import random
 from sqlalchemy.orm import Session
 from faker import Faker
 
 from ...config import DataConfig
 from ...batch_inserter import BatchInserter
-from models import Usuario, NivelCanal, Canal
+from ...checkpoint import checkpointed
+from ...parallel_generation import batch_seed
+from models import Usuario, NivelCanal, Canal, Video
 from aux_func import generate_inscricoes, generate_videos
 
 
+@checkpointed
+def populate_inscricoes(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Inscricao (depende de NivelCanal e Usuario)."""
+    # IDs de níveis de canal e usuários vêm das faixas reservadas
+    nivel_canais = inserter.ids.get(NivelCanal)
+    usuario_ids = inserter.ids.get(Usuario)
+    
+    # Pares sorteados por uma permutação com chave derivada da semente da execução:
+    # os lotes (inclusive os de uma retomada) só compartilham a chave
+    print("    Gerando Inscrições...")
+    total = min(config.n_inscricoes, len(nivel_canais) * len(usuario_ids))
+    inserter.insert_with_offset(
+        generate_inscricoes, total, config.batch_sizes.huge,
+        "Inscrições", nivel_canais, usuario_ids, key=batch_seed(inserter.seed, "Inscrições", 0),
+        skew=config.skew['inscricoes'].exponent_for(len(nivel_canais)), total_pairs=total
+    )
+
+
+@checkpointed
+def populate_videos(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Video (depende de Canal)."""
+    # Vídeos com offset
+    print("    Gerando Vídeos...")
+    canais = inserter.ids.get(Canal)
+    inserter.insert_with_offset(
+        generate_videos, config.n_videos, config.batch_sizes.large,
+        "Vídeos", canais, id_start=inserter.ids.get(Video).start
+    )
+
+
 def populate_level_6(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> float:
     """
     Popula entidades do nível 6: Inscrições e Vídeos.
@@ -31,32 +62,8 @@ def populate_level_6(session: Session, fake: Faker, config: DataConfig, inserter
     print(f"📦 [6/9] Gerando {config.n_inscricoes:,} inscrições e {config.n_videos:,} vídeos...")
     inicio = time.time()
     
-    # Busca níveis de canal
-    nivel_canais = session.query(NivelCanal).all()
-    
-    # Inscrições com estado
-    print("    Gerando Inscrições...")
-    inscricoes_pairs_state = set()
-    usuario_ids = [row[0] for row in session.query(Usuario.id).all()]
-    
-    def generate_insc_wrapper(sample_usuarios, count, state):
-        """Wrapper para adaptar generate_inscricoes."""
-        return generate_inscricoes(nivel_canais, sample_usuarios, count, state['pairs'])
-    
-    state_insc = {'pairs': inscricoes_pairs_state}
-    inserter.insert_with_state(
-        generate_insc_wrapper, config.n_inscricoes, config.batch_sizes.huge,
-        "Inscrições", state_insc, usuario_ids, sample_size_multiplier=2,
-        fetch_model=Usuario
-    )
-    
-    # Vídeos com offset
-    print("    Gerando Vídeos...")
-    canais = session.query(Canal).all()
-    inserter.insert_with_offset(
-        generate_videos, config.n_videos, config.batch_sizes.large,
-        "Vídeos", canais
-    )
+    populate_inscricoes(session, fake, config, inserter)
+    populate_videos(session, fake, config, inserter)
     
     tempo_nivel = time.time() - inicio
     print(f"    ✓ Nível 6 concluído em {tempo_nivel:.2f}s\n")
@@ -5,14 +5,97 @@ Popula Participacoes e Comentarios - maior volume de dados.
 """
 
 import time
-import random
 from sqlalchemy.orm import Session
 from faker import Faker
 
 from ...config import DataConfig
 from ...batch_inserter import BatchInserter
+from ...checkpoint import checkpointed
+from ...parallel_generation import batch_seed
+from ...trigger_bypass import reconcile_comentarios
 from models import Usuario, Video
-from aux_func import generate_participacoes, generate_comentarios
+from aux_func import generate_participacoes, generate_comentarios, generate_comentarios_com_doacoes
+
+
+@checkpointed
+def populate_participacoes(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Participacao (depende de Video e Usuario)."""
+    print("    Gerando Participações...")
+    video_ids = inserter.ids.get(Video)
+    # Reusa os mesmos streamers selecionados no nível 4
+    streamer_ids = inserter.ids.selection('streamers')
+    
+    # Participações em lotes com offset (pares de uma permutação com chave da execução)
+    total = min(config.n_participacoes, len(video_ids) * len(streamer_ids))
+    inserter.insert_with_offset(
+        generate_participacoes, total, config.batch_sizes.huge,
+        "Participações", video_ids, streamer_ids, key=batch_seed(inserter.seed, "Participações", 0),
+        skew=config.skew['participacoes'].exponent_for(len(streamer_ids)), total_pairs=total
+    )
+
+
+@checkpointed
+def populate_comentarios(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Comentario (depende de Video e Usuario).
+    
+    Com `config.fused_donations`, cada lote também traz as doações e os
+    pagamentos dos seus comentários (tabelas Doacao, Bitcoin, CartaoCredito,
+    Paypal e MecPlat), dispensando os níveis 8 e 9.
+    """
+    # IDs de vídeos e usuários vêm das faixas reservadas (sem consultas ao banco)
+    video_ids = inserter.ids.get(Video)
+    usuario_ids = inserter.ids.get(Usuario)
+    
+    if config.fused_donations:
+        # Passe fundido: cada lote usa uma fatia exclusiva de vídeos, logo não
+        # pode haver mais lotes do que vídeos
+        print("    Gerando Comentários, Doações e Pagamentos em lotes (pode demorar)...")
+        batch_size = max(config.batch_sizes.large, -(-config.n_comentarios // max(len(video_ids), 1)))
+        # A popularidade vale dentro da fatia de vídeos de cada lote
+        fatia = -(-len(video_ids) * batch_size // max(config.n_comentarios, 1))
+        batches = inserter.iter_batches(
+            generate_comentarios_com_doacoes, config.n_comentarios, batch_size,
+            "Comentários", video_ids, usuario_ids, config.n_comentarios,
+            key=batch_seed(inserter.seed, "Comentários", 0), skew=config.skew['comentarios'].exponent_for(fatia)
+        )
+    else:
+        # Comentários (MAIOR VOLUME) - num_seq derivado do offset de cada lote,
+        # o que permite gerar os lotes em paralelo sem estado compartilhado
+        print("    Gerando Comentários em lotes (pode demorar)...")
+        batch_size = config.batch_sizes.large
+        batches = inserter.iter_batches(
+            generate_comentarios, config.n_comentarios, batch_size,
+            "Comentários", video_ids, usuario_ids, key=batch_seed(inserter.seed, "Comentários", 0),
+            skew=config.skew['comentarios'].exponent_for(len(video_ids))
+        )
+    
+    # Comentários com commits periódicos (cada um registra o lote no checkpoint)
+    _, inserted_rows = inserter.resume_point()
+    batch_num = 0
+    for batch_num, total_batches, com_batch in batches:
+        # Lotes gerados usando apenas IDs (muito mais eficiente)
+        inserted_rows += inserter.write(com_batch)
+        if not inserter.quiet:
+            inserted_comments = min(batch_num * batch_size, config.n_comentarios)
+            progress = (inserted_comments / config.n_comentarios) * 100
+            print(f"    [{batch_num}/{total_batches}] {progress:.1f}% - {inserted_comments:,}/{config.n_comentarios:,} Comentários", end='\r')
+        
+        del com_batch
+        
+        # Commit no intervalo do checkpoint (ou a cada 5 lotes sem checkpoint)
+        inserter.checkpoint_batch(batch_num, inserted_rows, every=5)
+    
+    if not inserter.quiet:
+        print()
+    if config.fused_donations:
+        print(f"    {inserted_rows:,} linhas em comentários, doações e pagamentos")
+    
+    # Sem o trigger, num_seq é renumerado em conjunto antes das doações lerem os comentários
+    if config.bypass_triggers:
+        if batch_num:
+            inserter.save_progress(batch_num, inserted_rows)
+        inserter.commit()
+        reconcile_comentarios(session)
 
 
 def populate_level_7(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> float:
@@ -31,68 +114,8 @@ def populate_level_7(session: Session, fake: Faker, config: DataConfig, inserter
     print(f"📦 [7/9] Gerando {config.n_participacoes:,} participações e {config.n_comentarios:,} comentários...")
     inicio = time.time()
     
-    # Carrega apenas os IDs dos vídeos (muito mais eficiente em memória)
-    print("    Carregando IDs dos vídeos...")
-    video_ids = [row[0] for row in session.query(Video.id).all()]
-    
-    # Carrega IDs dos usuários
-    usuario_ids = [row[0] for row in session.query(Usuario.id).all()]
-    
-    # Para participações, precisamos carregar objetos Video em lotes menores
-    print("    Gerando Participações...")
-    # Reusa a lógica de seleção de streamers (assumindo que n_streamers está configurado)
-    streamer_ids = random.sample(usuario_ids, min(config.n_streamers, len(usuario_ids)))
-    
-    # Carrega vídeos e streamers em lotes apenas para participações
-    FETCH_BATCH = 5_000  # Reduzido para economizar memória
-    videos_objs = []
-    for i in range(0, len(video_ids), FETCH_BATCH):
-        batch_ids = video_ids[i:i+FETCH_BATCH]
-        videos_objs.extend(session.query(Video).filter(Video.id.in_(batch_ids)).all())
-    
-    streamers = []
-    for i in range(0, len(streamer_ids), FETCH_BATCH):
-        batch_ids = streamer_ids[i:i+FETCH_BATCH]
-        streamers.extend(session.query(Usuario).filter(Usuario.id.in_(batch_ids)).all())
-    
-    # Participações (assinatura: videos, streamers, count - SEM fake)
-    participacoes_list = generate_participacoes(videos_objs, streamers, config.n_participacoes)
-    session.add_all(participacoes_list)
-    session.flush()
-    del participacoes_list, videos_objs, streamers
-    
-    # Comentários (MAIOR VOLUME) com estado
-    print("    Gerando Comentários em lotes (pode demorar)...")
-    num_seq_state = {}
-    
-    # Comentários com commits periódicos
-    inserted_comments = 0
-    batch_size = config.batch_sizes.large
-    total_batches = (config.n_comentarios + batch_size - 1) // batch_size
-    
-    for batch_num in range(1, total_batches + 1):
-        current_size = min(batch_size, config.n_comentarios - inserted_comments)
-        
-        # Amostra IDs de usuários (não precisa carregar objetos completos)
-        sample_size = min(current_size, len(usuario_ids))
-        sample_usuario_ids = random.sample(usuario_ids, sample_size)
-        
-        # Gera comentários usando apenas IDs (muito mais eficiente)
-        com_batch = generate_comentarios(fake, current_size, video_ids, sample_usuario_ids, num_seq_state)
-        session.add_all(com_batch)
-        session.flush()
-        
-        inserted_comments += len(com_batch)
-        progress = (inserted_comments / config.n_comentarios) * 100
-        print(f"    [{batch_num}/{total_batches}] {progress:.1f}% - {inserted_comments:,}/{config.n_comentarios:,} Comentários", end='\r')
-        
-        del com_batch
-        
-        # Commit a cada 5 lotes
-        if batch_num % 5 == 0:
-            session.commit()
-    
-    print()
+    populate_participacoes(session, fake, config, inserter)
+    populate_comentarios(session, fake, config, inserter)
     
     tempo_nivel = time.time() - inicio
     print(f"    ✓ Nível 7 concluído em {tempo_nivel:.2f}s\n")
@@ -10,8 +10,21 @@ from faker import Faker
 
 from ...config import DataConfig
 from ...batch_inserter import BatchInserter
+from ...checkpoint import checkpointed
 from models import Comentario
-from aux_func import generate_doacoes
+from aux_func import iter_doacoes
+
+
+@checkpointed
+def populate_doacoes(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula a tabela Doacao (depende de Comentario)."""
+    # Percorre só as chaves dos comentários (cursor no servidor ou arquivos exportados), em trechos
+    batch_size = config.batch_sizes.large
+    comentarios = inserter.fetch_columns(
+        Comentario.id_video, Comentario.num_seq, Comentario.id_usuario,
+        batch_size=batch_size, limit=config.n_comentarios
+    )
+    inserter.insert_stream(iter_doacoes(fake, comentarios, batch_size), batch_size, "Doações")
 
 
 def populate_level_8(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> float:
@@ -30,12 +43,10 @@ def populate_level_8(session: Session, fake: Faker, config: DataConfig, inserter
     print("📦 [8/9] Gerando doações...")
     inicio = time.time()
     
-    # Busca comentários para gerar doações (assinatura: fake, comentarios - sem count)
-    comentarios_list = session.query(Comentario).limit(config.n_comentarios).all()
-    doacoes_list = generate_doacoes(fake, comentarios_list)
-    session.add_all(doacoes_list)
-    session.flush()
-    del comentarios_list
+    if config.fused_donations:
+        print("    Já gerados no passe fundido do nível 7")
+    else:
+        populate_doacoes(session, fake, config, inserter)
     
     tempo_nivel = time.time() - inicio
     print(f"    ✓ Nível 8 concluído em {tempo_nivel:.2f}s\n")
@@ -10,8 +10,21 @@ from faker import Faker
 
 from ...config import DataConfig
 from ...batch_inserter import BatchInserter
+from ...checkpoint import checkpointed
+from ...parallel_generation import batch_seed
 from models import Doacao
-from aux_func import generate_pagamentos
+from aux_func import iter_pagamentos
+
+
+@checkpointed
+def populate_pagamentos(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> None:
+    """Popula as tabelas de pagamento (dependem de Doacao)."""
+    # Percorre só as chaves das doações (cursor no servidor ou arquivos exportados), em trechos
+    batch_size = config.batch_sizes.large
+    doacoes = inserter.fetch_columns(Doacao.id_video, Doacao.num_seq, Doacao.id_usuario, batch_size=batch_size)
+    # Os números de cartão só compartilham a chave derivada da semente da execução
+    pagamentos = iter_pagamentos(fake, doacoes, batch_size, key=batch_seed(inserter.seed, "Pagamentos", 0))
+    inserter.insert_stream(pagamentos, batch_size, "Pagamentos")
 
 
 def populate_level_9(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter) -> float:
@@ -30,11 +43,10 @@ def populate_level_9(session: Session, fake: Faker, config: DataConfig, inserter
     print("📦 [9/9] Gerando detalhes de pagamento...")
     inicio = time.time()
     
-    doacoes = session.query(Doacao).all()
-    bitcoins, cartoes, paypals, mec_plats = generate_pagamentos(fake, doacoes)
-    
-    session.add_all(bitcoins + cartoes + paypals + mec_plats)
-    session.flush()
+    if config.fused_donations:
+        print("    Já gerados no passe fundido do nível 7")
+    else:
+        populate_pagamentos(session, fake, config, inserter)
     
     tempo_nivel = time.time() - inicio
     print(f"    ✓ Nível 9 concluído em {tempo_nivel:.2f}s\n")
@@ -0,0 +1,268 @@
+"""
+Agendador em DAG da população por tabela.
+
+Em vez de executar os nove níveis em sequência, cada tabela (ou grupo de
+tabelas geradas juntas, como os pagamentos) vira uma tarefa. As dependências
+entre tarefas são derivadas das chaves estrangeiras de `Base.metadata`, e as
+tarefas cujas dependências já foram concluídas rodam em paralelo, cada uma
+com sua própria sessão (e conexão) do pool da engine.
+
+Além das FKs, uma tarefa pode declarar tabelas cujas linhas ela trava com
+FOR UPDATE (ex: o trigger de num_seq dos comentários trava o Usuario). Essas
+tarefas não rodam ao mesmo tempo que tarefas que referenciam a mesma tabela,
+pois os KEY SHARE das FKs conflitam com o FOR UPDATE e gerariam deadlocks.
+
+Ao final, o caminho crítico (a cadeia de dependências mais longa segundo as
+durações medidas) é reportado: é o limite inferior do tempo total com
+conexões ilimitadas.
+"""
+
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+from faker import Faker
+
+from ..config import DataConfig
+from ..batch_inserter import BatchInserter
+from ..parallel_generation import batch_seed
+from models import (
+    Empresa, Conversao, Pais, Plataforma, Usuario, PlataformaUsuario,
+    StreamerPais, EmpresaPais, Canal, Patrocinio, NivelCanal, Inscricao,
+    Video, Participa, Comentario, Doacao, Bitcoin, CartaoCredito, Paypal,
+    MecPlat
+)
+
+from .levels import (
+    populate_empresas,
+    populate_conversoes,
+    populate_paises,
+    populate_plataformas,
+    populate_usuarios,
+    populate_plataforma_usuarios,
+    populate_streamer_paises,
+    populate_empresa_paises,
+    populate_canais,
+    populate_patrocinios,
+    populate_nivel_canais,
+    populate_inscricoes,
+    populate_videos,
+    populate_participacoes,
+    populate_comentarios,
+    populate_doacoes,
+    populate_pagamentos
+)
+
+
+@dataclass
+class TableTask:
+    """
+    Tarefa do DAG: popula uma ou mais tabelas.
+
+    Attributes:
+        name: Nome da tarefa (usado nos tempos e no caminho crítico)
+        models: Modelos ORM populados pela tarefa
+        run: Função de população (session, fake, config, inserter)
+        row_locks: Tabelas cujas linhas a tarefa trava com FOR UPDATE
+    """
+    name: str
+    models: Tuple[type, ...]
+    run: Callable[[Session, Faker, DataConfig, BatchInserter], None]
+    row_locks: Tuple[str, ...] = ()
+
+    @property
+    def tables(self) -> Set[str]:
+        return {model.__table__.name for model in self.models}
+
+
+TABLE_TASKS: List[TableTask] = [
+    TableTask('empresas', (Empresa,), populate_empresas),
+    TableTask('conversoes', (Conversao,), populate_conversoes),
+    TableTask('paises', (Pais,), populate_paises),
+    TableTask('plataformas', (Plataforma,), populate_plataformas),
+    TableTask('usuarios', (Usuario,), populate_usuarios),
+    TableTask('plataforma_usuarios', (PlataformaUsuario,), populate_plataforma_usuarios),
+    TableTask('streamer_paises', (StreamerPais,), populate_streamer_paises),
+    TableTask('empresa_paises', (EmpresaPais,), populate_empresa_paises),
+    TableTask('canais', (Canal,), populate_canais),
+    TableTask('patrocinios', (Patrocinio,), populate_patrocinios),
+    TableTask('nivel_canais', (NivelCanal,), populate_nivel_canais),
+    TableTask('inscricoes', (Inscricao,), populate_inscricoes),
+    TableTask('videos', (Video,), populate_videos),
+    TableTask('participacoes', (Participa,), populate_participacoes),
+    # trg_auto_seq_comentario faz SELECT ... FOR UPDATE no Usuario de cada comentário
+    TableTask('comentarios', (Comentario,), populate_comentarios, row_locks=('usuario',)),
+    TableTask('doacoes', (Doacao,), populate_doacoes),
+    TableTask('pagamentos', (Bitcoin, CartaoCredito, Paypal, MecPlat), populate_pagamentos),
+]
+
+
+def tasks_for(config: DataConfig) -> List[TableTask]:
+    """
+    Retorna as tarefas da execução.
+
+    No passe fundido, a tarefa de comentários também popula doações e
+    pagamentos, e as tarefas separadas dessas tabelas deixam de existir.
+    """
+    if not config.fused_donations:
+        return TABLE_TASKS
+    fused = {'doacoes', 'pagamentos'}
+    absorbed = tuple(model for task in TABLE_TASKS if task.name in fused for model in task.models)
+    tasks = []
+    for task in TABLE_TASKS:
+        if task.name in fused:
+            continue
+        if task.name == 'comentarios':
+            task = replace(task, models=task.models + absorbed)
+        tasks.append(task)
+    return tasks
+
+
+def build_dependencies(tasks: List[TableTask]) -> Dict[str, Set[str]]:
+    """
+    Deriva as dependências entre tarefas a partir das FKs do metadata.
+
+    Returns:
+        Dicionário tarefa -> conjunto de tarefas das quais ela depende
+    """
+    owner = {table: task.name for task in tasks for table in task.tables}
+    deps = {task.name: set() for task in tasks}
+    for task in tasks:
+        for model in task.models:
+            for fk in model.__table__.foreign_keys:
+                parent = owner.get(fk.column.table.name)
+                if parent is not None and parent != task.name:
+                    deps[task.name].add(parent)
+    return deps
+
+
+def build_conflicts(tasks: List[TableTask]) -> Dict[str, Set[str]]:
+    """
+    Calcula quais tarefas não podem rodar simultaneamente por causa de
+    travas de linha (FOR UPDATE contra os KEY SHARE das FKs).
+
+    Returns:
+        Dicionário tarefa -> conjunto de tarefas conflitantes (simétrico)
+    """
+    conflicts = {task.name: set() for task in tasks}
+    for locker in tasks:
+        for locked in locker.row_locks:
+            for other in tasks:
+                if other is locker:
+                    continue
+                referenced = {
+                    fk.column.table.name
+                    for model in other.models for fk in model.__table__.foreign_keys
+                }
+                if locked in referenced or locked in other.tables:
+                    conflicts[locker.name].add(other.name)
+                    conflicts[other.name].add(locker.name)
+    return conflicts
+
+
+def critical_path(
+    deps: Dict[str, Set[str]],
+    durations: Dict[str, float],
+    order: List[str]
+) -> Tuple[float, List[str]]:
+    """
+    Calcula o caminho crítico (cadeia de dependências de maior duração).
+
+    Args:
+        deps: Dependências entre tarefas
+        durations: Duração medida de cada tarefa
+        order: Tarefas em ordem topológica (ex: ordem de conclusão)
+
+    Returns:
+        Tupla (duração do caminho, tarefas do caminho em ordem)
+    """
+    finish: Dict[str, float] = {}
+    previous: Dict[str, str] = {}
+    for name in order:
+        before = max(deps[name], key=lambda dep: finish[dep], default=None)
+        finish[name] = durations[name] + (finish[before] if before is not None else 0.0)
+        if before is not None:
+            previous[name] = before
+
+    if not finish:
+        return 0.0, []
+
+    last = max(finish, key=finish.get)
+    path = [last]
+    while path[-1] in previous:
+        path.append(previous[path[-1]])
+    return finish[last], path[::-1]
+
+
+def _run_task(task: TableTask, engine, fake: Faker, config: DataConfig, inserter: BatchInserter) -> float:
+    """Executa uma tarefa em sessão própria e devolve sua duração."""
+    # Cada tarefa tem seu próprio Faker, semeado a partir da semente da execução
+    task_fake = pickle.loads(pickle.dumps(fake))
+    task_fake.seed_instance(batch_seed(inserter.seed, task.name, 0))
+
+    inicio = time.time()
+    with Session(engine) as task_session:
+        task.run(task_session, task_fake, config, inserter.fork(task_session, task_fake))
+        task_session.commit()
+    return time.time() - inicio
+
+
+def populate_dag(session: Session, fake: Faker, config: DataConfig, inserter: BatchInserter, timings: dict) -> None:
+    """
+    Executa as tarefas de população seguindo o DAG de FKs.
+
+    Args:
+        session: Sessão do SQLAlchemy (fornece a engine das tarefas)
+        fake: Instância do Faker (clonada para cada tarefa)
+        config: Configuração de volume de dados
+        inserter: BatchInserter base (compartilha IDs, semente e pool de processos)
+        timings: Dicionário onde os tempos de cada tarefa são registrados
+    """
+    table_tasks = tasks_for(config)
+    tasks = {task.name: task for task in table_tasks}
+    deps = build_dependencies(table_tasks)
+    # Sem os triggers por linha não há FOR UPDATE, logo não há conflitos de trava
+    conflicts = build_conflicts([] if config.bypass_triggers else table_tasks)
+    engine = session.get_bind()
+
+    print(f"🕸️  Agendamento em DAG: {len(tasks)} tarefas, até {config.connections} conexões\n")
+
+    pending = dict(tasks)
+    running = {}
+    done: List[str] = []
+    durations: Dict[str, float] = {}
+
+    with ThreadPoolExecutor(max_workers=config.connections) as executor:
+        while pending or running:
+            # Submete todas as tarefas prontas e sem conflito com as em execução
+            for name in list(pending):
+                if len(running) >= config.connections:
+                    break
+                if not deps[name] <= set(done):
+                    continue
+                if conflicts.get(name, set()) & set(running.values()):
+                    continue
+                print(f"    ▶️  {name} iniciada")
+                future = executor.submit(_run_task, pending.pop(name), engine, fake, config, inserter)
+                running[future] = name
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    durations[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+                done.append(name)
+                timings[f'dag_{name}'] = durations[name]
+                print(f"    ✓ {name} concluída em {durations[name]:.2f}s")
+
+    length, path = critical_path(deps, durations, done)
+    timings['caminho_critico'] = length
+    timings['caminho_critico_tarefas'] = " → ".join(path)
+    print(f"\n    📐 Caminho crítico ({length:.2f}s): {timings['caminho_critico_tarefas']}")
@@ -47,6 +47,9 @@ def clean_database(engine: Engine) -> None:
         Conversao, 
         Empresa 
     RESTART IDENTITY CASCADE;
+    
+    -- O progresso de execuções anteriores deixa de valer
+    DROP TABLE IF EXISTS checkpoint_populacao;
     """
     
     try:
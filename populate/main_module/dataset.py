@@ -0,0 +1,557 @@
+"""
+Exportação do conjunto de dados para arquivos e carga posterior no banco.
+
+No modo de exportação, o BatchInserter escreve cada tabela em arquivos (CSV
+compactado compatível com COPY, ou Parquet) em vez de enviá-la ao banco: a
+geração é paga uma vez e o mesmo conjunto de dados pode ser carregado em
+vários ambientes. Nenhuma conexão é aberta durante a exportação:
+
+- as faixas de IDs começam em 1, como após o TRUNCATE ... RESTART IDENTITY
+  da limpeza; as identidades geradas pelo banco (ex: Empresa.nro) são
+  numeradas aqui, na ordem de escrita
+- as releituras dos níveis seguintes (países, plataformas, chaves de
+  comentários e doações) vêm dos próprios arquivos já escritos
+
+Estrutura do diretório:
+    manifest.json                   Formato, semente, colunas, linhas e partes por tabela
+    <tabela>/parte-00001.csv.gz     Partes de até `part_rows` linhas (ou .parquet)
+
+A carga (`load_dataset`) segue as FKs: as tabelas de uma mesma profundidade
+e as partes de uma mesma tabela são copiadas em paralelo, cada parte em sua
+conexão. Como na carga sem triggers, num_seq dos comentários é renumerado ao
+final (doações e pagamentos acompanham via ON UPDATE CASCADE) e as
+sequências de identidade são avançadas até o maior ID carregado.
+"""
+
+import csv
+import glob
+import gzip
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from itertools import groupby, islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy import types as sqltypes
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models import Base, SCHEMA
+from .config import EXPORT_FORMATS
+from .copy_writer import TableLayout, extract_rows, get_layout
+from .trigger_bypass import disable_triggers, enable_triggers, reconcile_comentarios, reconcile_pagamentos
+
+
+MANIFEST = "manifest.json"
+
+# Linhas por arquivo de parte (as partes de uma tabela são carregadas em paralelo)
+DEFAULT_PART_ROWS = 1_000_000
+
+# Nível do gzip: compressão razoável sem dominar o tempo de exportação
+GZIP_LEVEL = 3
+
+# Linhas convertidas de uma vez ao carregar Parquet
+PARQUET_COPY_ROWS = 50_000
+
+
+# ============================================================================
+# Codificação CSV (formato do COPY ... WITH (FORMAT csv))
+# ============================================================================
+
+def _csv_text(value: Any) -> str:
+    # Texto sempre entre aspas: "" é string vazia e o campo vazio é NULL
+    return '' if value is None else '"' + str(value).replace('"', '""') + '"'
+
+
+def _csv_plain(value: Any) -> str:
+    return '' if value is None else str(value)
+
+
+def _csv_bool(value: Any) -> str:
+    if value is None:
+        return ''
+    return 'true' if value else 'false'
+
+
+def _csv_temporal(value: Any) -> str:
+    if value is None:
+        return ''
+    return value.isoformat() if isinstance(value, (datetime, date, dt_time)) else str(value)
+
+
+def _csv_interval(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, timedelta):
+        return f"{value.days} days {value.seconds}.{value.microseconds:06d} seconds"
+    return str(value)
+
+
+def csv_encoder_for(column_type: sqltypes.TypeEngine) -> Callable[[Any], str]:
+    """Retorna a função de codificação CSV adequada ao tipo da coluna."""
+    if isinstance(column_type, sqltypes.Boolean):
+        return _csv_bool
+    if isinstance(column_type, sqltypes.Interval):
+        return _csv_interval
+    if isinstance(column_type, (sqltypes.Date, sqltypes.DateTime, sqltypes.Time)):
+        return _csv_temporal
+    if isinstance(column_type, (sqltypes.Integer, sqltypes.Numeric)):
+        return _csv_plain
+    return _csv_text
+
+
+def _decoder_for(column_type: sqltypes.TypeEngine) -> Callable[[str], Any]:
+    # Inverso dos codificadores CSV, para as releituras dos níveis seguintes
+    if isinstance(column_type, sqltypes.Enum):
+        enum_class = column_type.enum_class
+        return lambda value: enum_class(value) if enum_class is not None else value
+    if isinstance(column_type, sqltypes.Boolean):
+        return lambda value: None if value == '' else value == 'true'
+    if isinstance(column_type, sqltypes.Integer):
+        return lambda value: None if value == '' else int(value)
+    if isinstance(column_type, sqltypes.Numeric):
+        return lambda value: None if value == '' else Decimal(value)
+    if isinstance(column_type, sqltypes.DateTime):
+        return lambda value: None if value == '' else datetime.fromisoformat(value)
+    if isinstance(column_type, sqltypes.Date):
+        return lambda value: None if value == '' else date.fromisoformat(value)
+    if isinstance(column_type, sqltypes.Time):
+        return lambda value: None if value == '' else dt_time.fromisoformat(value)
+    # Texto: o csv não distingue NULL de string vazia na leitura
+    return lambda value: value
+
+
+def _column_types(layout: TableLayout) -> Dict[str, sqltypes.TypeEngine]:
+    return {column.name: column.type for column in layout.table.columns}
+
+
+def _encode_csv_rows(rows: Sequence[tuple], encoders: List[Callable[[Any], str]]) -> str:
+    return ''.join(
+        ','.join(encoder(value) for encoder, value in zip(encoders, row)) + '\n'
+        for row in rows
+    )
+
+
+def _arrow_schema(layout: TableLayout, columns: List[str]):
+    import pyarrow as pa
+
+    def arrow_type(column_type):
+        if isinstance(column_type, sqltypes.Enum):
+            return pa.string()
+        if isinstance(column_type, sqltypes.Boolean):
+            return pa.bool_()
+        if isinstance(column_type, sqltypes.BigInteger):
+            return pa.int64()
+        if isinstance(column_type, sqltypes.Integer):
+            return pa.int32()
+        if isinstance(column_type, sqltypes.Numeric):
+            return pa.decimal128(column_type.precision or 38, column_type.scale or 0)
+        if isinstance(column_type, sqltypes.DateTime):
+            return pa.timestamp('us')
+        if isinstance(column_type, sqltypes.Date):
+            return pa.date32()
+        if isinstance(column_type, sqltypes.Time):
+            return pa.time64('us')
+        if isinstance(column_type, sqltypes.Interval):
+            return pa.duration('us')
+        return pa.string()
+
+    types = _column_types(layout)
+    return pa.schema([(column, arrow_type(types[column])) for column in columns])
+
+
+def _require_pyarrow() -> None:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ValueError("O formato parquet requer o pacote pyarrow (pip install pyarrow)")
+
+
+# ============================================================================
+# Escrita
+# ============================================================================
+
+class _TableFiles:
+    """Partes de uma tabela: abre, escreve e fecha os arquivos em sequência."""
+
+    def __init__(self, directory: str, layout: TableLayout, columns: List[str], file_format: str, part_rows: int):
+        self.directory = directory
+        self.layout = layout
+        self.columns = columns
+        self.file_format = file_format
+        self.part_rows = part_rows
+        self.parts: List[str] = []
+        self.rows = 0
+        self._file = None
+        self._part_count = 0
+        types = _column_types(layout)
+        self._encoders = [csv_encoder_for(types[column]) for column in columns]
+        self._schema = _arrow_schema(layout, columns) if file_format == "parquet" else None
+
+        os.makedirs(directory, exist_ok=True)
+        # Partes de uma exportação anterior no mesmo diretório são descartadas
+        for old in glob.glob(os.path.join(directory, "parte-*")):
+            os.remove(old)
+
+    def write(self, rows: List[tuple]) -> int:
+        """Acrescenta linhas às partes, abrindo uma nova parte ao atingir o limite."""
+        written = 0
+        start = 0
+        while start < len(rows):
+            if self._file is None:
+                self._open_part()
+            room = self.part_rows - self._part_count
+            piece = rows[start:start + room]
+            if self.file_format == "parquet":
+                import pyarrow as pa
+                self._file.write_table(pa.Table.from_pylist(
+                    [dict(zip(self.columns, row)) for row in piece], schema=self._schema
+                ))
+            else:
+                payload = _encode_csv_rows(piece, self._encoders)
+                self._file.write(payload)
+                written += len(payload)
+            self._part_count += len(piece)
+            self.rows += len(piece)
+            start += len(piece)
+            if self._part_count >= self.part_rows:
+                self.close()
+        return written
+
+    def close(self) -> None:
+        """Fecha a parte aberta (a próxima escrita abre outra)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open_part(self) -> None:
+        extension = "parquet" if self.file_format == "parquet" else "csv.gz"
+        name = f"parte-{len(self.parts) + 1:05d}.{extension}"
+        path = os.path.join(self.directory, name)
+        if self.file_format == "parquet":
+            import pyarrow.parquet as pq
+            self._file = pq.ParquetWriter(path, self._schema, compression='zstd')
+        else:
+            self._file = gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=GZIP_LEVEL)
+            self._file.write(','.join(self.columns) + '\n')
+        self.parts.append(name)
+        self._part_count = 0
+
+
+class DatasetWriter:
+    """
+    Escreve os lotes do BatchInserter em arquivos, uma pasta por tabela.
+
+    Características:
+    - CSV compactado (gzip) no formato do COPY ... WITH (FORMAT csv, HEADER) ou Parquet
+    - Escrita em fluxo: cada lote é acrescentado à parte aberta da tabela
+    - Identidades não definidas são numeradas em ordem, como faria o banco
+    - Releitura de tabelas já escritas, no lugar das consultas ao banco
+    - Manifesto com colunas, linhas e partes, usado pela carga
+    """
+
+    def __init__(self, directory: str, file_format: str = "csv", part_rows: int = DEFAULT_PART_ROWS):
+        """
+        Inicializa o DatasetWriter.
+
+        Args:
+            directory: Diretório do conjunto de dados (criado se não existir)
+            file_format: "csv" (gzip, compatível com COPY) ou "parquet" (requer pyarrow)
+            part_rows: Linhas por arquivo de parte
+        """
+        if file_format not in EXPORT_FORMATS:
+            available = ", ".join(EXPORT_FORMATS)
+            raise ValueError(f"Formato de exportação '{file_format}' inválido. Disponíveis: {available}")
+        if file_format == "parquet":
+            _require_pyarrow()
+        self.directory = directory
+        self.file_format = file_format
+        self.part_rows = part_rows
+        self.bytes_written = 0  # Bytes de CSV escritos antes da compressão (acumulado)
+        self._tables: Dict[str, _TableFiles] = {}
+        self._next_id: Dict[str, int] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        manifest = os.path.join(directory, MANIFEST)
+        if os.path.exists(manifest):
+            # O manifesto só volta a existir quando a nova exportação terminar
+            os.remove(manifest)
+
+    def write(self, objs: Sequence[Any]) -> int:
+        """
+        Acrescenta objetos ORM (possivelmente de modelos diferentes) às suas tabelas.
+
+        Returns:
+            Número de linhas escritas
+        """
+        total = 0
+        for _, group in groupby(objs, key=type):
+            group = list(group)
+            layout = get_layout(type(group[0]))
+            if layout.identity is not None:
+                self._assign_identity(layout, group)
+            _, columns, rows = extract_rows(group)
+            files = self._files(layout, columns)
+            self.bytes_written += files.write(rows)
+            total += len(rows)
+        return total
+
+    def read(self, columns: Sequence[Any], limit: Optional[int] = None) -> Iterator[tuple]:
+        """
+        Percorre colunas de uma tabela já escrita, na ordem de escrita.
+
+        Args:
+            columns: Atributos ORM de um mesmo modelo (ex: Comentario.id_video, Comentario.num_seq)
+            limit: Máximo de linhas (None = todas)
+
+        Yields:
+            Tuplas nomeadas com os atributos pedidos
+        """
+        model = columns[0].class_
+        layout = get_layout(model)
+        files = self._tables.get(layout.table.name)
+        keys = [column.key for column in columns]
+        Row = namedtuple(model.__name__ + 'Row', keys)
+        if files is None:
+            return iter(())
+        # A parte aberta é fechada para que seu conteúdo possa ser lido
+        files.close()
+        names = [column.property.columns[0].name for column in columns]
+        paths = [os.path.join(files.directory, part) for part in files.parts]
+        rows = _read_parts(paths, self.file_format, files.columns, names, _column_types(layout))
+        return (Row(*values) for values in islice(rows, limit))
+
+    def close(self, info: Optional[dict] = None) -> None:
+        """
+        Fecha as partes abertas e, se `info` for informado, grava o manifesto.
+
+        Sem manifesto o diretório não é aceito pela carga (exportação incompleta).
+
+        Args:
+            info: Dados da execução gravados no manifesto (ex: preset e semente)
+        """
+        for files in self._tables.values():
+            files.close()
+        if info is None:
+            return
+        manifest = {
+            **info,
+            'formato': self.file_format,
+            'criado_em': datetime.now().isoformat(timespec='seconds'),
+            'tabelas': {
+                name: {
+                    'colunas': files.columns,
+                    'linhas': files.rows,
+                    'partes': files.parts,
+                    'identidade': _identity_column(files.layout),
+                }
+                for name, files in self._tables.items()
+            },
+        }
+        with open(os.path.join(self.directory, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+
+    def _files(self, layout: TableLayout, columns: List[str]) -> _TableFiles:
+        name = layout.table.name
+        files = self._tables.get(name)
+        if files is None:
+            files = self._tables[name] = _TableFiles(
+                os.path.join(self.directory, name), layout, columns, self.file_format, self.part_rows
+            )
+        return files
+
+    def _assign_identity(self, layout: TableLayout, objs: List[Any]) -> None:
+        # IDs reservados pelo IdAllocator são mantidos; os demais seguem a sequência
+        name = layout.table.name
+        next_id = self._next_id.get(name, 1)
+        for obj in objs:
+            value = getattr(obj, layout.identity)
+            if value is None:
+                setattr(obj, layout.identity, next_id)
+                next_id += 1
+            elif value >= next_id:
+                next_id = value + 1
+        self._next_id[name] = next_id
+
+
+def _identity_column(layout: TableLayout) -> Optional[str]:
+    if layout.identity is None:
+        return None
+    return layout.columns[layout.attrs.index(layout.identity)]
+
+
+def _model_for(table: str) -> type:
+    return next(mapper.class_ for mapper in Base.registry.mappers if mapper.local_table.name == table)
+
+
+def _read_parts(
+    paths: List[str],
+    file_format: str,
+    file_columns: List[str],
+    names: List[str],
+    types: Dict[str, sqltypes.TypeEngine]
+) -> Iterator[tuple]:
+    """Lê as colunas pedidas das partes de uma tabela, em ordem."""
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        enums = {name: types[name].enum_class for name in names if isinstance(types[name], sqltypes.Enum)}
+        for path in paths:
+            for batch in pq.ParquetFile(path).iter_batches(columns=names):
+                values = [batch.column(name).to_pylist() for name in names]
+                for name, enum_class in enums.items():
+                    if enum_class is not None:
+                        i = names.index(name)
+                        values[i] = [None if v is None else enum_class(v) for v in values[i]]
+                yield from zip(*values)
+        return
+
+    indexes = [file_columns.index(name) for name in names]
+    decoders = [_decoder_for(types[name]) for name in names]
+    for path in paths:
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            next(reader)  # Cabeçalho
+            for record in reader:
+                yield tuple(decoder(record[i]) for decoder, i in zip(decoders, indexes))
+
+
+# ============================================================================
+# Carga
+# ============================================================================
+
+def read_manifest(directory: str) -> dict:
+    """Lê o manifesto de um conjunto de dados exportado."""
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        raise ValueError(f"'{directory}' não contém {MANIFEST}: exportação inexistente ou incompleta")
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_waves(tables: Sequence[str]) -> List[List[str]]:
+    """
+    Agrupa as tabelas por profundidade no grafo de FKs do metadata.
+
+    Tabelas de uma mesma onda não dependem umas das outras e podem ser
+    carregadas em paralelo; cada onda só começa após a anterior.
+    """
+    metadata_tables = {table.name: table for table in Base.metadata.sorted_tables}
+    pending = set(tables)
+    loaded: set = set()
+    waves = []
+    while pending:
+        wave = sorted(
+            name for name in pending
+            if all(
+                fk.column.table.name in loaded or fk.column.table.name not in pending or fk.column.table.name == name
+                for fk in metadata_tables[name].foreign_keys
+            )
+        )
+        if not wave:
+            raise ValueError(f"Dependência circular entre as tabelas: {', '.join(sorted(pending))}")
+        waves.append(wave)
+        loaded.update(wave)
+        pending.difference_update(wave)
+    return waves
+
+
+def _copy_part(engine: Engine, directory: str, table: str, info: dict, part: str, file_format: str) -> int:
+    """Copia uma parte para o banco em conexão e transação próprias."""
+    columns = info['colunas']
+    sql = f"COPY {SCHEMA}.{table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv"
+    path = os.path.join(directory, table, part)
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if file_format == "parquet":
+            import io
+            import pyarrow.parquet as pq
+            types = _column_types(get_layout(_model_for(table)))
+            encoders = [csv_encoder_for(types[column]) for column in columns]
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_COPY_ROWS, columns=columns):
+                rows = list(zip(*(batch.column(column).to_pylist() for column in columns)))
+                cursor.copy_expert(sql + ")", io.StringIO(_encode_csv_rows(rows, encoders)))
+        else:
+            with gzip.open(path, 'rb') as f:
+                cursor.copy_expert(sql + ", HEADER true)", f)
+        connection.commit()
+    finally:
+        connection.close()
+    return info['linhas']
+
+
+def load_dataset(engine: Engine, directory: str, connections: int = 4) -> dict:
+    """
+    Carrega um conjunto de dados exportado em um banco limpo, em ordem de FKs.
+
+    Os triggers por linha ficam desabilitados durante a cópia (num_seq é
+    renumerado em conjunto e a exclusividade dos pagamentos é verificada ao
+    final), e as sequências de identidade são avançadas até o maior ID.
+
+    Args:
+        engine: Engine do SQLAlchemy (banco já limpo)
+        directory: Diretório do conjunto de dados
+        connections: Partes copiadas simultaneamente
+
+    Returns:
+        Dicionário com os tempos por tabela e total
+    """
+    manifest = read_manifest(directory)
+    tables = manifest['tabelas']
+    file_format = manifest['formato']
+    if file_format == "parquet":
+        _require_pyarrow()
+    timings: Dict[str, float] = {}
+    inicio_total = time.time()
+
+    total_rows = sum(info['linhas'] for info in tables.values())
+    print(f"📥 Carregando {total_rows:,} linhas de {len(tables)} tabelas ({file_format}, até {connections} conexões)")
+    print(f"    Preset {manifest.get('preset')}, semente {manifest.get('semente')}\n")
+
+    disable_triggers(engine)
+    try:
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            for wave in load_waves(list(tables)):
+                inicio = time.time()
+                futures = {
+                    executor.submit(_copy_part, engine, directory, table, tables[table], part, file_format): table
+                    for table in wave for part in tables[table]['partes']
+                }
+                for future in futures:
+                    future.result()
+                tempo = time.time() - inicio
+                for table in wave:
+                    timings[f'carga_{table}'] = tempo
+                counts = ', '.join(f"{table} ({tables[table]['linhas']:,})" for table in wave)
+                print(f"    ✓ {counts} em {tempo:.2f}s")
+
+        with Session(engine) as session:
+            if 'comentario' in tables:
+                timings['reconciliacao_comentarios'] = reconcile_comentarios(session)
+            if 'doacao' in tables:
+                reconcile_pagamentos(session, timings)
+            session.rollback()
+    finally:
+        enable_triggers(engine)
+
+    with engine.begin() as connection:
+        # Próximos INSERTs continuam depois dos IDs carregados
+        for table, info in tables.items():
+            if info['identidade'] and info['linhas']:
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{SCHEMA}.{table}', :column), "
+                    f"(SELECT MAX({info['identidade']}) FROM {SCHEMA}.{table}))"
+                ), {'column': info['identidade']})
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text("ANALYZE"))
+
+    timings['total'] = time.time() - inicio_total
+    print(f"\n✅ Carga concluída em {timings['total']:.2f}s")
+    return timings
@@ -0,0 +1,121 @@
+"""
+Reserva de faixas de IDs das colunas de identidade.
+
+Em vez de deixar o banco gerar os IDs e depois relê-los com
+`session.query(Model.id)`, o IdAllocator reserva antecipadamente faixas
+contíguas das sequências de identidade (via `nextval`/`setval`). Assim os
+geradores já conhecem todas as chaves primárias e os níveis seguintes não
+precisam consultar o banco para obtê-las.
+"""
+
+import random
+import re
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+
+class IdAllocator:
+    """
+    Gerencia faixas de IDs reservadas por modelo e seleções nomeadas de IDs.
+
+    Características:
+    - Reserva faixas contíguas das sequências de identidade
+    - Permite inserir IDs explícitos em colunas GENERATED ALWAYS
+      (COPY aceita diretamente; no ORM é adicionado OVERRIDING SYSTEM VALUE)
+    - Guarda amostras nomeadas (ex: streamers) para reuso entre níveis
+    - Sem sessão (exportação para arquivos), as faixas começam em 1
+    """
+
+    def __init__(self, session: Optional[Session]):
+        """
+        Inicializa o IdAllocator.
+
+        Args:
+            session: Sessão do SQLAlchemy (None = sem banco: faixas a partir de 1,
+                como após o TRUNCATE ... RESTART IDENTITY da limpeza)
+        """
+        self.session = session
+        self.ranges: Dict[type, range] = {}
+        self.selections: Dict[str, List[int]] = {}
+        self._override_pattern = None
+        self._engine = None
+
+    def reserve(self, model: type, count: int) -> range:
+        """
+        Reserva `count` IDs consecutivos da sequência de identidade do modelo.
+
+        Args:
+            model: Modelo ORM com coluna de identidade `id`
+            count: Quantidade de IDs a reservar
+
+        Returns:
+            Faixa de IDs reservada
+        """
+        table = model.__table__
+        qualified = f"{table.schema}.{table.name}"
+
+        if count <= 0:
+            reserved = range(0)
+        elif self.session is None:
+            reserved = range(1, count + 1)
+        else:
+            seq = self.session.execute(
+                text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': qualified}
+            ).scalar_one()
+            start = self.session.execute(text("SELECT nextval(:seq)"), {'seq': seq}).scalar_one()
+            if count > 1:
+                self.session.execute(text("SELECT setval(:seq, :last)"), {'seq': seq, 'last': start + count - 1})
+            reserved = range(start, start + count)
+
+        self.ranges[model] = reserved
+        self._register_override(table.name)
+        return reserved
+
+    def restore(self, model: type, reserved: range) -> None:
+        """Registra uma faixa reservada anteriormente (ex: ao retomar um checkpoint)."""
+        self.ranges[model] = reserved
+        self._register_override(model.__table__.name)
+
+    def get(self, model: type) -> range:
+        """Retorna a faixa previamente reservada para o modelo."""
+        if model not in self.ranges:
+            raise KeyError(f"Nenhuma faixa de IDs reservada para {model.__name__}")
+        return self.ranges[model]
+
+    def select(self, name: str, ids: Sequence[int], k: int) -> List[int]:
+        """
+        Amostra `k` IDs e guarda a seleção com o nome informado.
+
+        Chamadas seguintes com o mesmo nome devolvem a mesma seleção.
+        """
+        if name not in self.selections:
+            self.selections[name] = random.sample(ids, min(k, len(ids)))
+        return self.selections[name]
+
+    def selection(self, name: str) -> List[int]:
+        """Retorna uma seleção nomeada previamente criada com `select`."""
+        return self.selections[name]
+
+    def close(self) -> None:
+        """Remove o listener de OVERRIDING SYSTEM VALUE registrado na engine."""
+        if self._engine is not None:
+            event.remove(self._engine, "before_cursor_execute", self._add_overriding)
+            self._engine = None
+
+    def _register_override(self, table_name: str) -> None:
+        tables = {m.__table__.name for m in self.ranges} | {table_name}
+        self._override_pattern = re.compile(
+            r"^INSERT INTO core\.(%s) \(id," % "|".join(sorted(tables))
+        )
+        if self._engine is None and self.session is not None:
+            self._engine = self.session.get_bind()
+            event.listen(self._engine, "before_cursor_execute", self._add_overriding, retval=True)
+
+    def _add_overriding(self, conn, cursor, statement, parameters, context, executemany):
+        # INSERTs do ORM com IDs explícitos em colunas GENERATED ALWAYS precisam de
+        # OVERRIDING SYSTEM VALUE (o COPY não passa por aqui e aceita os valores)
+        if self._override_pattern is not None and self._override_pattern.match(statement):
+            statement = statement.replace(") VALUES ", ") OVERRIDING SYSTEM VALUE VALUES ", 1)
+        return statement, parameters
@@ -0,0 +1,237 @@
+"""
+Remoção e reconstrução de índices e restrições em torno das cargas grandes.
+
+Inserir em tabelas que já têm os índices de `indices.sql`, restrições UNIQUE
+e FKs obriga o banco a manter cada índice e a verificar cada FK linha a
+linha. O IndexRebuilder captura as definições desses objetos em
+`pg_catalog`, remove-os antes dos níveis 6 a 9 e os recria ao final:
+
+- índices secundários e UNIQUE são recriados em paralelo, uma conexão por
+  tabela, com `maintenance_work_mem` e `max_parallel_maintenance_workers`
+  elevados apenas nessas transações (SET LOCAL)
+- FKs são recriadas como NOT VALID (operação rápida) e depois validadas em
+  paralelo por tabela: o VALIDATE CONSTRAINT usa travas que não conflitam
+  com as validações das outras tabelas, evitando deadlocks entre FKs que
+  referenciam a mesma tabela
+
+Chaves primárias são mantidas (os triggers e as releituras dependem delas).
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+# Tabelas carregadas nos níveis 6 a 9
+DEFERRED_TABLES = (
+    'inscricao', 'video', 'participa', 'comentario',
+    'doacao', 'bitcoin', 'cartaocredito', 'paypal', 'mecplat',
+)
+
+INDEXES_SQL = """
+SELECT c.relname AS table_name, i.relname AS name, pg_get_indexdef(ix.indexrelid) AS definition
+FROM pg_index ix
+JOIN pg_class i ON i.oid = ix.indexrelid
+JOIN pg_class c ON c.oid = ix.indrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = :schema
+  AND c.relname = ANY(:tables)
+  AND NOT ix.indisprimary
+  AND NOT EXISTS (
+      SELECT 1 FROM pg_constraint con
+      WHERE con.conindid = ix.indexrelid AND con.conrelid = ix.indrelid
+  )
+ORDER BY c.relname, i.relname
+"""
+
+CONSTRAINTS_SQL = """
+SELECT cl.relname AS table_name, con.conname AS name, con.contype AS kind,
+       pg_get_constraintdef(con.oid) AS definition
+FROM pg_constraint con
+JOIN pg_class cl ON cl.oid = con.conrelid
+JOIN pg_namespace n ON n.oid = cl.relnamespace
+WHERE n.nspname = :schema
+  AND cl.relname = ANY(:tables)
+  AND (
+      con.contype = 'f'
+      -- UNIQUE referenciada por alguma FK não pode ser removida
+      OR (con.contype = 'u' AND NOT EXISTS (
+          SELECT 1 FROM pg_constraint fk
+          WHERE fk.contype = 'f' AND fk.conindid = con.conindid
+      ))
+  )
+ORDER BY cl.relname, con.conname
+"""
+
+_SETTING_PATTERN = re.compile(r"^\d+\s*(kB|MB|GB|TB)?$")
+
+
+class SchemaObject(NamedTuple):
+    """Índice ou restrição capturado do catálogo."""
+    table: str
+    name: str
+    kind: str  # "index", "unique" ou "fk"
+    definition: str
+
+
+class IndexRebuilder:
+    """
+    Captura, remove e recria índices secundários, UNIQUE e FKs de um
+    conjunto de tabelas.
+
+    Características:
+    - Definições lidas de pg_catalog (pg_get_indexdef / pg_get_constraintdef)
+    - Reconstrução em paralelo por tabela, em conexões separadas
+    - Parâmetros de manutenção elevados só durante a reconstrução
+    - Tempo de reconstrução por tabela registrado no dicionário de tempos
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        tables: Sequence[str] = DEFERRED_TABLES,
+        schema: str = "core",
+        connections: int = 4,
+        maintenance_work_mem: str = "1GB",
+        parallel_workers: int = 4
+    ):
+        """
+        Inicializa o IndexRebuilder.
+
+        Args:
+            engine: Engine do SQLAlchemy
+            tables: Tabelas cujos índices e restrições serão adiados
+            schema: Schema das tabelas
+            connections: Conexões simultâneas na reconstrução
+            maintenance_work_mem: Valor de maintenance_work_mem na reconstrução (ex: "1GB")
+            parallel_workers: Valor de max_parallel_maintenance_workers na reconstrução
+        """
+        if not _SETTING_PATTERN.match(maintenance_work_mem):
+            raise ValueError(f"maintenance_work_mem inválido: '{maintenance_work_mem}'")
+        self.engine = engine
+        self.tables = list(tables)
+        self.schema = schema
+        self.connections = connections
+        self.maintenance_work_mem = maintenance_work_mem
+        self.parallel_workers = parallel_workers
+        self.objects: List[SchemaObject] = []
+
+    def capture(self) -> List[SchemaObject]:
+        """Lê do catálogo as definições dos índices, UNIQUE e FKs das tabelas."""
+        params = {'schema': self.schema, 'tables': self.tables}
+        with self.engine.connect() as connection:
+            indexes = connection.execute(text(INDEXES_SQL), params).mappings().all()
+            constraints = connection.execute(text(CONSTRAINTS_SQL), params).mappings().all()
+
+        kinds = {'u': 'unique', 'f': 'fk'}
+        self.objects = [
+            SchemaObject(row['table_name'], row['name'], 'index', row['definition']) for row in indexes
+        ] + [
+            SchemaObject(row['table_name'], row['name'], kinds[row['kind']], row['definition']) for row in constraints
+        ]
+        return self.objects
+
+    def drop(self) -> None:
+        """Captura as definições e remove os objetos, em uma única transação."""
+        self.capture()
+        counts = {kind: sum(1 for obj in self.objects if obj.kind == kind) for kind in ('index', 'unique', 'fk')}
+        print(f"🗂️  Removendo {counts['index']} índices, {counts['unique']} UNIQUE e {counts['fk']} FKs "
+              f"de {len(self.tables)} tabelas antes da carga...")
+
+        with self.engine.begin() as connection:
+            # FKs primeiro: podem depender das UNIQUE/índices das outras tabelas
+            for obj in self._of_kind('fk') + self._of_kind('unique'):
+                connection.execute(text(f"ALTER TABLE {self._table(obj)} DROP CONSTRAINT {obj.name}"))
+            for obj in self._of_kind('index'):
+                connection.execute(text(f"DROP INDEX {self.schema}.{obj.name}"))
+        print()
+
+    def rebuild(self, timings: dict) -> float:
+        """
+        Recria os objetos removidos e registra os tempos.
+
+        Args:
+            timings: Dicionário onde são registrados `rebuild_<tabela>` e `rebuild_total`
+
+        Returns:
+            Tempo total da reconstrução em segundos
+        """
+        if not self.objects:
+            return 0.0
+
+        print(f"🏗️  Recriando índices e restrições ({self.connections} conexões, "
+              f"maintenance_work_mem={self.maintenance_work_mem}, "
+              f"max_parallel_maintenance_workers={self.parallel_workers})...")
+        inicio = time.time()
+        per_table: Dict[str, float] = {table: 0.0 for table in self.tables}
+
+        # Fase 1: índices e UNIQUE, uma conexão por tabela
+        print("    Índices e UNIQUE:")
+        self._run_per_table(self._of_kind('index') + self._of_kind('unique'), self._build_table, per_table)
+
+        # Fase 2: FKs criadas sem validação (rápido) e validadas em paralelo
+        fks = self._of_kind('fk')
+        with self.engine.begin() as connection:
+            for obj in fks:
+                connection.execute(text(
+                    f"ALTER TABLE {self._table(obj)} ADD CONSTRAINT {obj.name} {obj.definition} NOT VALID"
+                ))
+        print("    Validação das FKs:")
+        self._run_per_table(fks, self._validate_table, per_table)
+
+        for table, tempo in per_table.items():
+            if tempo:
+                timings[f'rebuild_{table}'] = tempo
+        timings['rebuild_total'] = time.time() - inicio
+        print(f"    ✓ Índices e restrições recriados em {timings['rebuild_total']:.2f}s")
+        return timings['rebuild_total']
+
+    def _run_per_table(self, objects: List[SchemaObject], worker, per_table: Dict[str, float]) -> None:
+        grouped: Dict[str, List[SchemaObject]] = {}
+        for obj in objects:
+            grouped.setdefault(obj.table, []).append(obj)
+        if not grouped:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.connections) as executor:
+            futures = {table: executor.submit(worker, objs) for table, objs in grouped.items()}
+            for table, future in futures.items():
+                tempo = future.result()
+                per_table[table] += tempo
+                print(f"      ✓ {table}: {len(grouped[table])} objetos em {tempo:.2f}s")
+
+    def _build_table(self, objects: List[SchemaObject]) -> float:
+        inicio = time.time()
+        with self.engine.begin() as connection:
+            self._raise_maintenance_settings(connection)
+            for obj in objects:
+                if obj.kind == 'index':
+                    connection.execute(text(obj.definition))
+                else:
+                    connection.execute(text(
+                        f"ALTER TABLE {self._table(obj)} ADD CONSTRAINT {obj.name} {obj.definition}"
+                    ))
+        return time.time() - inicio
+
+    def _validate_table(self, objects: List[SchemaObject]) -> float:
+        inicio = time.time()
+        with self.engine.begin() as connection:
+            self._raise_maintenance_settings(connection)
+            for obj in objects:
+                connection.execute(text(f"ALTER TABLE {self._table(obj)} VALIDATE CONSTRAINT {obj.name}"))
+        return time.time() - inicio
+
+    def _raise_maintenance_settings(self, connection) -> None:
+        # SET LOCAL: vale só para esta transação, a conexão volta ao pool sem alterações
+        connection.execute(text(f"SET LOCAL maintenance_work_mem = '{self.maintenance_work_mem}'"))
+        connection.execute(text(f"SET LOCAL max_parallel_maintenance_workers = {int(self.parallel_workers)}"))
+
+    def _of_kind(self, kind: str) -> List[SchemaObject]:
+        return [obj for obj in self.objects if obj.kind == kind]
+
+    def _table(self, obj: SchemaObject) -> str:
+        return f"{self.schema}.{obj.table}"
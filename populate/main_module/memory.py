@@ -0,0 +1,280 @@
+"""
+Orçamento de memória e pico de memória por nível e por entidade.
+
+Presets e tamanhos de lote costumam ser escolhidos às cegas, e um OOM só é
+descoberto depois. Este módulo oferece:
+
+- MemoryMonitor: registra o pico de RSS (VmHWM, zerado a cada escopo via
+  /proc/self/clear_refs) e, opcionalmente, o pico do tracemalloc e os
+  maiores alocadores de cada nível e entidade. Escopos simultâneos (tarefas
+  do agendador em DAG) recebem o mesmo pico enquanto estão abertos.
+- fit_batch_sizes: mede os bytes por linha dos geradores principais em uma
+  amostra e reduz os tamanhos de lote cuja projeção (bytes por linha ×
+  tamanho do lote × lotes residentes) ultrapassaria o orçamento.
+
+Os processos trabalhadores da geração paralela não entram no RSS medido;
+seus lotes em voo entram na projeção do orçamento.
+"""
+
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from faker import Faker
+
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(B|kB|KB|MB|GB|TB)?\s*$")
+_UNITS = {None: 1, 'B': 1, 'kB': 1024, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+# Linhas geradas por amostra na medição de bytes por linha
+CALIBRATION_ROWS = 2_000
+# Margem para as cópias do lote durante a escrita (flush do ORM, buffer do COPY)
+HEADROOM = 2
+# Menor tamanho de lote aceito pelo ajuste
+MIN_BATCH_SIZE = 100
+
+
+def parse_size(value: str) -> int:
+    """Converte um tamanho como "512MB" ou "4GB" em bytes."""
+    match = _SIZE_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Tamanho de memória inválido: '{value}' (ex: 512MB, 4GB)")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def format_size(num_bytes: Optional[float]) -> str:
+    """Formata bytes em uma unidade legível."""
+    if num_bytes is None:
+        return "-"
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.1f}{unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f}TB"
+
+
+def current_rss() -> int:
+    """RSS atual do processo em bytes."""
+    return _read_status('VmRSS') or peak_rss()
+
+
+def peak_rss() -> int:
+    """Pico de RSS do processo em bytes (desde o último reset)."""
+    hwm = _read_status('VmHWM')
+    if hwm:
+        return hwm
+    # ru_maxrss vem em KB no Linux (nunca é zerado)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else 0
+
+
+def _read_status(key: str) -> int:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(key + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _reset_peak_rss() -> None:
+    # Linux >= 4.0: "5" zera o VmHWM do processo
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+@dataclass
+class ScopeMemory:
+    """Pico de memória de um nível ou entidade."""
+    pico_rss: int = 0
+    pico_python: Optional[int] = None
+    top: List[str] = field(default_factory=list)
+
+
+class MemoryMonitor:
+    """
+    Registra o pico de memória por escopo (nível ou entidade).
+
+    Características:
+    - Pico de RSS sempre medido (leitura de /proc nas fronteiras dos escopos)
+    - tracemalloc opcional: pico de memória Python e maiores alocadores
+    - Seguro com escopos simultâneos em threads
+    """
+
+    def __init__(self, trace: bool = False, top: int = 3):
+        """
+        Inicializa o MemoryMonitor.
+
+        Args:
+            trace: Se True, usa tracemalloc (mais preciso, porém mais lento)
+            top: Quantidade de alocadores registrados por entidade
+        """
+        self.trace = trace
+        self.top = top
+        self.scopes: Dict[str, ScopeMemory] = {}
+        self._open: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """Inicia o tracemalloc, se pedido."""
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Encerra o tracemalloc, se tiver sido iniciado aqui."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[ScopeMemory]:
+        """Mede o pico de memória enquanto o escopo estiver aberto."""
+        with self._lock:
+            self._sample()
+            scope = self.scopes.setdefault(name, ScopeMemory())
+            self._open[name] = self._open.get(name, 0) + 1
+        try:
+            yield scope
+        finally:
+            with self._lock:
+                self._sample()
+                self._open[name] -= 1
+                if not self._open[name]:
+                    del self._open[name]
+
+    def snapshot(self, name: str) -> None:
+        """Registra os maiores alocadores vivos neste momento (uma vez por escopo)."""
+        scope = self.scopes.get(name)
+        if not self.trace or not tracemalloc.is_tracing() or scope is None or scope.top:
+            return
+        stats = tracemalloc.take_snapshot().statistics('lineno')[:self.top]
+        scope.top = [
+            f"{stat.traceback[0].filename.rsplit('/', 1)[-1]}:{stat.traceback[0].lineno} {format_size(stat.size)}"
+            for stat in stats
+        ]
+
+    def report(self) -> Dict[str, dict]:
+        """Retorna os picos por escopo, no formato incluído nos tempos."""
+        return {
+            name: {'pico_rss': scope.pico_rss, 'pico_python': scope.pico_python, 'top': scope.top}
+            for name, scope in self.scopes.items()
+        }
+
+    def _sample(self) -> None:
+        # Atribui o pico desde a última amostra a todos os escopos abertos e zera os contadores
+        rss = peak_rss()
+        python_peak = tracemalloc.get_traced_memory()[1] if self.trace and tracemalloc.is_tracing() else None
+        for name in self._open:
+            scope = self.scopes[name]
+            scope.pico_rss = max(scope.pico_rss, rss)
+            if python_peak is not None:
+                scope.pico_python = max(scope.pico_python or 0, python_peak)
+        _reset_peak_rss()
+        if python_peak is not None:
+            tracemalloc.reset_peak()
+
+
+def _calibration_samples(config) -> List[Tuple[str, str, Callable[[Faker, int], list]]]:
+    # Geradores dos lotes principais, com argumentos sintéticos (apenas IDs)
+    from aux_func import (
+        generate_usuarios, generate_plataforma_usuarios, generate_inscricoes, generate_videos,
+        generate_participacoes, generate_comentarios, generate_comentarios_com_doacoes,
+        generate_patrocinios,
+    )
+    ids = range(1, CALIBRATION_ROWS + 1)
+    pais = SimpleNamespace(ddi=55)
+    if config.fused_donations:
+        comentarios = lambda fake, n: generate_comentarios_com_doacoes(fake, n, ids, ids, n)
+    else:
+        comentarios = lambda fake, n: generate_comentarios(fake, n, ids, ids)
+    return [
+        ('medium', 'Usuários', lambda fake, n: generate_usuarios(fake, n, [pais], id_start=1)),
+        ('huge', 'PlataformaUsuario', lambda fake, n: generate_plataforma_usuarios(fake, n, [1, 2, 3], ids, key=1)),
+        ('huge', 'Inscrições', lambda fake, n: generate_inscricoes(fake, n, ids, ids, key=1)),
+        ('huge', 'Participações', lambda fake, n: generate_participacoes(fake, n, ids, ids, key=1)),
+        ('large', 'Vídeos', lambda fake, n: generate_videos(fake, n, ids, id_start=1)),
+        ('large', 'Comentários', comentarios),
+        ('large', 'Patrocínios', lambda fake, n: generate_patrocinios(fake, n, ids, ids, key=1)),
+    ]
+
+
+def measure_bytes_per_row(fake: Faker, generator: Callable[[Faker, int], list], rows: int = CALIBRATION_ROWS) -> float:
+    """Mede com tracemalloc os bytes por linha mantidos por um lote gerado."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    batch = None
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        batch = generator(fake, rows)
+        after = tracemalloc.get_traced_memory()[0]
+        return max(after - before, 0) / max(len(batch), 1)
+    finally:
+        del batch
+        if started:
+            tracemalloc.stop()
+
+
+def fit_batch_sizes(config, fake: Faker, budget: int) -> Dict[str, float]:
+    """
+    Reduz os tamanhos de lote cuja projeção de memória excede o orçamento.
+
+    A projeção de uma categoria é bytes por linha (maior entre suas entidades)
+    × tamanho do lote × lotes residentes × HEADROOM, onde os lotes residentes
+    incluem os lotes em voo da geração paralela e da escrita em segundo plano.
+
+    Args:
+        config: Configuração de volume de dados (batch_sizes é alterado)
+        fake: Instância do Faker usada nas amostras
+        budget: Orçamento de memória em bytes
+
+    Returns:
+        Bytes por linha medidos por entidade
+    """
+    print(f"🧮 Medindo bytes por linha para o orçamento de memória de {format_size(budget)}...")
+    inicio = time.time()
+    measured: Dict[str, float] = {}
+    per_category: Dict[str, float] = {}
+    for category, entity, generator in _calibration_samples(config):
+        measured[entity] = measure_bytes_per_row(fake, generator)
+        per_category[category] = max(per_category.get(category, 0.0), measured[entity])
+        print(f"    {entity}: {measured[entity]:,.0f} bytes/linha")
+
+    resident = config.workers * 2 + 1 if config.workers > 1 else 1
+    # Lotes entregues à escrita em segundo plano e ainda não escritos
+    if config.insert_engine == "async":
+        resident += 3 * config.connections  # fila (2 por conexão) + um em envio por conexão
+    elif config.overlap_writes:
+        resident += config.writes_in_flight
+    available = budget - current_rss()
+    if available <= 0:
+        print(f"    ⚠️  O processo já usa {format_size(current_rss())}, acima do orçamento")
+    for category, bytes_per_row in per_category.items():
+        size = getattr(config.batch_sizes, category)
+        projected = bytes_per_row * size * resident * HEADROOM
+        if projected <= available:
+            continue
+        fitted = max(MIN_BATCH_SIZE, int(max(available, 0) / (bytes_per_row * resident * HEADROOM)))
+        setattr(config.batch_sizes, category, min(size, fitted))
+        print(f"    ↘️  Lote {category.upper()}: {size:,} → {min(size, fitted):,} "
+              f"(projeção de {format_size(projected)} com {resident} lotes residentes)")
+        if bytes_per_row * fitted * resident * HEADROOM > available:
+            print(f"    ⚠️  Lote {category.upper()} no mínimo de {MIN_BATCH_SIZE} linhas: orçamento insuficiente")
+    print(f"    ✓ Medição concluída em {time.time() - inicio:.2f}s\n")
+    return measured
@@ -0,0 +1,86 @@
+"""
+Métricas estruturadas de vazão por entidade e por lote.
+
+O resumo de tempos mostra um número por nível; para comparar execuções e
+plotar a vazão, cada lote escrito pelo BatchInserter vira um registro com
+linhas, tempo de geração, tempo de escrita (flush do ORM ou COPY), tempo de
+commit, linhas/s e bytes enviados (apenas no motor COPY). Os registros vão
+para um arquivo JSON Lines ou CSV (pela extensão), um por linha.
+"""
+
+import csv
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Optional
+
+
+@dataclass
+class BatchMetric:
+    """Métricas de um lote (preenchidas ao longo da geração, escrita e commit)."""
+    entidade: str
+    lote: int
+    linhas: int = 0
+    geracao_s: float = 0.0
+    escrita_s: float = 0.0
+    commit_s: float = 0.0
+    bytes: Optional[int] = None
+    inicio_s: float = 0.0  # Instante do início do lote, relativo ao início da execução
+
+    @property
+    def linhas_por_s(self) -> float:
+        total = self.geracao_s + self.escrita_s + self.commit_s
+        return self.linhas / total if total > 0 else 0.0
+
+
+COLUMNS = [f.name for f in fields(BatchMetric)] + ['linhas_por_s']
+
+
+class MetricsRecorder:
+    """
+    Grava as métricas dos lotes em JSON Lines ou CSV.
+
+    Características:
+    - Formato escolhido pela extensão do arquivo (.csv ou JSON Lines)
+    - Seguro com várias threads (tarefas do agendador em DAG)
+    - Uma linha por lote, gravada assim que o lote termina
+    """
+
+    def __init__(self, path: str):
+        """
+        Inicializa o MetricsRecorder.
+
+        Args:
+            path: Arquivo de saída (.csv para CSV; qualquer outra extensão, JSON Lines)
+        """
+        self.path = path
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._csv = None
+        if path.lower().endswith('.csv'):
+            self._csv = csv.DictWriter(self._file, fieldnames=COLUMNS)
+            self._csv.writeheader()
+
+    def elapsed(self) -> float:
+        """Segundos desde o início da execução."""
+        return time.perf_counter() - self.started
+
+    def record(self, metric: BatchMetric) -> None:
+        """Grava as métricas de um lote."""
+        row = asdict(metric)
+        row['linhas_por_s'] = metric.linhas_por_s
+        for key in ('geracao_s', 'escrita_s', 'commit_s', 'inicio_s', 'linhas_por_s'):
+            row[key] = round(row[key], 6)
+        with self._lock:
+            if self._csv is not None:
+                self._csv.writerow(row)
+            else:
+                self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def close(self) -> None:
+        """Fecha o arquivo de métricas."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
@@ -0,0 +1,110 @@
+"""
+Geração de lotes em paralelo com múltiplos processos.
+
+As chamadas ao Faker são CPU-bound e rodam em um único núcleo enquanto o
+banco fica ocioso. Este módulo distribui a geração dos lotes entre um
+`ProcessPoolExecutor`, enquanto o processo principal continua sendo o único
+escritor: os resultados são consumidos na mesma ordem em que os lotes foram
+submetidos e enviados pela conexão da sessão.
+
+Cada lote recebe sua própria semente (derivada da semente da execução, da
+entidade e do número do lote), e o Faker e o `random` do processo trabalhador
+são re-semeados antes de gerar o lote. Os offsets continuam disjuntos entre
+lotes, portanto os sufixos `unique_id` de nicks, emails e títulos seguem
+únicos independentemente de qual processo gerou cada lote.
+"""
+
+import random
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from faker import Faker
+
+from .copy_writer import encode_batch
+
+
+# Faker do processo trabalhador (definido pelo initializer do pool)
+_WORKER_FAKE: Optional[Faker] = None
+
+
+def batch_seed(seed: int, entity_name: str, batch_num: int) -> int:
+    """Deriva uma semente estável para um lote a partir da semente da execução."""
+    return zlib.crc32(f"{seed}:{entity_name}:{batch_num}".encode())
+
+
+def _init_worker(fake: Faker) -> None:
+    global _WORKER_FAKE
+    _WORKER_FAKE = fake
+
+
+def _run_task(
+    generator_func: Callable,
+    seed: int,
+    call_args: Tuple[Any, ...],
+    call_kwargs: Dict[str, Any],
+    encode: bool
+) -> List[Any]:
+    """Gera um lote no processo trabalhador (e o codifica para COPY, se pedido)."""
+    random.seed(seed)
+    _WORKER_FAKE.seed_instance(seed)
+    batch = generator_func(_WORKER_FAKE, *call_args, **call_kwargs)
+    return encode_batch(batch) if encode else batch
+
+
+class ParallelGenerator:
+    """
+    Pool de processos que gera lotes e os devolve em ordem.
+
+    Características:
+    - Faker e random re-semeados por lote em cada trabalhador
+    - Número limitado de lotes em voo (evita acumular memória)
+    - Codificação COPY feita no próprio trabalhador quando o motor é "copy"
+    """
+
+    def __init__(self, fake: Faker, workers: int, encode: bool = False):
+        """
+        Inicializa o ParallelGenerator.
+
+        Args:
+            fake: Instância do Faker copiada para cada trabalhador
+            workers: Número de processos trabalhadores
+            encode: Se True, os trabalhadores devolvem lotes já codificados para COPY
+        """
+        self.workers = workers
+        self.encode = encode
+        self.max_in_flight = workers * 2
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(fake,)
+        )
+
+    def map_ordered(
+        self,
+        generator_func: Callable,
+        tasks: Iterable[Tuple[int, Tuple[Any, ...], Dict[str, Any]]]
+    ) -> Iterator[List[Any]]:
+        """
+        Executa as tarefas no pool e devolve os lotes na ordem de submissão.
+
+        Args:
+            generator_func: Função geradora (precisa ser importável no trabalhador)
+            tasks: Tuplas (semente, args, kwargs) de cada lote
+
+        Yields:
+            Lotes gerados, na mesma ordem das tarefas
+        """
+        pending = deque()
+        for seed, call_args, call_kwargs in tasks:
+            pending.append(self._executor.submit(
+                _run_task, generator_func, seed, call_args, call_kwargs, self.encode
+            ))
+            if len(pending) >= self.max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def close(self) -> None:
+        """Encerra o pool de processos."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
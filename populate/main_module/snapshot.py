@@ -0,0 +1,262 @@
+"""
+Cache de snapshots dos dados populados, por preset, semente e schema.
+
+Regerar um preset grande a cada experimento custa muito mais do que copiar
+os dados já gerados. Ao final de uma população com semente fixa, os dados de
+cada tabela do schema `core` são gravados em arquivos COPY binários (um por
+tabela, copiados em paralelo a partir de um mesmo snapshot de transação),
+junto com os valores das sequências. Uma execução seguinte com a mesma chave
+restaura esses arquivos em vez de gerar os dados:
+
+- chave: preset, semente, contagens, opções que mudam os dados (lotes,
+  workers, passe fundido, pools do Faker, popularidade) e o hash do schema
+  (colunas, restrições e triggers, com o corpo das funções de trigger;
+  índices não entram, já que não mudam os dados)
+- restauração: tabelas de uma mesma profundidade no grafo de FKs em paralelo,
+  com os triggers de usuário desabilitados (os dados já contêm o efeito deles)
+
+A semente define os dados de cada lote, e o `main.py` também sorteia as
+contagens do preset com ela (`get_preset(nome, semente)`); as contagens
+entram na chave mesmo assim, para configurações montadas de outra forma.
+Colunas relativas ao relógio (datas "deste ano" ou "até hoje") são as da
+execução que gravou o snapshot.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from models import Base, SCHEMA
+from .config import DataConfig
+from .dataset import load_waves
+
+
+MANIFEST = "snapshot.json"
+
+# Definições que determinam os dados gerados (as de índices ficam de fora)
+SCHEMA_DEFINITION_SQL = """
+SELECT def FROM (
+    SELECT format('coluna %s.%s %s %s %s', table_name, column_name, data_type,
+                  is_nullable, coalesce(column_default, '')) AS def
+    FROM information_schema.columns WHERE table_schema = :schema
+    UNION ALL
+    SELECT format('restricao %s %s %s', conrelid::regclass, conname, pg_get_constraintdef(oid))
+    FROM pg_constraint WHERE connamespace = CAST(:schema AS regnamespace) AND contype <> 'x'
+    UNION ALL
+    SELECT format('trigger %s %s', pg_get_triggerdef(t.oid), pg_get_functiondef(t.tgfoid))
+    FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid
+    WHERE NOT t.tgisinternal AND c.relnamespace = CAST(:schema AS regnamespace)
+) d
+ORDER BY def
+"""
+
+
+def _tables() -> List[str]:
+    return [table.name for table in Base.metadata.sorted_tables if table.schema == SCHEMA]
+
+
+class SnapshotCache:
+    """
+    Grava e restaura snapshots dos dados em um diretório de cache.
+
+    Características:
+    - Um subdiretório por chave (preset, semente, opções e hash do schema)
+    - Arquivos COPY binários por tabela, gravados e restaurados em paralelo
+    - Gravação em diretório temporário, renomeado ao final (sem snapshots parciais)
+    - Tempo da geração original guardado para comparar com a restauração
+    """
+
+    def __init__(self, directory: str, engine: Engine, jobs: int = 4):
+        """
+        Inicializa o SnapshotCache.
+
+        Args:
+            directory: Diretório do cache (criado se não existir)
+            engine: Engine do SQLAlchemy
+            jobs: Tabelas copiadas simultaneamente (uma conexão cada)
+        """
+        self.directory = directory
+        self.engine = engine
+        self.jobs = jobs
+
+    def schema_hash(self) -> str:
+        """Hash das definições do schema que afetam os dados."""
+        with self.engine.connect() as connection:
+            definitions = connection.execute(text(SCHEMA_DEFINITION_SQL), {'schema': SCHEMA}).scalars().all()
+        return hashlib.sha256('\n'.join(definitions).encode('utf-8')).hexdigest()
+
+    def key(self, config: DataConfig, seed: int) -> str:
+        """
+        Nome do snapshot da execução.
+
+        Args:
+            config: Configuração de volume de dados
+            seed: Semente da execução
+
+        Returns:
+            Chave no formato <preset>-semente<N>-<hash>
+        """
+        options = json.dumps({
+            'contagens': config.counts(),
+            'batch_sizes': asdict(config.batch_sizes),
+            'workers': config.workers,
+            'fused_donations': config.fused_donations,
+            'faker_pool_size': config.faker_pool_size,
+            'skew': {relation: asdict(skew) for relation, skew in config.skew.items()},
+            'schema': self.schema_hash(),
+        }, sort_keys=True)
+        digest = hashlib.sha256(options.encode('utf-8')).hexdigest()[:12]
+        return f"{config.preset_name}-semente{seed}-{digest}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def exists(self, key: str) -> bool:
+        """Indica se há um snapshot completo para a chave."""
+        return os.path.exists(os.path.join(self.path(key), MANIFEST))
+
+    def save(self, key: str, generation_time: float) -> float:
+        """
+        Grava os dados atuais do schema como snapshot da chave.
+
+        Args:
+            key: Chave do snapshot
+            generation_time: Duração da geração que produziu os dados
+
+        Returns:
+            Tempo de gravação em segundos
+        """
+        print(f"📸 Gravando snapshot {key}...")
+        inicio = time.time()
+        os.makedirs(self.directory, exist_ok=True)
+        partial = self.path(key) + ".parcial"
+        shutil.rmtree(partial, ignore_errors=True)
+        os.makedirs(partial)
+
+        # Todas as tabelas são lidas do mesmo snapshot de transação
+        leader = self.engine.raw_connection()
+        try:
+            cursor = leader.cursor()
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute("SELECT pg_export_snapshot()")
+            snapshot_id = cursor.fetchone()[0]
+            cursor.execute(
+                "SELECT sequencename, last_value FROM pg_sequences WHERE schemaname = %s", (SCHEMA,)
+            )
+            sequences = {name: value for name, value in cursor.fetchall() if value is not None}
+
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                rows = dict(zip(_tables(), executor.map(
+                    lambda table: self._dump_table(table, partial, snapshot_id), _tables()
+                )))
+        finally:
+            leader.rollback()
+            leader.close()
+
+        manifest = {
+            'chave': key,
+            'criado_em': datetime.now().isoformat(timespec='seconds'),
+            'tempo_geracao': generation_time,
+            'linhas': rows,
+            'sequencias': sequences,
+        }
+        with open(os.path.join(partial, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        shutil.rmtree(self.path(key), ignore_errors=True)
+        os.rename(partial, self.path(key))
+
+        tempo = time.time() - inicio
+        size = sum(os.path.getsize(os.path.join(self.path(key), name)) for name in os.listdir(self.path(key)))
+        print(f"    ✓ {sum(rows.values()):,} linhas ({size / 1024 ** 2:,.1f}MB) em {tempo:.2f}s\n")
+        return tempo
+
+    def restore(self, key: str) -> dict:
+        """
+        Restaura o snapshot da chave em um banco limpo.
+
+        Returns:
+            Dicionário com o tempo de restauração e o da geração substituída
+        """
+        with open(os.path.join(self.path(key), MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+        rows: Dict[str, int] = manifest['linhas']
+        print(f"♻️  Restaurando snapshot {key} ({sum(rows.values()):,} linhas, até {self.jobs} conexões)...")
+        inicio = time.time()
+
+        tables = [table for table in _tables() if table in rows]
+        self._set_user_triggers(tables, enabled=False)
+        try:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                for wave in load_waves(tables):
+                    list(executor.map(lambda table: self._restore_table(table, self.path(key)), wave))
+        finally:
+            self._set_user_triggers(tables, enabled=True)
+
+        with self.engine.begin() as connection:
+            for sequence, value in manifest['sequencias'].items():
+                connection.execute(text("SELECT setval(:seq, :value)"), {'seq': f"{SCHEMA}.{sequence}", 'value': value})
+        with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(text("ANALYZE"))
+
+        tempo = time.time() - inicio
+        geracao = manifest['tempo_geracao']
+        print(f"    ✓ Restaurado em {tempo:.2f}s no lugar de {geracao:.2f}s de geração "
+              f"({geracao / tempo if tempo else 0:.1f}x mais rápido)\n")
+        return {'restauracao_snapshot': tempo, 'geracao_substituida': geracao, 'total': tempo}
+
+    def _dump_table(self, table: str, directory: str, snapshot_id: str) -> int:
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot_id,))
+            with open(os.path.join(directory, f"{table}.copy"), 'wb') as f:
+                cursor.copy_expert(f"COPY {SCHEMA}.{table} TO STDOUT (FORMAT binary)", f)
+            cursor.execute(f"SELECT COUNT(*) FROM {SCHEMA}.{table}")
+            return cursor.fetchone()[0]
+        finally:
+            connection.rollback()
+            connection.close()
+
+    def _restore_table(self, table: str, directory: str) -> None:
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            with open(os.path.join(directory, f"{table}.copy"), 'rb') as f:
+                cursor.copy_expert(f"COPY {SCHEMA}.{table} FROM STDIN (FORMAT binary)", f)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _set_user_triggers(self, tables: List[str], enabled: bool) -> None:
+        # Os triggers internos das FKs continuam valendo durante a restauração
+        action = "ENABLE" if enabled else "DISABLE"
+        with self.engine.begin() as connection:
+            for table in tables:
+                connection.execute(text(f"ALTER TABLE {SCHEMA}.{table} {action} TRIGGER USER"))
+
+
+def open_cache(config: DataConfig, engine: Engine, seed: Optional[int]) -> Optional[SnapshotCache]:
+    """
+    Cria o cache de snapshots da execução, se configurado e aplicável.
+
+    Sem semente fixa (`--seed`) os dados não se repetem entre execuções, e a retomada e a
+    exportação para arquivos não partem de um banco limpo: nesses casos não
+    há cache.
+    """
+    if not config.snapshot_dir or config.export_dir or config.resume:
+        return None
+    if seed is None:
+        print("ℹ️  Cache de snapshots ignorado: informe --seed para que a execução seja reprodutível\n")
+        return None
+    return SnapshotCache(config.snapshot_dir, engine, config.connections)
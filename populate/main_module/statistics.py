@@ -2,7 +2,7 @@
 Módulo de estatísticas e relatórios sobre o volume de dados.
 """
 
-from .config import DataConfig
+from .config import DataConfig, SKEWED_RELATIONS
 
 
 def print_data_statistics(config: DataConfig) -> None:
@@ -36,6 +36,17 @@ def print_data_statistics(config: DataConfig) -> None:
     print(f"  • Níveis de Canal:    {config.n_niveis_totais:>12,} registros")
     print(f"  • Doações (estimado): {config.n_doacoes_estimado:>12,} registros")
     
+    # Popularidade assimétrica (Zipf) dos pais, quando configurada
+    assimetricos = {relation: skew for relation, skew in config.skew.items() if skew.exponent > 0 or skew.top_share}
+    if assimetricos:
+        print("\n🔥 POPULARIDADE (ZIPF):")
+        for relation, skew in assimetricos.items():
+            if skew.top_share:
+                valor = f"{skew.top_share:.0%} das linhas no {skew.top_fraction:.0%} mais popular"
+            else:
+                valor = f"expoente {skew.exponent:g}"
+            print(f"  • {relation}: {valor} dos {SKEWED_RELATIONS[relation]}")
+    
     total_registros = config.get_total_records()
     print(f"\n📈 TOTAL ESTIMADO:     {total_registros:>12,} registros")
     
@@ -56,10 +67,43 @@ def print_data_statistics(config: DataConfig) -> None:
     
     print("\n🚀 OTIMIZAÇÕES ATIVADAS:")
     print("  ✓ Geração em lotes (batch processing)")
-    print("  ✓ Liberação agressiva de memória (garbage collection)")
+    print("  ✓ Geração em fluxo: memória limitada a um lote por vez")
     print("  ✓ Commits intermediários para evitar rollback massivo")
     print("  ✓ Estados compartilhados para garantir unicidade")
     print("  ✓ Amostragem inteligente para reduzir colisões")
+    print(f"  ✓ Motor de inserção: {config.insert_engine.upper()}")
+    if config.insert_engine == "async":
+        print(f"  ✓ Escrita assíncrona: até {config.connections} lotes em voo (asyncpg)")
+    elif config.overlap_writes:
+        print(f"  ✓ Escrita em segundo plano: até {config.writes_in_flight} lotes em voo, sobreposta à geração")
+    if config.workers > 1:
+        print(f"  ✓ Geração paralela: {config.workers} processos")
+    if config.scheduler == "dag":
+        print(f"  ✓ Agendamento em DAG de FKs: até {config.connections} conexões")
+    if config.bypass_triggers:
+        print("  ✓ Carga sem triggers por linha (reconciliação em conjunto ao final)")
+    if config.fused_donations:
+        print("  ✓ Passe fundido comentário → doação → pagamento (sem releitura)")
+    if config.rebuild_indexes:
+        print(f"  ✓ Índices e restrições dos níveis 6-9 recriados após a carga ({config.maintenance_work_mem})")
+    if config.faker_pool_size:
+        print(f"  ✓ Pools de valores do Faker: {config.faker_pool_size:,} valores por campo")
+    if config.resume:
+        print("  ✓ Retomada da última execução interrompida (sem limpeza do banco)")
+    elif config.checkpoint:
+        print(f"  ✓ Checkpoints por etapa e a cada {config.checkpoint_every} lotes (permite --resume)")
+    if config.memory_budget:
+        print(f"  ✓ Orçamento de memória: {config.memory_budget} (lotes reduzidos se necessário)")
+    if config.trace_memory:
+        print("  ✓ tracemalloc: pico de memória Python e maiores alocadores por entidade")
+    if config.metrics_file:
+        print(f"  ✓ Métricas por lote gravadas em {config.metrics_file}")
+    if config.quiet:
+        print("  ✓ Modo silencioso: sem progresso por lote")
+    if config.snapshot_dir:
+        print(f"  ✓ Cache de snapshots em {config.snapshot_dir} (restaura se preset, semente e schema coincidirem)")
+    if config.export_dir:
+        print(f"  ✓ Exportação para {config.export_dir} ({config.export_format}), sem acesso ao banco")
     
     print("\n📦 TAMANHOS DE LOTE CONFIGURADOS:")
     bs = config.batch_sizes
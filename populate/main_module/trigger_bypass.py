@@ -0,0 +1,173 @@
+"""
+Carga em massa sem os triggers por linha, com reconciliação em conjunto.
+
+Durante a população, cada comentário dispara `trg_auto_seq_comentario`
+(trava FOR UPDATE no Usuario + MAX(num_seq)) e cada pagamento dispara
+`verificar_metodo_pagamento_unico` (até três EXISTS). Neste modo os triggers
+são desabilitados com `ALTER TABLE ... DISABLE TRIGGER` durante a carga e as
+mesmas invariantes são restabelecidas depois com SQL baseado em conjuntos:
+
+- num_seq: renumerado por (id_video, id_usuario) com ROW_NUMBER(), na ordem
+  de inserção (o num_seq gerado cresce com o offset de cada lote)
+- método de pagamento único: verificado com um GROUP BY sobre as quatro
+  tabelas de pagamento, reportando as doações em violação
+
+`session_replication_role = replica` não é usado porque também desliga os
+triggers internos das FKs, que devem continuar valendo durante a carga.
+"""
+
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+# Triggers por linha desabilitados durante a carga (tabela -> trigger)
+BYPASSED_TRIGGERS: List[Tuple[str, str]] = [
+    ('comentario', 'trg_auto_seq_comentario'),
+    ('bitcoin', 'trigger_verificar_metodo_pagamento_bitcoin'),
+    ('cartaocredito', 'trigger_verificar_metodo_pagamento_cartao'),
+    ('paypal', 'trigger_verificar_metodo_pagamento_paypal'),
+    ('mecplat', 'trigger_verificar_metodo_pagamento_mecplat'),
+]
+
+# Tabelas de pagamento e o nome exibido de cada método
+PAYMENT_TABLES: List[Tuple[str, str]] = [
+    ('bitcoin', 'Bitcoin'),
+    ('cartaocredito', 'Cartão de Crédito'),
+    ('paypal', 'Paypal'),
+    ('mecplat', 'Mecanismo da Plataforma'),
+]
+
+RENUMBER_SQL = """
+WITH ranked AS (
+    SELECT id_video, num_seq, id_usuario,
+           ROW_NUMBER() OVER (PARTITION BY id_video, id_usuario ORDER BY num_seq) AS novo_seq
+    FROM core.comentario
+)
+UPDATE core.comentario c
+SET num_seq = -r.novo_seq
+FROM ranked r
+WHERE c.id_video = r.id_video
+  AND c.num_seq = r.num_seq
+  AND c.id_usuario = r.id_usuario
+  AND c.num_seq <> r.novo_seq
+"""
+
+GAPS_SQL = """
+SELECT COUNT(*) FROM (
+    SELECT num_seq,
+           ROW_NUMBER() OVER (PARTITION BY id_video, id_usuario ORDER BY num_seq) AS esperado
+    FROM core.comentario
+) s
+WHERE num_seq <> esperado
+"""
+
+
+def _set_triggers(engine: Engine, enabled: bool) -> None:
+    action = "ENABLE" if enabled else "DISABLE"
+    # Transação própria: o ALTER TABLE trava a tabela até o commit
+    with engine.begin() as connection:
+        for table, trigger in BYPASSED_TRIGGERS:
+            connection.execute(text(f"ALTER TABLE core.{table} {action} TRIGGER {trigger}"))
+
+
+def disable_triggers(engine: Engine) -> None:
+    """Desabilita os triggers por linha de comentários e pagamentos."""
+    print("⚡ Desabilitando triggers por linha para a carga em massa...")
+    _set_triggers(engine, enabled=False)
+    for table, trigger in BYPASSED_TRIGGERS:
+        print(f"    {table}: {trigger}")
+    print()
+
+
+def enable_triggers(engine: Engine) -> None:
+    """Reabilita os triggers desabilitados por `disable_triggers`."""
+    _set_triggers(engine, enabled=True)
+    print("    ✓ Triggers por linha reabilitados")
+
+
+def renumber_comentarios(session: Session) -> Tuple[int, int]:
+    """
+    Renumera num_seq por (id_video, id_usuario), como faria o trigger.
+
+    A renumeração é feita em dois passos (valores negativos e depois a troca
+    de sinal) para que nenhuma linha colida com a chave primária de outra
+    durante o UPDATE. Doações já existentes acompanham via ON UPDATE CASCADE.
+
+    Returns:
+        Tupla (linhas renumeradas, sequências ainda inválidas)
+    """
+    renumbered = session.execute(text(RENUMBER_SQL)).rowcount
+    session.execute(text("UPDATE core.comentario SET num_seq = -num_seq WHERE num_seq < 0"))
+    gaps = session.execute(text(GAPS_SQL)).scalar_one()
+    return renumbered, gaps
+
+
+def check_payment_exclusivity(session: Session, limit: int = 10) -> Tuple[int, List[Dict[str, object]]]:
+    """
+    Verifica se alguma doação tem mais de um método de pagamento.
+
+    Args:
+        session: Sessão do SQLAlchemy
+        limit: Quantidade máxima de exemplos devolvidos
+
+    Returns:
+        Tupla (total de doações em violação, exemplos com os métodos encontrados)
+    """
+    union = "\n    UNION ALL\n".join(
+        f"    SELECT id_video_doacao, seq_doacao, id_usuario, '{label}' AS metodo FROM core.{table}"
+        for table, label in PAYMENT_TABLES
+    )
+    violations_sql = f"""
+    SELECT id_video_doacao, seq_doacao, id_usuario, string_agg(metodo, ', ' ORDER BY metodo) AS metodos
+    FROM (
+{union}
+    ) p
+    GROUP BY id_video_doacao, seq_doacao, id_usuario
+    HAVING COUNT(*) > 1
+    """
+    total = session.execute(text(f"SELECT COUNT(*) FROM ({violations_sql}) v")).scalar_one()
+    examples = session.execute(text(f"{violations_sql} LIMIT :limit"), {'limit': limit}).mappings().all()
+    return total, [dict(row) for row in examples]
+
+
+def reconcile_comentarios(session: Session) -> float:
+    """
+    Restabelece a numeração de num_seq após a carga sem trigger e faz commit.
+
+    Returns:
+        Tempo de execução em segundos
+    """
+    print("    🔁 Renumerando num_seq dos comentários (ROW_NUMBER por vídeo/usuário)...")
+    inicio = time.time()
+    renumbered, gaps = renumber_comentarios(session)
+    session.commit()
+    tempo = time.time() - inicio
+    print(f"    ✓ {renumbered:,} comentários renumerados em {tempo:.2f}s")
+    if gaps:
+        print(f"    ⚠️  {gaps:,} comentários ainda fora da sequência esperada")
+    return tempo
+
+
+def reconcile_pagamentos(session: Session, timings: dict) -> int:
+    """
+    Verifica a exclusividade dos métodos de pagamento e reporta violações.
+
+    Returns:
+        Número de doações com mais de um método de pagamento
+    """
+    print("    🔎 Verificando método de pagamento único por doação...")
+    inicio = time.time()
+    total, examples = check_payment_exclusivity(session)
+    timings['reconciliacao_pagamentos'] = time.time() - inicio
+    if total:
+        print(f"    ⚠️  {total:,} doações com mais de um método de pagamento, por exemplo:")
+        for row in examples:
+            print(f"        vídeo {row['id_video_doacao']}, seq {row['seq_doacao']}, "
+                  f"usuário {row['id_usuario']}: {row['metodos']}")
+    else:
+        print(f"    ✓ Nenhuma violação encontrada ({timings['reconciliacao_pagamentos']:.2f}s)")
+    return total
@@ -0,0 +1,160 @@
+"""
+Pools pré-computados de valores do Faker.
+
+Chamadas como `fake.text()` e `fake.sentence()` dominam o custo por linha,
+mas produzem apenas texto de preenchimento, que pode se repetir. O
+PooledFaker gera um número configurável de valores distintos por campo e
+depois sorteia por índice nesses pools. A unicidade das linhas continua
+vindo dos sufixos de offset já usados pelos geradores (nick, email, título).
+
+O PooledFaker é um substituto direto do `fake` repassado pelo BatchInserter:
+os campos sem pool (ex: `fake.sha256()`) são delegados ao Faker original.
+Os pools podem ser persistidos em disco para reuso entre execuções.
+"""
+
+import os
+import pickle
+import random
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from faker import Faker
+import faker
+
+
+# Campos de preenchimento mais caros (nome do método, kwargs)
+DEFAULT_POOLED_FIELDS: List[Tuple[str, Dict[str, Any]]] = [
+    ('text', {}),
+    ('sentence', {}),
+    ('sentence', {'nb_words': 4}),
+    ('word', {}),
+    ('user_name', {}),
+    ('company', {}),
+    ('image_url', {}),
+    ('credit_card_provider', {}),
+]
+
+PoolKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+
+def _pool_key(name: str, kwargs: Dict[str, Any]) -> PoolKey:
+    return name, tuple(sorted(kwargs.items()))
+
+
+class PooledFaker:
+    """
+    Faker com pools de valores pré-computados para campos de preenchimento.
+
+    Características:
+    - Pools construídos na inicialização para os campos configurados
+    - Sorteio por índice com gerador próprio (re-semeado por seed_instance)
+    - Cache opcional em disco, invalidado por locale, tamanho e versão do Faker
+    - Demais atributos delegados ao Faker original
+    """
+
+    def __init__(
+        self,
+        fake: Faker,
+        pool_size: int,
+        cache_path: Optional[str] = None,
+        fields: Iterable[Tuple[str, Dict[str, Any]]] = DEFAULT_POOLED_FIELDS
+    ):
+        """
+        Inicializa o PooledFaker e constrói (ou carrega) os pools.
+
+        Args:
+            fake: Instância do Faker usada para construir os pools e delegar o resto
+            pool_size: Quantidade de valores distintos por campo
+            cache_path: Arquivo para persistir os pools entre execuções (opcional)
+            fields: Campos (método, kwargs) que recebem pool
+        """
+        self._fake = fake
+        self._random = random.Random()
+        self.pool_size = pool_size
+        self.cache_path = cache_path
+        self.pools: Dict[PoolKey, List[Any]] = {}
+        self._methods: Dict[str, Callable[..., Any]] = {}
+
+        fields = list(fields)
+        cached = self._load_cache()
+        inicio = time.time()
+        for name, kwargs in fields:
+            key = _pool_key(name, kwargs)
+            self.pools[key] = cached.get(key) or self._build_pool(name, kwargs)
+            self._methods[name] = self._pooled_method(name)
+
+        built = sum(1 for name, kwargs in fields if _pool_key(name, kwargs) not in cached)
+        if built:
+            print(f"🧰 {built} pools de valores do Faker construídos em {time.time() - inicio:.2f}s ({pool_size:,} valores cada)")
+            self._save_cache()
+        else:
+            print(f"🧰 Pools de valores do Faker carregados de {cache_path}")
+
+    def seed_instance(self, seed: Any = None) -> 'PooledFaker':
+        """Re-semeia o sorteio nos pools e o Faker delegado."""
+        self._random.seed(seed)
+        self._fake.seed_instance(seed)
+        return self
+
+    def __getattr__(self, name: str) -> Any:
+        # Chamado apenas para atributos que não existem no PooledFaker
+        if name.startswith('_'):
+            raise AttributeError(name)
+        method = self._methods.get(name)
+        if method is not None:
+            return method
+        return getattr(self._fake, name)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Os métodos são closures; são recriados ao desserializar
+        state = self.__dict__.copy()
+        state['_methods'] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._methods = {name: self._pooled_method(name) for name, _ in self.pools}
+
+    def _pooled_method(self, name: str) -> Callable[..., Any]:
+        pools = self.pools
+        rand = self._random.random
+
+        def pooled(*args, **kwargs):
+            if args:
+                # Argumentos posicionais não fazem parte da chave do pool
+                return getattr(self._fake, name)(*args, **kwargs)
+            pool = pools.get(_pool_key(name, kwargs))
+            if pool is None:
+                # Combinação de kwargs sem pool: constrói na primeira chamada
+                pool = pools[_pool_key(name, kwargs)] = self._build_pool(name, kwargs)
+            return pool[int(rand() * len(pool))]
+
+        return pooled
+
+    def _build_pool(self, name: str, kwargs: Dict[str, Any]) -> List[Any]:
+        generator = getattr(self._fake, name)
+        values = {generator(**kwargs) for _ in range(self.pool_size)}
+        return sorted(values, key=str)
+
+    def _cache_signature(self) -> Tuple[Any, ...]:
+        return (tuple(self._fake.locales), self.pool_size, faker.VERSION)
+
+    def _load_cache(self) -> Dict[PoolKey, List[Any]]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'rb') as f:
+                signature, pools = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return {}
+        return pools if signature == self._cache_signature() else {}
+
+    def _save_cache(self) -> None:
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((self._cache_signature(), self.pools), f)
+        os.replace(tmp_path, self.cache_path)